@@ -0,0 +1,196 @@
+import math
+from trajectory import Trajectory
+
+DEFAULT_ROARM_IP = '192.168.0.251'
+
+JOINT_LETTERS: tuple = ('b', 's', 'e', 't')
+COORDINATE_LETTERS: tuple = ('x', 'y', 'z')
+INITIAL_POSITION: dict = {'b': 0, 's': 0, 'e': 90, 't': 180}
+DIRECTIONS: dict = {      'up': {'joint_letter': 'e', 'sign': -1, 'joint_index': 3},
+                        'down': {'joint_letter': 'e', 'sign': +1, 'joint_index': 3},
+                        'left': {'joint_letter': 'b', 'sign': +1, 'joint_index': 1},
+                       'right': {'joint_letter': 'b', 'sign': -1, 'joint_index': 1},
+                     'forward': {'joint_letter': 's', 'sign': +1, 'joint_index': 2},
+                    'backward': {'joint_letter': 's', 'sign': -1, 'joint_index': 2}}
+
+# Each entry returns the robot call, so the same tables drive Robot and AsyncRobot
+ACTIONS: dict = {
+        'go_left': lambda robot: robot.move_left(15),
+        'go_right': lambda robot: robot.move_right(15),
+        'go_up': lambda robot: robot.move_up(15),
+        'go_down': lambda robot: robot.move_down(15),
+        'go_forward': lambda robot: robot.move_forward(15),
+        'go_backward': lambda robot: robot.move_backward(15),
+        'light_on': lambda robot: robot.set_light(255),
+        'light_off': lambda robot: robot.set_light(0),
+        'look_around': lambda robot: robot.look_around(),
+        'look_left': lambda robot: robot.move_to_position(b=90,speed=20,delay=6),
+        'look_right': lambda robot: robot.move_to_position(b=-90,speed=20,delay=6),
+        'pick_up_start': lambda robot: robot.move_to_pick_up_start(),
+        'grab': lambda robot: robot.grab(),
+        'reset': lambda robot: robot.reset(),
+        'hold': lambda robot: robot.hold(),
+        'release': lambda robot: robot.release(),
+        'throw': lambda robot: robot.throw()
+    }
+
+PRESET_POSITIONS: dict = {
+    1: lambda robot: robot.move_to_position(e=60, b=60, h=180,speed=20,delay=4),
+    2: lambda robot: robot.move_to_position(e=60, b=-60,      speed=20,delay=6),
+    3: lambda robot: robot.move_to_position(e=80, b=0,        speed=20,delay=4),
+    4: lambda robot: robot.move_to_position(e=150,b=0,        speed=20,delay=4),
+    5: lambda robot: robot.move_to_position(e=100,b=-60,      speed=20,delay=4),
+    6: lambda robot: robot.move_to_position(e=100,b=60,       speed=20,delay=6),
+    7: lambda robot: robot.reset(),
+}
+
+def look_around_trajectory() -> Trajectory:
+    """
+    Returns the trajectory used to look around.
+    """
+    return (Trajectory()
+            .joint(e=60,b=60,h=180,dwell=4)
+            .joint(e=60,b=-60,dwell=10)
+            .joint(e=100,b=-60,dwell=4)
+            .joint(e=100,b=60,dwell=11)
+            .cartesian(x=250, y=0, z=250, dwell=5))
+
+def pickup_trajectory(x: int, y: int, z: int) -> Trajectory:
+    """
+    Returns the trajectory that moves the robot into position for pickup at x, y, z and closes the grip.
+    """
+    y_offset = 40
+    x_offset = 20
+    return (Trajectory()
+            .cartesian(x=x/2, y=y, z=z+200, t=1.5, dwell=4)
+            .cartesian(x=x+x_offset, y=y-y_offset, z=z, t=2, speed=1, dwell=4)
+            .gripper(220, dwell=1))
+
+def throw_trajectory() -> Trajectory:
+    """
+    Returns the trajectory used to throw an object.
+    """
+    return (Trajectory()
+            .joint(e=145,b=-120,s=0,h=200,speed=0,dwell=1)
+            .joint(e=60,b=15,s=0,h=200,speed=0,dwell=0.25)
+            .joint(e=45,b=45,s=0,h=90,speed=0,dwell=1)
+            .reset())
+
+def initial_target() -> dict:
+    """
+    Returns the state values of the initial position, the target after a reset.
+    """
+    return {joint: math.radians(angle) for joint, angle in INITIAL_POSITION.items()}
+
+def joint_values(**degrees) -> dict:
+    """
+    Converts commanded joint angles in degrees, keyed by joint letter (b, s, e, h), to state values.
+    """
+    return {('t' if joint == 'h' else joint): math.radians(angle) for joint, angle in degrees.items()}
+
+def commanded_state(state: dict, stale_keys: tuple, values: dict) -> dict:
+    """
+    Returns the cached state with the commanded values recorded, so that chained relative
+    moves build on the last command instead of waiting for a fresh read.
+
+    Args:
+        state: The cached state.
+        stale_keys: State keys that the command makes out of date.
+        values: The commanded state values.
+
+    Returns:
+        The new cached state.
+    """
+    state = {key: value for key, value in state.items() if key not in stale_keys}
+    state.update(values)
+    return state
+
+def state_distance(state: dict, target: dict) -> float:
+    """
+    Returns the largest error between a robot state and a target, in degrees
+    for joints and mm for coordinates.
+
+    Args:
+        state: The state of the robot.
+        target: The target state values.
+
+    Returns:
+        The largest error.
+    """
+    distance = 0.0
+    for key, value in target.items():
+        error = abs(state[key] - value)
+        if key not in ('x', 'y', 'z'):
+            error = math.degrees(error)
+        distance = max(distance, error)
+    return distance
+
+class SettleMonitor():
+    """
+        Decides from successive feedback reads whether the arm has settled on the
+        target of a motion, or has stopped moving short of it (e.g. the gripper
+        closed on an object). Robot and AsyncRobot feed it the reads of their own
+        polling loops.
+
+        A stop only counts once the arm has been seen moving away from where it
+        was at the first read, so reads taken before the motion gets going are
+        not mistaken for a stall.
+
+        Attributes:
+            target (dict): The state values of the motion command.
+            tolerance (float): The allowed error in degrees for joints and mm for coordinates.
+            stall_time (float): Seconds without movement after which the arm counts as stopped.
+            settled (bool): Whether the arm reached the target within tolerance.
+            stalled (bool): Whether the arm moved and then stopped outside tolerance of the target.
+            _start (dict): The state at the first read.
+            _reference (dict): The state the arm was last seen moving from, once it has moved.
+            _reference_time (float): When the arm was at _reference.
+    """
+    target: dict
+    tolerance: float
+    stall_time: float
+    settled: bool = False
+    stalled: bool = False
+    _start: dict = None
+    _reference: dict = None
+    _reference_time: float = None
+
+    def __init__(self, target: dict, tolerance: float = 2.0, stall_time: float = 0.5) -> None:
+        """
+            Initializes a new instance of the SettleMonitor class.
+
+            Args:
+                target (dict): The state values of the motion command.
+                tolerance (float): The allowed error in degrees for joints and mm for coordinates.
+                stall_time (float): Seconds without movement after which the arm counts as stopped.
+        """
+        self.target = target
+        self.tolerance = tolerance
+        self.stall_time = stall_time
+
+    def update(self, state: dict, now: float) -> bool:
+        """
+            Records a feedback read.
+
+            Args:
+                state (dict): The state read from the robot.
+                now (float): The monotonic time of the read.
+
+            Returns:
+                bool: True once the wait is over, because the arm has settled or stalled.
+        """
+        if state_distance(state, self.target) <= self.tolerance:
+            self.settled = True
+            return True
+        position = {key: state[key] for key in self.target}
+        if self._start is None:
+            self._start = position
+        if self._reference is None:
+            if state_distance(position, self._start) > self.tolerance:
+                self._reference, self._reference_time = position, now
+            return False
+        if state_distance(position, self._reference) > self.tolerance:
+            self._reference, self._reference_time = position, now
+            return False
+        self.stalled = now - self._reference_time >= self.stall_time
+        return self.stalled
@@ -0,0 +1,401 @@
+import asyncio
+import json
+import math
+import time
+import httpx
+from arm import (DEFAULT_ROARM_IP, JOINT_LETTERS, COORDINATE_LETTERS, DIRECTIONS, ACTIONS, PRESET_POSITIONS,
+                 SettleMonitor, commanded_state, initial_target, joint_values,
+                 look_around_trajectory, pickup_trajectory, throw_trajectory)
+from trajectory import Trajectory
+
+class AsyncRobot():
+    """
+        Represents a robot arm driven from an asyncio event loop.
+
+        AsyncRobot has the same command surface as Robot, but every command is a
+        coroutine built on an httpx.AsyncClient, so several motions and state reads
+        can be in flight from one event loop without a thread per command.
+
+            async with AsyncRobot(speed=20, acceleration=10) as robot:
+                await asyncio.gather(robot.move_left(15), robot.set_light(255))
+
+        Attributes:
+            _ip_addr (str): The IP address of the robot.
+            _client (httpx.AsyncClient): The pooled keep-alive client used for commands.
+            _state (dict): The cached state of the robot.
+            _state_time (float): The monotonic time at which _state was last read.
+            _state_ttl (float): The number of seconds a cached state is considered fresh.
+            _feedback (dict): The last state read from the robot, without commanded values.
+            _feedback_time (float): The monotonic time at which _feedback was read.
+            _target (dict): The state values of the last motion command.
+            _settle (bool): Whether motions wait for joint feedback instead of their full delay.
+            _speed (int): The speed of the robot.
+            _acceleration (int): The acceleration of the robot.
+    """
+    _ip_addr: str
+    _client: httpx.AsyncClient
+    _state: dict
+    _state_time: float
+    _state_ttl: float
+    _feedback: dict
+    _feedback_time: float
+    _target: dict
+    _settle: bool
+    _speed: int
+    _acceleration: int
+
+    def __init__(self, speed: int = 0, acceleration: int = 2, ip_address: str = DEFAULT_ROARM_IP,
+                 connect_timeout: float = 2.0, read_timeout: float = 5.0, pool_size: int = 4,
+                 state_ttl: float = 0.5, settle: bool = False, transport: httpx.AsyncBaseTransport = None) -> None:
+        """
+            Initializes a new instance of the AsyncRobot class. Call connect(), or use
+            the robot as an async context manager, before sending motions.
+
+            Args:
+                speed (int): The speed of the robot.
+                acceleration (int): The acceleration of the robot.
+                ip_address (str): The IP address of the robot.
+                connect_timeout (float): Seconds to wait for a connection to the robot.
+                read_timeout (float): Seconds to wait for the robot to respond.
+                pool_size (int): The maximum number of concurrent connections to the robot.
+                state_ttl (float): Seconds a cached state is used before it is re-read.
+                settle (bool): If True, motions return as soon as the arm has settled on
+                               its target, using their delay only as a timeout.
+                transport (httpx.AsyncBaseTransport): The httpx transport used by the client.
+                                                      Defaults to one that retries failed connections.
+        """
+        self._ip_addr = ip_address
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(retries=2)
+        self._client = httpx.AsyncClient(
+            base_url="http://" + ip_address,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            transport=transport,
+        )
+        self._state = {}
+        self._state_time = 0.0
+        self._state_ttl = state_ttl
+        self._feedback = {}
+        self._feedback_time = 0.0
+        self._target = {}
+        self._settle = settle
+        self._speed = speed
+        self._acceleration = acceleration
+
+    async def connect(self):
+        """
+            Reads the initial state of the robot and resets it.
+        """
+        await self.get_state()
+        await self.reset()
+
+    async def aclose(self):
+        """
+            Closes the connections to the robot.
+        """
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def do(self, command: str):
+        """
+            Sends a command to the robot and returns the response.
+
+            Args:
+                command (str): The command to send to the robot.
+
+            Returns:
+                str: The response from the robot.
+        """
+        response = await self._client.get("/js", params={"json": command})
+        return response.text
+
+    async def reset(self):
+        """
+            Resets the robot to its initial state.
+        """
+        await self.do('{"T":100}')
+        self._state_time = 0.0
+        self._target = initial_target()
+
+    async def get_state(self):
+        """
+            Reads the current state of the robot and updates the cached state.
+
+            Returns:
+                dict: The current state of the robot.
+        """
+        state = json.loads(await self.do('{"T":105}'))
+        self._state = self._feedback = state
+        self._state_time = self._feedback_time = time.monotonic()
+        return state
+
+    async def get_cached_state(self, max_age: float = None, keys: tuple = ()):
+        """
+            Returns the cached state of the robot, reading it again if it is older
+            than max_age or is missing any of the requested keys.
+
+            Args:
+                max_age (float): The maximum age in seconds. Defaults to the robot's state TTL.
+                keys (tuple): The state keys that must be present in the cached state.
+
+            Returns:
+                dict: The state of the robot.
+        """
+        if max_age is None:
+            max_age = self._state_ttl
+        if time.monotonic() - self._state_time > max_age or any(key not in self._state for key in keys):
+            return await self.get_state()
+        return self._state
+
+    async def _read_state(self, fresh: bool, keys: tuple):
+        """
+            Returns the state used to fill in a motion command.
+        """
+        if fresh:
+            return await self.get_state()
+        return await self.get_cached_state(keys=keys)
+
+    def _update_cached_state(self, stale_keys: tuple, **values):
+        """
+            Records the commanded values in the cached state.
+        """
+        self._state = commanded_state(self._state, stale_keys, values)
+        self._target = values
+
+    def _update_joint_targets(self, **degrees):
+        """
+            Records commanded joint angles, in degrees, in the cached state.
+        """
+        self._update_cached_state(COORDINATE_LETTERS, **joint_values(**degrees))
+
+    async def wait_until_settled(self, tolerance: float = 2.0, timeout: float = 10.0, poll_interval: float = 0.05,
+                                 stall_time: float = 0.5) -> bool:
+        """
+            Polls the robot feedback until the arm has converged on the target of the
+            last motion command, or has moved and then stopped short of it.
+
+            Args:
+                tolerance (float): The allowed error in degrees for joints and mm for coordinates.
+                timeout (float): The maximum number of seconds to wait.
+                poll_interval (float): The number of seconds between feedback reads.
+                stall_time (float): Seconds without movement after which the arm counts as stopped.
+
+            Returns:
+                bool: True if the arm settled on the target, False if it stopped short of
+                      it or the timeout expired first.
+        """
+        monitor = SettleMonitor(self._target, tolerance, stall_time)
+        deadline = time.monotonic() + timeout
+        while True:
+            state = self._feedback
+            if time.monotonic() - self._feedback_time > poll_interval:
+                state = await self.get_state()
+            now = time.monotonic()
+            if monitor.update(state, now):
+                return monitor.settled
+            if now >= deadline:
+                return False
+            await asyncio.sleep(min(poll_interval, max(0.0, deadline - now)))
+
+    async def _finish_motion(self, delay: float):
+        """
+            Waits for a motion to complete, see Robot._finish_motion.
+        """
+        if delay <= 0:
+            return
+        if self._settle:
+            await self.wait_until_settled(timeout=delay)
+        else:
+            await asyncio.sleep(delay)
+
+    async def move_to_coordinates(self, x:int = None, y:int = None, z:int = None, t:int = None, speed:int = None,
+                                  delay:float = 0, fresh: bool = False):
+        """
+            Moves the robot to a specific position. See Robot.move_to_coordinates.
+        """
+        if None in (x, y, z, t):
+            state = await self._read_state(fresh, ('x', 'y', 'z', 't'))
+            x = state['x'] if x is None else x
+            y = state['y'] if y is None else y
+            z = state['z'] if z is None else z
+            t = state['t'] if t is None else t
+        if speed is None:
+            speed = self._speed
+        await self.do(f'{{"T":104,"x":{x},"y":{y},"z":{z},"t":{t},"spd":{speed}}}')
+        self._update_cached_state(('b', 's', 'e'), x=x, y=y, z=z, t=t)
+        await self._finish_motion(delay)
+
+    async def move_to_relative_position(self, e:int = 0, b:int = 0, s:int = 0, h:int = 0, speed:int = None,
+                                        delay:float = 0, fresh: bool = False):
+        """
+            Moves the robot to a relative position. See Robot.move_to_relative_position.
+        """
+        state = await self._read_state(fresh, JOINT_LETTERS)
+        await self.move_to_position(e=e + math.degrees(state['e']), b=b + math.degrees(state['b']),
+                                    s=s + math.degrees(state['s']), h=h + math.degrees(state['t']),
+                                    speed=speed, delay=delay)
+
+    async def move_to_position(self, e:int = None, b:int = None, s:int = None, h:int = None, speed:int = None,
+                               delay:float = 0, fresh: bool = False, acceleration: int = None):
+        """
+            Moves the robot to a specific position. See Robot.move_to_position.
+        """
+        if None in (e, b, s, h):
+            state = await self._read_state(fresh, JOINT_LETTERS)
+            e = math.degrees(state['e']) if e is None else e
+            b = math.degrees(state['b']) if b is None else b
+            s = math.degrees(state['s']) if s is None else s
+            h = math.degrees(state['t']) if h is None else h
+        if speed is None:
+            speed = self._speed
+        if acceleration is None:
+            acceleration = self._acceleration
+        await self.do(f'{{"T":122,"b":{b},"s":{s},"e":{e},"h":{h},"spd":{speed},"acc":{acceleration}}}')
+        self._update_joint_targets(b=b, s=s, e=e, h=h)
+        await self._finish_motion(delay)
+
+    async def exact_move(self, joint_index: int, degrees: int, delay: float = 0):
+        """
+            Moves a single joint to an angle. See Robot.exact_move.
+        """
+        await self.do(f'{{"T":121,"joint":{joint_index},"angle":{degrees},"spd":{self._speed},"acc":{self._acceleration}}}')
+        self._update_joint_targets(**{JOINT_LETTERS[joint_index - 1]: degrees})
+        await self._finish_motion(delay)
+
+    async def move(self, degrees: int, direction: str, delay: float = 0, fresh: bool = False):
+        """
+            Moves the robot in a specific direction. See Robot.move.
+        """
+        joint = DIRECTIONS[direction]['joint_letter']
+        sign = DIRECTIONS[direction]['sign']
+        joint_index = DIRECTIONS[direction]['joint_index']
+        state = await self._read_state(fresh, (joint,))
+        await self.exact_move(joint_index, math.degrees(state[joint]) + sign * degrees, delay=delay)
+
+    async def move_left(self, degrees: int, delay: float = 0, fresh: bool = False):
+        """
+            Moves the robot to the left.
+        """
+        await self.move(degrees, 'left', delay=delay, fresh=fresh)
+
+    async def move_right(self, degrees: int, delay: float = 0, fresh: bool = False):
+        """
+            Moves the robot to the right.
+        """
+        await self.move(degrees, 'right', delay=delay, fresh=fresh)
+
+    async def move_up(self, degrees: int, delay: float = 0, fresh: bool = False):
+        """
+            Moves the robot up.
+        """
+        await self.move(degrees, 'up', delay=delay, fresh=fresh)
+
+    async def move_down(self, degrees: int, delay: float = 0, fresh: bool = False):
+        """
+            Moves the robot down.
+        """
+        await self.move(degrees, 'down', delay=delay, fresh=fresh)
+
+    async def move_forward(self, degrees: int, delay: float = 0, fresh: bool = False):
+        """
+            Moves the robot forward.
+        """
+        await self.move(degrees, 'forward', delay=delay, fresh=fresh)
+
+    async def move_backward(self, degrees: int, delay: float = 0, fresh: bool = False):
+        """
+            Moves the robot backward.
+        """
+        await self.move(degrees, 'backward', delay=delay, fresh=fresh)
+
+    async def set_light(self, intensity: int = 0):
+        """
+            Sets the light intensity of the robot.
+
+            Args:
+                intensity (int): The intensity of the light.
+        """
+        intensity = min(255, max(0, intensity))
+        await self.do(f'{{"T":114,"led":{intensity}}}')
+
+    async def hold(self):
+        """
+            Closes the robot grip
+        """
+        await self.exact_move(4,220,delay=1)
+
+    async def grab(self):
+        """
+            Opens and then closes the the robot grip
+        """
+        await self.exact_move(4,45,delay=5)
+        await self.exact_move(4,220,delay=1)
+
+    async def release(self):
+        """
+            Opens the robot grip
+        """
+        await self.exact_move(4,90,delay=2)
+
+    async def run_trajectory(self, trajectory: Trajectory):
+        """
+            Executes a trajectory.
+
+            Args:
+                trajectory (Trajectory): The trajectory to execute.
+        """
+        await trajectory.run_async(self)
+
+    async def look_around(self):
+        """
+            Moves the robot to look around
+        """
+        await self.run_trajectory(look_around_trajectory())
+
+    async def move_to_coordinates_for_pickup(self, x: int, y: int, z:int):
+        """
+            moves the robot into position for pickup
+        """
+        await self.run_trajectory(pickup_trajectory(x, y, z))
+
+    async def throw(self):
+        """
+            Throws the object
+        """
+        await self.run_trajectory(throw_trajectory())
+
+    async def move_to_pick_up_start(self):
+        """
+            Moves the robot to the pickup start position
+        """
+        await self.move_to_position(e=170,b=0,s=-40,delay=1)
+
+    async def move_to_preset_position(self, position: int):
+        """
+            Moves the robot to a preset position
+
+            Args:
+                position (int): The position to move to.
+        """
+        if position in PRESET_POSITIONS:
+            await PRESET_POSITIONS[position](self)
+
+    async def do_action(self, action: str):
+        """
+            Performs an action on the robot.
+
+            Args:
+                action (str): The action to perform.
+        """
+        if action in ACTIONS:
+            await ACTIONS[action](self)
+        else:
+            print('Invalid action')
+            print(f'You tried to: {action}')
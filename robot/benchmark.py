@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""Latency and throughput benchmarks that run without the robot or camera hardware."""
+
+import argparse
+import queue
+import threading
+import time
+from typing import Callable, Dict, List
+import cv2
+import numpy as np
+from simulator import RoArmSimulator
+from pipeline import CameraPipeline
+from frame_source import FrameSource, SyntheticSource, create_frame_source
+from preview import PreviewDisplay, has_display
+from simulated_inference import SimulatedInference
+from detections import decode_nms, decode_nms_loop
+import yolo_postprocess
+from yolo_postprocess import YoloDecoder
+from tiling import TileGrid, merge_detections
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """
+    Summarizes a list of latencies.
+
+    Args:
+        latencies: The latencies in seconds.
+
+    Returns:
+        A dictionary with the rate per second and the p50/p99 latencies in milliseconds.
+    """
+    samples = np.asarray(latencies)
+    return {
+        "per_second": len(samples) / samples.sum(),
+        "p50_ms": float(np.percentile(samples, 50) * 1000),
+        "p99_ms": float(np.percentile(samples, 99) * 1000),
+    }
+
+def time_calls(function: Callable, iterations: int) -> List[float]:
+    """
+    Times repeated calls to a function.
+
+    Args:
+        function: The function to call.
+        iterations: The number of calls.
+
+    Returns:
+        The latency of each call in seconds.
+    """
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+def print_results(title: str, results: Dict[str, Dict[str, float]]) -> None:
+    print(title)
+    print(f'{"":<28}{"per sec":>10}{"p50 ms":>10}{"p99 ms":>10}')
+    for name, result in results.items():
+        print(f'{name:<28}{result["per_second"]:>10.1f}{result["p50_ms"]:>10.2f}{result["p99_ms"]:>10.2f}')
+
+def benchmark_robot(args: argparse.Namespace) -> None:
+    """Benchmarks Robot primitives against the simulator or a real arm."""
+    # Imported here so that the rest of the module, e.g. random_nms_output, imports without
+    # the robot module shadowed by the package of the same name (as under pytest)
+    from robot import Robot
+    simulator = None
+    ip_address = args.ip
+    if ip_address is None and args.serial is None:
+        simulator = RoArmSimulator(latency=args.latency, jitter=args.jitter).start()
+        ip_address = simulator.address
+    robot = Robot(ip_address=ip_address, poll_rate=args.poll_rate, settle=args.settle, serial_port=args.serial)
+    try:
+        primitives = {
+            "get_state": robot.get_state,
+            "set_light": lambda: robot.set_light(0),
+            "move_left (cached state)": lambda: robot.move_left(0.5),
+            "move_left (fresh state)": lambda: robot.move_left(0.5, fresh=True),
+            "move_to_position": lambda: robot.move_to_position(e=90, b=0, s=0, h=180),
+        }
+        results = {name: summarize(time_calls(primitive, args.iterations)) for name, primitive in primitives.items()}
+        if args.settle:
+            elbow_angles = iter([80, 90] * args.iterations)
+            results["10 deg move until settled"] = summarize(time_calls(
+                lambda: robot.move_to_position(e=next(elbow_angles), b=0, s=0, h=180, delay=10), max(2, args.iterations // 10)))
+        print_results(f'Robot primitives against {args.serial or ip_address}', results)
+    finally:
+        robot.close()
+        if simulator is not None:
+            simulator.stop()
+
+def create_inference(args: argparse.Namespace, input_queue: queue.Queue, output_queue: queue.Queue, batch_size: int,
+                     in_flight: int, model: Callable = None):
+    """Creates a HailoAsyncInference for --hef, or a SimulatedInference returning model's output otherwise."""
+    if args.hef is not None:
+        from utils import HailoAsyncInference
+        return HailoAsyncInference(args.hef, input_queue, output_queue, batch_size=batch_size, send_original_frame=True,
+                                   pool_size=in_flight)
+    options = {'model': model} if model is not None else {}
+    return SimulatedInference(input_queue, output_queue, batch_size=batch_size, send_original_frame=True,
+                              frame_time=args.frame_time, latency=args.device_latency, job_overhead=args.job_overhead,
+                              **options)
+
+def create_source(args: argparse.Namespace, width: int, height: int) -> FrameSource:
+    """Creates the frame source for --source, limited to --frames frames and paced to --fps if set."""
+    if args.source == 'synthetic':
+        source = SyntheticSource(width, height)
+    else:
+        source = create_frame_source(args.source)
+    source.frames = args.frames
+    source.realtime = args.fps > 0
+    if args.fps > 0:
+        source.fps = args.fps
+    return source
+
+def run_pipeline(args: argparse.Namespace, batch_size: int, in_flight: int, show: Callable = None,
+                 tiles: TileGrid = None, model: Callable = None, size: int = None) -> Dict[str, float]:
+    """
+    Runs args.frames frames through a CameraPipeline and returns its throughput and latency.
+    Each frame is passed to show, if set, at the end of postprocessing. With tiles, the
+    frames of size x size pixels are inferred as a batch of tiles whose detections are
+    decoded and merged on the host.
+    """
+    tiles_per_frame = len(tiles) if tiles is not None else None
+    if tiles is not None:
+        batch_size, pool_size = tiles_per_frame, in_flight * tiles_per_frame
+    else:
+        pool_size = in_flight
+    input_queue, output_queue = queue.Queue(maxsize=in_flight), queue.Queue()
+    inference = create_inference(args, input_queue, output_queue, batch_size, pool_size, model)
+    inference_thread = threading.Thread(target=inference.run)
+    inference_thread.start()
+    latencies = []
+    model_h, model_w = inference.get_input_shape()[:2]
+    source = create_source(args, size or model_w, size or model_h)
+    tile_boxes = tiles.boxes(source.size) if tiles is not None else None
+
+    def resize(frame):
+        return frame if frame.shape[:2] == (model_h, model_w) else cv2.resize(frame, (model_w, model_h))
+
+    def preprocess_tiles(frame):
+        return [resize(frame[y0:y1, x0:x1]) for x0, y0, x1, y1 in tile_boxes]
+
+    def postprocess(seq, timestamp, frame, result):
+        if tiles is not None and result is not None:
+            decoded = [decode_nms(tile_result, y1 - y0, x1 - x0, args.score_thresh)
+                       for tile_result, (x0, y0, x1, y1) in zip(result, tile_boxes)]
+            merge_detections(*zip(*decoded), tile_boxes)
+        latencies.append(time.time() - timestamp)
+        if show is not None:
+            show(frame)
+
+    pipeline = CameraPipeline(
+        source.read, preprocess_tiles if tiles is not None else resize, postprocess,
+        input_queue, output_queue, in_flight=in_flight, batch_size=1 if tiles is not None else batch_size,
+        max_batch_wait=args.max_wait, release=inference.release, tiles_per_frame=tiles_per_frame)
+    try:
+        pipeline.start().join()
+    finally:
+        source.stop()
+        input_queue.put(None)
+        inference_thread.join()
+    result = summarize(latencies)
+    result["per_second"] = pipeline.fps()
+    return result
+
+def benchmark_batching(args: argparse.Namespace) -> None:
+    """Benchmarks pipeline throughput and per-frame latency across inference batch sizes."""
+    results = {}
+    for batch_size in args.batch_sizes:
+        results[f'batch {batch_size}'] = run_pipeline(args, batch_size, max(args.in_flight, 2 * batch_size))
+    print_results(f'Pipeline throughput and capture-to-result latency on {args.hef or "the simulated device"}', results)
+
+def create_gui(args: argparse.Namespace):
+    """
+    Returns the imshow and waitKey functions to benchmark and their description: OpenCV's own
+    on a machine with a display, or stand-ins taking --gui_time and 1 ms on a headless one or
+    if --gui_time is set.
+    """
+    if args.gui_time is None and has_display():
+        return cv2.imshow, cv2.waitKey, "OpenCV"
+    gui_time = 0.015 if args.gui_time is None else args.gui_time
+
+    def wait_key(milliseconds):
+        time.sleep(milliseconds / 1000)
+        return -1
+    return lambda window, frame: time.sleep(gui_time), wait_key, f'a simulated {gui_time:g} s imshow'
+
+def benchmark_display(args: argparse.Namespace) -> None:
+    """
+    Benchmarks pipeline throughput with the preview drawn inline, on its own thread, and off.
+    The simulated device defaults to a few ms per frame, so that drawing is the bottleneck.
+    """
+    imshow, wait_key, gui = create_gui(args)
+
+    def show_inline(frame):
+        imshow('preview', frame)
+        wait_key(1)
+
+    results = {"inline imshow/waitKey": run_pipeline(args, 1, args.in_flight, show_inline)}
+    preview = PreviewDisplay(args.preview_fps, imshow=imshow, wait_key=wait_key).start()
+    results[f'preview thread, {args.preview_fps:g} fps'] = run_pipeline(args, 1, args.in_flight, preview.show)
+    preview.stop()
+    results["off"] = run_pipeline(args, 1, args.in_flight)
+    print_results(f'Pipeline throughput and capture-to-result latency by display policy, with {gui}', results)
+    if imshow is cv2.imshow:
+        cv2.destroyAllWindows()
+
+def benchmark_tiling(args: argparse.Namespace) -> None:
+    """Benchmarks pipeline throughput and latency across tile grids, with host-side decode and cross-tile NMS."""
+    output = random_nms_output(args.detections, args.classes)
+    results = {}
+    for grid in args.grids:
+        tiles = TileGrid.parse(grid, args.overlap, include_full=not args.no_full)
+        results[f'{tiles} ({len(tiles)} tiles)'] = run_pipeline(
+            args, len(tiles), args.in_flight, tiles=tiles, model=lambda frame: output, size=args.size)
+    print_results(f'Pipeline throughput and capture-to-result latency by tile grid, {args.size}x{args.size} frames, '
+                  f'{args.detections} detections per tile, on {args.hef or "the simulated device"}', results)
+
+def random_nms_output(detections: int, num_classes: int = 80, seed: int = 0) -> List[np.ndarray]:
+    """Returns a per-class NMS output holding the given number of random detections."""
+    rng = np.random.default_rng(seed)
+    class_ids = rng.integers(0, num_classes, detections)
+    output = []
+    for class_id in range(num_classes):
+        count = int(np.sum(class_ids == class_id))
+        boxes = np.sort(rng.random((count, 2, 2)), axis=1).reshape(count, 4)
+        output.append(np.column_stack([boxes, rng.random(count)]).astype(np.float32))
+    return output
+
+def benchmark_decode(args: argparse.Namespace) -> None:
+    """Benchmarks decoding NMS output one detection at a time against the vectorized decoder."""
+    results = {}
+    for detections in args.detections:
+        output = random_nms_output(detections, args.classes)
+        for name, decode in (("loop", decode_nms_loop), ("vectorized", decode_nms)):
+            results[f'{name}, {detections} detections'] = summarize(time_calls(
+                lambda: decode(output, 1280, 1280, args.score_thresh), args.iterations))
+    print_results(f'NMS output decoding, {args.classes} classes', results)
+
+def random_raw_outputs(input_size: int, num_classes: int, objects: int, reg_max: int = 16, seed: int = 0):
+    """Returns quantized raw YOLO outputs with the given number of confident anchors, and their quantization."""
+    rng = np.random.default_rng(seed)
+    outputs, quantization = {}, {}
+    for stride in (8, 16, 32):
+        size = input_size // stride
+        outputs[f'box{stride}'] = rng.integers(0, 256, (1, size, size, 4 * reg_max), dtype=np.uint8)
+        outputs[f'class{stride}'] = rng.integers(0, 40, (1, size, size, num_classes), dtype=np.uint8)
+        quantization[f'box{stride}'] = (0.05, 128)
+        quantization[f'class{stride}'] = (1 / 255, 0)
+    for _ in range(objects):
+        stride = int(rng.choice([8, 16, 32]))
+        size = input_size // stride
+        outputs[f'class{stride}'][0, rng.integers(size), rng.integers(size), rng.integers(num_classes)] = 230
+    return outputs, quantization
+
+def benchmark_postprocess(args: argparse.Namespace) -> None:
+    """Benchmarks each stage of host-side YOLO decode and NMS against decoding on-chip NMS output."""
+    outputs, quantization = random_raw_outputs(args.input_size, args.classes, args.objects)
+    results = {}
+    for use_numba in [False] + ([True] if yolo_postprocess.numba is not None else []):
+        decoder = YoloDecoder((args.input_size, args.input_size), args.classes, args.score_thresh,
+                              quantization=quantization, use_numba=use_numba)
+        decoder(outputs)
+        stages = {"scores": [], "boxes": [], "nms": []}
+        for _ in range(args.iterations):
+            nms_output = decoder(outputs)
+            for stage, timings in stages.items():
+                timings.append(decoder.timings[stage])
+        name = "numba" if use_numba else "numpy"
+        for stage, timings in stages.items():
+            results[f'host {stage} ({name})'] = summarize(timings)
+        results[f'host total ({name})'] = summarize(np.sum(list(stages.values()), axis=0))
+    results["on-chip NMS output decode"] = summarize(time_calls(
+        lambda: decode_nms(nms_output, 1280, 1280, args.score_thresh), args.iterations))
+    print_results(f'YOLO postprocessing, {args.input_size}x{args.input_size} input, {args.classes} classes, '
+                  f'{args.objects} objects', results)
+
+def add_inference_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the arguments selecting and configuring the inference device."""
+    parser.add_argument("--hef", default=None, help="Benchmark this HEF on the Hailo device instead of the simulated device.")
+    parser.add_argument("-f", "--frames", type=int, default=300, help="Frames per run.")
+    parser.add_argument("--source", default="synthetic", help="Frame source: synthetic, a video file, or an image file or directory.")
+    parser.add_argument("--fps", type=float, default=0, help="Capture rate, or 0 to capture as fast as possible.")
+    parser.add_argument("--in_flight", type=int, default=4, help="Frames allowed in flight.")
+    parser.add_argument("--frame_time", type=float, default=0.008, help="Simulated device time per frame in seconds.")
+    parser.add_argument("--job_overhead", type=float, default=0.004, help="Simulated device time per job in seconds.")
+    parser.add_argument("--device_latency", type=float, default=0.03, help="Simulated time from job start to results in seconds.")
+
+def initialize_arg_parser() -> argparse.ArgumentParser:
+    """Initialize argument parser for the script."""
+    parser = argparse.ArgumentParser(description="Offline latency and throughput benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    robot_parser = subparsers.add_parser("robot", help="Robot command latency against the simulator.")
+    robot_parser.add_argument("--ip", default=None, help="Benchmark a real arm at this address instead of the simulator.")
+    robot_parser.add_argument("--serial", default=None, help="Benchmark a real arm on this serial device instead of the simulator.")
+    robot_parser.add_argument("-i", "--iterations", type=int, default=200, help="Calls per primitive.")
+    robot_parser.add_argument("--latency", type=float, default=0.005, help="Simulated latency per request in seconds.")
+    robot_parser.add_argument("--jitter", type=float, default=0.002, help="Simulated latency jitter in seconds.")
+    robot_parser.add_argument("--poll_rate", type=float, default=None, help="Run the background state poller at this rate.")
+    robot_parser.add_argument("--settle", action="store_true", help="Wait for feedback-driven motion completion.")
+    robot_parser.set_defaults(function=benchmark_robot)
+
+    batching_parser = subparsers.add_parser("batching", help="Pipeline throughput and latency across inference batch sizes.")
+    add_inference_arguments(batching_parser)
+    batching_parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 2, 4, 8], help="Batch sizes to compare.")
+    batching_parser.add_argument("--max_wait", type=float, default=0.02, help="Longest a frame waits for its batch to fill in seconds.")
+    batching_parser.set_defaults(function=benchmark_batching)
+
+    display_parser = subparsers.add_parser("display", help="Pipeline throughput by display policy.")
+    add_inference_arguments(display_parser)
+    display_parser.add_argument("--preview_fps", type=float, default=10.0, help="Preview thread redraw rate.")
+    display_parser.add_argument("--gui_time", type=float, default=None,
+                                help="Simulate imshow taking this long in seconds instead of opening a window.")
+    display_parser.set_defaults(function=benchmark_display, max_wait=0.02, frame_time=0.002, job_overhead=0.001,
+                                device_latency=0.01)
+
+    tiling_parser = subparsers.add_parser("tiling", help="Pipeline throughput and latency across inference tile grids.")
+    add_inference_arguments(tiling_parser)
+    tiling_parser.add_argument("--grids", nargs="+", default=["1x1", "2x2", "3x3"], help="Tile grids to compare, as ROWSxCOLS.")
+    tiling_parser.add_argument("--overlap", type=float, default=0.2, help="Overlap of neighbouring tiles.")
+    tiling_parser.add_argument("--no_full", action="store_true", help="Leave out the whole-frame tile.")
+    tiling_parser.add_argument("--size", type=int, default=1280, help="Frame width and height.")
+    tiling_parser.add_argument("--detections", type=int, default=10, help="Detections per tile.")
+    tiling_parser.add_argument("--classes", type=int, default=80, help="Number of model classes.")
+    tiling_parser.add_argument("-s", "--score_thresh", type=float, default=0.25, help="Score threshold.")
+    tiling_parser.set_defaults(function=benchmark_tiling, max_wait=0.02)
+
+    decode_parser = subparsers.add_parser("decode", help="NMS output decoding, per-detection loop vs vectorized.")
+    decode_parser.add_argument("-i", "--iterations", type=int, default=2000, help="Calls per case.")
+    decode_parser.add_argument("--detections", type=int, nargs="+", default=[0, 10, 100], help="Detections per frame.")
+    decode_parser.add_argument("--classes", type=int, default=80, help="Number of model classes.")
+    decode_parser.add_argument("-s", "--score_thresh", type=float, default=0.25, help="Score threshold.")
+    decode_parser.set_defaults(function=benchmark_decode)
+
+    postprocess_parser = subparsers.add_parser("postprocess", help="Host-side YOLO decode and NMS, per stage.")
+    postprocess_parser.add_argument("-i", "--iterations", type=int, default=200, help="Frames per case.")
+    postprocess_parser.add_argument("--input_size", type=int, default=640, help="Model input size.")
+    postprocess_parser.add_argument("--classes", type=int, default=80, help="Number of model classes.")
+    postprocess_parser.add_argument("--objects", type=int, default=20, help="Confident anchors per frame.")
+    postprocess_parser.add_argument("-s", "--score_thresh", type=float, default=0.25, help="Score threshold.")
+    postprocess_parser.set_defaults(function=benchmark_postprocess)
+    return parser
+
+def main() -> None:
+    args = initialize_arg_parser().parse_args()
+    args.function(args)
+
+if __name__ == "__main__":
+    main()
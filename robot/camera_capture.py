@@ -0,0 +1,110 @@
+import threading
+from typing import Tuple
+import numpy as np
+
+class DualStreamCapture():
+    """
+        Captures from a Picamera2 with two streams: a full-resolution main stream and
+        a lores stream at the model input size. The ISP scales and flips both, so
+        inference is fed from the lores stream with no resize or flip on the CPU.
+
+        The main image is only copied out of a request when it has been asked for
+        with request_main(), or for every frame with keep_main set, as copying it
+        costs more than the rest of the capture. It is read from the same request
+        as the lores image, so it always belongs to its lores frame, and the
+        request is handed straight back to the camera.
+
+        Attributes:
+            main_size (tuple): The (width, height) of the main stream.
+            lores_size (tuple): The (width, height) of the lores stream.
+            keep_main (bool): Whether the main image is copied for every frame.
+            _camera (Picamera2): The camera.
+            _main_requested (bool): Whether the main image of the next frame has been asked for.
+            _lock (threading.Lock): Guards _main_requested.
+    """
+    main_size: Tuple[int, int]
+    lores_size: Tuple[int, int]
+    keep_main: bool = False
+    _camera: object
+    _main_requested: bool = False
+    _lock: threading.Lock
+
+    def __init__(self, main_size: Tuple[int, int] = (1280, 1280), lores_size: Tuple[int, int] = (640, 640),
+                 hflip: bool = True, vflip: bool = True, lores_format: str = 'RGB888',
+                 buffer_count: int = 4, keep_main: bool = False, camera=None) -> None:
+        """
+            Initializes a new instance of the DualStreamCapture class and configures the camera.
+
+            Args:
+                main_size (tuple): The (width, height) of the main stream.
+                lores_size (tuple): The (width, height) of the lores stream, usually the model input size.
+                hflip (bool): Whether the ISP mirrors the image horizontally.
+                vflip (bool): Whether the ISP flips the image vertically.
+                lores_format (str): The pixel format of the lores stream. Pi 5 supports RGB888.
+                buffer_count (int): The number of capture buffers.
+                keep_main (bool): Whether to copy the main image for every frame rather than on request.
+                camera: The Picamera2 to use. Defaults to a new Picamera2().
+        """
+        from libcamera import Transform
+        if camera is None:
+            from picamera2 import Picamera2
+            camera = Picamera2()
+        self.main_size = tuple(main_size)
+        self.lores_size = tuple(lores_size)
+        self.keep_main = keep_main
+        self._camera = camera
+        self._lock = threading.Lock()
+        camera.configure(camera.create_preview_configuration(
+            main={"format": 'RGB888', "size": self.main_size},
+            lores={"format": lores_format, "size": self.lores_size},
+            transform=Transform(hflip=int(hflip), vflip=int(vflip)),
+            buffer_count=buffer_count,
+        ))
+
+    def start(self) -> 'DualStreamCapture':
+        """
+            Starts the camera.
+
+            Returns:
+                DualStreamCapture: This capture.
+        """
+        self._camera.start()
+        return self
+
+    def stop(self) -> None:
+        """
+            Stops the camera.
+        """
+        self._camera.stop()
+
+    def request_main(self) -> None:
+        """
+            Asks for the main image of the next frame captured to be copied.
+        """
+        with self._lock:
+            self._main_requested = True
+
+    def capture(self) -> Tuple[np.ndarray, np.ndarray | None]:
+        """
+            Captures the next frame.
+
+            Returns:
+                tuple: The lores image, at lores_size, and the main image of the same frame, at
+                       main_size, or None if it was not asked for.
+        """
+        with self._lock:
+            copy_main, self._main_requested = self.keep_main or self._main_requested, False
+        request = self._camera.capture_request()
+        try:
+            return request.make_array('lores'), request.make_array('main') if copy_main else None
+        finally:
+            request.release()
+
+    def scale(self) -> Tuple[float, float]:
+        """
+            Returns the factors from lores to main stream pixel coordinates.
+
+            Returns:
+                tuple: The (x, y) scale factors.
+        """
+        return self.main_size[0] / self.lores_size[0], self.main_size[1] / self.lores_size[1]
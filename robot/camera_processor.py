@@ -5,37 +5,58 @@ import queue
 from typing import Dict, List, Tuple
 import threading
 from utils import HailoAsyncInference
+from pipeline import CameraPipeline
+from detections import decode_nms
+from yolo_postprocess import YoloDecoder
+from frame_source import FrameSource, Picamera2Source
+from preview import DISPLAY_OFF, DISPLAY_PREVIEW, create_preview
+from stream_server import FrameBroadcaster
+from frame_bus import LatestFrameBus
+from video_buffer import VideoRingBuffer
+from scene_encoder import SceneEncoder
+from frame_packet import FramePacket
+from inference_gate import MotionGate, TrackExtrapolator
+from roi import RoiSelector, crop_frame
+from tiling import TileGrid, merge_detections
 import sys
 import camera_utils
 
-# Import picamera2 libraries
-from picamera2 import Picamera2
-
 def is_debugging():
   """Checks if the Python script is running in debug mode."""
   return sys.gettrace() is not None
 
-camera_queue = None
-video_queue = None
+frame_bus: LatestFrameBus = None
+frame_source: FrameSource = None
+video_buffer: VideoRingBuffer = None
+scene_encoder: SceneEncoder = None
 class_names: List[str] = []
 camera_width = 1280
 camera_height = 1280
 
-def put_image_in_queue(image_detection: Dict):
+def publish_frame(packet: FramePacket):
     """
-        Puts an image in the queue.
+        Publishes a processed frame to the frame bus and offers it to the scene encoder
+        or video buffer, which draw its annotations only for the frames they keep.
 
         Args:
-            image_detection (Dict): The image to put in the queue.
+            packet (FramePacket): The frame and its detections.
+    """
+    if frame_bus is not None:
+        frame_bus.publish(packet)
+    if video_buffer is not None:
+        video_buffer.add(packet)
+    if scene_encoder is not None:
+        scene_encoder.add(packet)
+
+def request_full_image() -> bool:
+    """
+        Asks the camera to capture the full-resolution image with the next frame.
+
+        Returns:
+            bool: Whether frames only carry their full-resolution image on request,
+                  so that consumers have to wait for a frame that has it.
     """
-    if camera_queue is not None:
-        if camera_queue.full():
-            camera_queue.get()
-        camera_queue.put(image_detection)
-    if video_queue is not None:
-        if video_queue.full():
-            video_queue.get()
-        video_queue.put(image_detection)
+    return frame_source is not None and frame_source.request_full_image()
 
 def preprocess_frame(frame: np.ndarray, model_h: int, model_w: int
 ) -> np.ndarray:
@@ -46,72 +67,67 @@ def preprocess_frame(frame: np.ndarray, model_h: int, model_w: int
 def extract_detections(
     hailo_output: List[np.ndarray], h: int, w: int, threshold: float = 0.5
 ) -> Dict[str, np.ndarray]:
-    """Extract detections from the HailoRT-postprocess output."""
-    xyxy: List[np.ndarray] = []
-    confidence: List[float] = []
-    class_id: List[int] = []
-    num_detections: int = 0
-
-    for i, detection in enumerate(hailo_output):
-        bbox, score = detection[:4], detection[4]
-
-        if score < threshold:
-            continue
-
-        # Convert bbox to xyxy absolute pixel values
-        bbox[0], bbox[1], bbox[2], bbox[3] = (
-            bbox[1] * w,
-            bbox[0] * h,
-            bbox[3] * w,
-            bbox[2] * h,
-        )
-
-        xyxy.append(bbox)
-        confidence.append(score)
-        class_id.append(i)
-        num_detections += 1
-
+    """Extract detections from the per-class HailoRT-postprocess output."""
+    xyxy, confidence, class_id = decode_nms(hailo_output, h, w, threshold)
     return {
-        "xyxy": np.array(xyxy),
-        "confidence": np.array(confidence),
-        "class_id": np.array(class_id),
-        "num_detections": num_detections,
+        "xyxy": xyxy,
+        "confidence": confidence,
+        "class_id": class_id,
+        "num_detections": len(class_id),
     }
 
 
-def postprocess_detections(
-    frame: np.ndarray,
-    detections: Dict[str, np.ndarray],
-    class_names: List[str],
-    tracker: sv.ByteTrack,
-    box_annotator: sv.RoundBoxAnnotator,
-    label_annotator: sv.LabelAnnotator,
-) -> np.ndarray:
-    """Postprocess the detections by annotating the frame with bounding boxes and labels."""
+def track_detections(detections: Dict[str, np.ndarray], tracker: sv.ByteTrack) -> sv.Detections:
+    """
+    Updates the tracker with the detections of a frame.
+
+    Args:
+        detections: The detections extracted from the inference results.
+        tracker: The tracker.
+
+    Returns:
+        The detections with their tracker ids.
+    """
     sv_detections = sv.Detections(
         xyxy=detections["xyxy"],
         confidence=detections["confidence"],
         class_id=detections["class_id"],
     )
+    return tracker.update_with_detections(sv_detections)
 
-    # Update detections with tracking information
-    sv_detections = tracker.update_with_detections(sv_detections)
-
+def annotate_detections(
+    frame: np.ndarray,
+    sv_detections: sv.Detections,
+    class_names: List[str],
+    box_annotator: sv.RoundBoxAnnotator,
+    label_annotator: sv.LabelAnnotator,
+    scale: Tuple[float, float] = (1.0, 1.0),
+) -> np.ndarray:
+    """
+    Annotates a copy of the frame with the bounding boxes and labels of tracked detections.
+    Detections are drawn scaled by scale, for frames smaller than the image the
+    detections refer to.
+    """
     # Generate tracked labels for annotated objects
     labels: List[str] = [
         f"#{tracker_id} {class_names[class_id]}"
         for class_id, tracker_id in zip(sv_detections.class_id, sv_detections.tracker_id)
     ]
 
+    drawn_detections = sv_detections
+    if scale != (1.0, 1.0):
+        drawn_detections = sv_detections[:]
+        drawn_detections.xyxy = sv_detections.xyxy * np.array([scale[0], scale[1], scale[0], scale[1]])
+
     # Annotate objects with bounding boxes
     annotated_frame: np.ndarray = box_annotator.annotate(
-        scene=frame.copy(), detections=sv_detections
+        scene=frame.copy(), detections=drawn_detections
     )
     # Annotate objects with labels
     annotated_labeled_frame: np.ndarray = label_annotator.annotate(
-        scene=annotated_frame, detections=sv_detections, labels=labels
+        scene=annotated_frame, detections=drawn_detections, labels=labels
     )
-    return annotated_labeled_frame, sv_detections
+    return annotated_labeled_frame
 
 def get_direction_to_object(object_name: str, detection_results: sv.Detections, object_id: int = 0) -> Dict | None:
     """
@@ -158,14 +174,81 @@ def get_coordinates_of_object(object_name: str, detection_results: sv.Detections
 
     return None
     
-def run(hef_path: str, labels_path: str, score_thresh: float = 0.5, annotations: bool = True):
-    input_queue: queue.Queue = queue.Queue()
+def create_host_decoder(hailo_inference: HailoAsyncInference, score_thresh: float, iou_thresh: float
+) -> YoloDecoder:
+    """
+    Creates a host-side YOLO decoder for a HEF compiled without on-chip NMS, using the
+    quantization parameters of its output vstreams.
+
+    Args:
+        hailo_inference: The inference of the HEF.
+        score_thresh: Score threshold for detections.
+        iou_thresh: IoU threshold for NMS.
+
+    Returns:
+        The decoder.
+    """
+    _, output_infos = hailo_inference.get_vstream_info()
+    quantization = {
+        info.name: (info.quant_info.qp_scale, info.quant_info.qp_zp) for info in output_infos
+    }
+    return YoloDecoder(
+        hailo_inference.get_input_shape(), num_classes=len(class_names), score_threshold=score_thresh,
+        iou_threshold=iou_thresh, quantization=quantization
+    )
+
+def run(hef_path: str, labels_path: str, score_thresh: float = 0.5, annotations: bool = True, in_flight: int = 4,
+        batch_size: int = 1, max_batch_wait: float = 0.02, host_nms: bool = False, iou_thresh: float = 0.45,
+        dual_stream: bool = False, source: FrameSource = None, display: str = DISPLAY_PREVIEW,
+        preview_fps: float = 10.0, broadcaster: FrameBroadcaster = None, gate: MotionGate = None,
+        roi: RoiSelector = None, tiles: TileGrid = None):
+    """
+    Runs the detection pipeline on the camera or another frame source.
+
+    Capture, preprocessing, inference and postprocessing run in their own threads
+    so that up to in_flight frames are being processed at once.
+
+    Args:
+        hef_path: Path to the HEF model.
+        labels_path: Path to a text file containing labels.
+        score_thresh: Score threshold for detections.
+        annotations: Whether the images shown, streamed and recorded are annotated with the detections.
+        in_flight: The number of frames allowed on the device and in postprocessing.
+        batch_size: The largest number of frames sent to the device as one job.
+        max_batch_wait: The longest a frame waits for its batch to fill in seconds.
+        host_nms: Whether the HEF has raw YOLO outputs that are decoded and NMS'd on the host.
+        iou_thresh: IoU threshold for host NMS.
+        dual_stream: Whether to feed inference from a lores stream at the model input size,
+            flipped by the ISP, with the full-resolution image of each frame captured alongside.
+        source: The frames to process. Defaults to the Pi camera.
+        display: The display policy: 'off', 'preview' or 'annotated' to preview only
+            when annotations are enabled. The preview is drawn on its own thread.
+        preview_fps: The highest rate at which the preview window is redrawn.
+        broadcaster: Streams the frames to web viewers, if set.
+        gate: Decides which frames are inferred, if set. The tracked boxes of the last
+            inferred frame are carried forward on the frames it skips.
+        roi: Crops the frames around the followed target before inference, if set. Its
+            model_size is set to the model input here. Ignored with tiles.
+        tiles: Runs inference on these overlapping tiles of each frame, sent to the device
+            as one batch, and merges their detections, if set. Replaces batch_size.
+    """
+    input_queue: queue.Queue = queue.Queue(maxsize=in_flight)
     output_queue: queue.Queue = queue.Queue()
 
+    device_batch_size, pool_size, tiles_per_frame = batch_size, max(in_flight, batch_size), None
+    if tiles is not None:
+        # The tiles of a frame are the device batch, and every tile in flight holds its own buffers
+        device_batch_size = tiles_per_frame = len(tiles)
+        batch_size, pool_size = 1, in_flight * len(tiles)
+        roi = None
+
     hailo_inference = HailoAsyncInference(
         hef_path=hef_path,
         input_queue=input_queue,
         output_queue=output_queue,
+        batch_size=device_batch_size,
+        send_original_frame=True,
+        pool_size=pool_size,
     )
     model_h, model_w, _ = hailo_inference.get_input_shape()
 
@@ -173,74 +256,127 @@ def run(hef_path: str, labels_path: str, score_thresh: float = 0.5, annotations:
     box_annotator = sv.RoundBoxAnnotator()
     label_annotator = sv.LabelAnnotator()
     tracker = sv.ByteTrack()
+    extrapolator = TrackExtrapolator()
 
     # Load class names from the labels file
     with open(labels_path, "r", encoding="utf-8") as f:
         global class_names
         class_names = f.read().splitlines()
 
+    host_decoder = create_host_decoder(hailo_inference, score_thresh, iou_thresh) if host_nms else None
+
     # Start the asynchronous inference in a separate thread
     inference_thread: threading.Thread = threading.Thread(target=hailo_inference.run)
     inference_thread.start()
 
-    # Initialize picamera2
-    picam2 = Picamera2()
-    picam2.configure(picam2.create_preview_configuration(main={"format": 'RGB888', "size": (camera_width, camera_height)}))
-    
-    picam2.start()
-    
-    # Continuously capture frames
-    while True:
-        image = picam2.capture_array()
-
-        # flip image
-        image = cv2.flip(image, 0)
-        image = cv2.flip(image, 1)
-
-        # Preprocess the frame
-        preprocessed_frame: np.ndarray = preprocess_frame(image, model_h, model_w)
-
-        # Put the frame into the input queue for inference
-        input_queue.put([preprocessed_frame])
+    # Initialize the frame source, by default picamera2. The tiles are cut from the
+    # full-resolution image, so with tiles it is copied for every frame.
+    if source is None:
+        source = Picamera2Source(camera_width, camera_height, dual_stream, lores_size=(model_w, model_h),
+                                 keep_full_images=tiles is not None)
+    source.start()
+    global frame_source
+    frame_source = source
+    main_w, main_h = source.full_size
+    annotation_scale = (source.size[0] / main_w, source.size[1] / main_h)
+    if roi is not None:
+        roi.model_size = (model_w, model_h)
+    # The crop of each inferred frame, keyed by the id of the frame, which postprocess receives
+    # again and which stays alive until then. Frames whose inference failed still take theirs back.
+    crops = {}
+    tile_boxes = tiles.boxes(source.full_size) if tiles is not None else None
+
+    def preprocess_tiles(image: np.ndarray, full_image: np.ndarray | None) -> List[np.ndarray]:
+        # The tiles are cut from the full-resolution image, as the model-sized lores frame
+        # of --dual_stream has no more detail to give them
+        if full_image is not None:
+            image = full_image
+        return [
+            preprocess_frame(tile, model_h, model_w) if tile.shape[:2] != (model_h, model_w) else tile
+            for tile in (crop_frame(image, box, source.full_size) for box in tile_boxes)
+        ]
+
+    def extract_tile_detections(results: List[List[np.ndarray]]) -> Dict[str, np.ndarray]:
+        decoded = [
+            extract_detections(host_decoder(tile_results) if host_decoder is not None else tile_results,
+                               y1 - y0, x1 - x0, score_thresh)
+            for tile_results, (x0, y0, x1, y1) in zip(results, tile_boxes)
+        ]
+        xyxy, confidence, class_id = merge_detections(
+            [d["xyxy"] for d in decoded], [d["confidence"] for d in decoded], [d["class_id"] for d in decoded],
+            tile_boxes, iou_thresh
+        )
+        return {"xyxy": xyxy, "confidence": confidence, "class_id": class_id, "num_detections": len(class_id)}
+
+    def preprocess(image: np.ndarray, full_image: np.ndarray | None) -> np.ndarray:
+        crop = roi.crop(source.full_size, source.size) if roi is not None else None
+        crops[id(image)] = crop
+        if crop is not None:
+            image = crop_frame(image, crop, source.full_size)
+        if image.shape[:2] == (model_h, model_w):
+            return image
+        return preprocess_frame(image, model_h, model_w)
+
+    def annotate(image: np.ndarray, sv_detections: sv.Detections) -> np.ndarray:
+        return annotate_detections(image, sv_detections, class_names, box_annotator, label_annotator, annotation_scale)
+
+    def postprocess(seq: int, timestamp: float, image: np.ndarray, results: List[np.ndarray] | None,
+                    full_image: np.ndarray | None):
+        crop = crops.pop(id(image), None)
+        if results is None:
+            # The frame skipped inference, or its inference failed, so the tracked boxes are carried forward
+            sv_detections = extrapolator.predict(timestamp)
+        else:
+            # Extract detections from the inference results, in full-frame pixels
+            if tiles is not None:
+                detections: Dict[str, np.ndarray] = extract_tile_detections(results)
+            else:
+                if host_decoder is not None:
+                    results = host_decoder(results)
+                if crop is None:
+                    detections = extract_detections(results, main_h, main_w, score_thresh)
+                else:
+                    x0, y0, x1, y1 = crop
+                    detections = extract_detections(results, y1 - y0, x1 - x0, score_thresh)
+                    detections["xyxy"] += np.array([x0, y0, x0, y0], dtype=detections["xyxy"].dtype)
+
+            # Track the detections; they are only drawn if a consumer asks for the annotated image
+            sv_detections = None
+            if detections["num_detections"] > 0:
+                sv_detections = track_detections(detections, tracker)
+            extrapolator.update(sv_detections, timestamp)
+            if roi is not None:
+                roi.update(sv_detections, timestamp, crop is not None)
+        packet = FramePacket(
+            seq, timestamp, image, sv_detections, annotate=annotate if annotations else None,
+            full_image=full_image
+        )
+        publish_frame(packet)
 
-        # Get the inference result from the output queue
-        results: List[np.ndarray]
-        _, results = output_queue.get()
+        if preview is not None:
+            preview.show(packet)
+        if broadcaster is not None:
+            broadcaster.publish(packet)
 
+    pipeline = CameraPipeline(
+        source.read_with_full_image, preprocess_tiles if tiles is not None else preprocess, postprocess,
+        input_queue, output_queue, in_flight=in_flight, batch_size=batch_size, max_batch_wait=max_batch_wait,
+        release=hailo_inference.release, gate=gate, tiles_per_frame=tiles_per_frame, full_images=True
+    )
 
-        # Extract detections from the inference results
-        detections: Dict[str, np.ndarray] = extract_detections(
-            results[0], picam2.stream_configuration("main")["size"][1], picam2.stream_configuration("main")["size"][0], score_thresh
-        )
+    # The preview is left out under a debugger, where the window stalls with the process
+    if is_debugging():
+        display = DISPLAY_OFF
+    preview = create_preview(display, annotations, preview_fps, on_quit=pipeline.stop)
 
-        # Check if any detections were found
-        if detections["num_detections"] > 0 and annotations: 
-            # Postprocess the detections and annotate the frame
-            annotated_labeled_frame, sv_detections = postprocess_detections(
-                image, detections, class_names, tracker, box_annotator, label_annotator
-            )
-
-            # Display the resulting frame
-            if not is_debugging():
-                cv2.imshow(f'preview', annotated_labeled_frame)
-            put_image_in_queue({'image': annotated_labeled_frame, 
-                                  'detections': sv_detections})
-        else:
-            if not is_debugging():
-                cv2.imshow(f'preview', image)
-            put_image_in_queue({'image': image, 
-                                  'detections': None})
-
-        # Break the loop if the 'q' key is pressed
-        if not is_debugging():
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
-
-    # Signal the inference thread to stop and wait for it to finish
-    input_queue.put(None)
-    inference_thread.join()
-
-    # Cleanup
-    if not is_debugging():
-        cv2.destroyAllWindows()
-    picam2.stop()
\ No newline at end of file
+    try:
+        pipeline.start().join()
+    finally:
+        # Signal the inference thread to stop and wait for it to finish
+        input_queue.put(None)
+        inference_thread.join()
+
+        # Cleanup
+        if preview is not None:
+            preview.stop()
+        source.stop()
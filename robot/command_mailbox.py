@@ -0,0 +1,116 @@
+import math
+import threading
+
+class CommandMailbox():
+    """
+        A latest-wins mailbox of joint setpoints in front of a Robot.
+
+        Producers such as a tracking loop post setpoints at any rate. A sender thread
+        takes everything pending, merges it into a single T:122 command and sends it.
+        A new setpoint for a joint replaces any pending one that has not been sent, so
+        the arm is always driven from the newest input instead of working through a
+        backlog of stale corrections.
+
+        Attributes:
+            _robot (Robot): The robot the setpoints are sent to.
+            _pending (dict): The unsent setpoints in degrees, keyed by joint letter (b, s, e, h).
+            _condition (threading.Condition): Guards _pending and wakes the sender thread.
+            _sending (bool): Whether the sender thread is sending a command.
+            _closed (bool): Whether the mailbox has been closed.
+            _thread (threading.Thread): The sender thread.
+            sent (int): The number of commands sent.
+            replaced (int): The number of setpoints replaced before they were sent.
+    """
+    _robot: object
+    _pending: dict
+    _condition: threading.Condition
+    _sending: bool
+    _closed: bool
+    _thread: threading.Thread
+    sent: int
+    replaced: int
+
+    def __init__(self, robot) -> None:
+        """
+            Initializes a new instance of the CommandMailbox class and starts its sender thread.
+
+            Args:
+                robot (Robot): The robot the setpoints are sent to.
+        """
+        self._robot = robot
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._sending = False
+        self._closed = False
+        self.sent = 0
+        self.replaced = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def set_joints(self, **degrees) -> None:
+        """
+            Posts absolute joint setpoints, replacing any unsent setpoints for the same joints.
+
+            Args:
+                degrees: The target angles in degrees keyed by joint letter (b, s, e, h).
+        """
+        with self._condition:
+            self.replaced += len(self._pending.keys() & degrees.keys())
+            self._pending.update(degrees)
+            self._condition.notify()
+
+    def move(self, instructions: dict) -> None:
+        """
+            Posts relative moves, such as those returned by get_direction_to_object,
+            measured from the arm's current feedback.
+
+            Args:
+                instructions (dict): The number of degrees to move keyed by direction (up, down, left, ...).
+        """
+        state = self._robot.get_feedback()
+        setpoints = {}
+        for direction, degrees in instructions.items():
+            joint = self._robot._directions[direction]['joint_letter']
+            sign = self._robot._directions[direction]['sign']
+            setpoints[joint] = setpoints.get(joint, math.degrees(state[joint])) + sign * degrees
+        self.set_joints(**setpoints)
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+            Waits until every pending setpoint has been sent.
+
+            Args:
+                timeout (float): The maximum number of seconds to wait.
+
+            Returns:
+                bool: True if the mailbox is empty, False if the timeout expired first.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._sending, timeout)
+
+    def close(self) -> None:
+        """
+            Sends any pending setpoints and stops the sender thread.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                setpoints, self._pending = self._pending, {}
+                self._sending = True
+            try:
+                self._robot.move_to_position(**setpoints)
+                self.sent += 1
+            except Exception as e:
+                print(f'Mailbox command failed: {e}')
+            finally:
+                with self._condition:
+                    self._sending = False
+                    self._condition.notify_all()
@@ -8,7 +8,11 @@ from tts import say
 import asyncio
 import time
 from robot import Robot
+from command_mailbox import CommandMailbox
+from frame_packet import FramePacket
 import json
+import io
+from contextlib import ExitStack
 from google.genai import types
 import inspect
 from functools import wraps
@@ -19,6 +23,60 @@ _current_context = {"telegram_bot": None, "chat_id": None}
 # Controller tools are now defined as actual Python functions below
 # The Gemini SDK will automatically convert them to function declarations
 
+def latest_frame() -> FramePacket | None:
+    """
+    Returns the latest processed frame without taking it from other readers, waiting
+    for the first frame if the camera has not published one yet.
+
+    Returns:
+        The frame with its image and detections, or None if no frame arrived in time.
+    """
+    if frame_bus is None:
+        return None
+    latest = frame_bus.wait_newer(0, FRAME_TIMEOUT)
+    return latest[1] if latest is not None else None
+
+def next_frame(full_image: bool = False) -> FramePacket | None:
+    """
+    Waits for the next processed frame, so that it was captured after the call,
+    e.g. after the arm has moved.
+
+    Args:
+        full_image: Whether the frame has to carry its full-resolution image. If the camera
+                    only captures it on request, it is asked for and frames without it are passed over.
+
+    Returns:
+        The frame with its image and detections, or None if no frame arrived in time.
+    """
+    if frame_bus is None:
+        return None
+    deadline = time.monotonic() + FRAME_TIMEOUT
+    seq, _ = frame_bus.latest()
+    while True:
+        # asked again for every frame, in case the frame that had it was dropped
+        on_request = full_image and camera_processor.request_full_image()
+        latest = frame_bus.wait_newer(seq, max(0.0, deadline - time.monotonic()))
+        if latest is None:
+            return None
+        seq, frame = latest
+        if not on_request or frame.full_image is not frame.frame:
+            return frame
+
+def scene_video() -> io.BytesIO | None:
+    """
+    Returns the recent footage as an MP4, remuxed from the segments the scene encoder
+    has already encoded, or encoded from the buffered frames without one.
+
+    Returns:
+        The MP4, or None if there is no footage.
+    """
+    if scene_encoder is not None:
+        return scene_encoder.clip()
+    image_array = video_buffer.frames() if video_buffer is not None else []
+    if not image_array:
+        return None
+    return camera_utils.create_mp4_from_images(image_array, fps=video_buffer.fps)
+
 def pick_up_object(object_name: str) -> dict:
     """
     Tells the robot to pick up the object input in the object_name parameter.
@@ -29,8 +87,12 @@ def pick_up_object(object_name: str) -> dict:
     Returns:
         A dictionary with status and message about the pickup operation.
     """
-    camera_metadata = camera_queue.get()
-    coordinates = camera_processor.get_coordinates_of_object(object_name, camera_metadata['detections'])
+    camera_metadata = latest_frame()
+    if camera_metadata is None:
+        return {"status": "error", "message": "No camera data available"}
+    coordinates = None
+    if camera_metadata.detections is not None:
+        coordinates = camera_processor.get_coordinates_of_object(object_name, camera_metadata.detections)
     print(coordinates)
     if coordinates is not None:
         hailo_bot.move_to_coordinates_for_pickup(x=coordinates[0], y=coordinates[1], z=coordinates[2])
@@ -65,8 +127,12 @@ def drop_off_object(location: str) -> dict:
     return {"status": "success", "message": f"Dropped off object at {location}"}
 
 def detect_object(object_name: str):
-    # get image from queue
-    camera_metadata = camera_queue.get()['image']
+    # get a frame captured after any motion of the arm
+    frame = next_frame(full_image=True)
+    if frame is None:
+        return None, None
+    # the raw full-resolution image, so the bounding boxes are not drawn over
+    camera_metadata = frame.full_image
     # convert image to byte array
     img = camera_utils.convert_array_image_PIL(camera_metadata, 'JPEG')
     # prompt the AI bot to identify the object in the image
@@ -134,8 +200,9 @@ def get_camera_metadata() -> dict:
     telegram_bot = _current_context.get("telegram_bot")
     chat_id = _current_context.get("chat_id")
     
-    if camera_queue is not None:
-        camera_metadata = camera_queue.get()['image']
+    frame = latest_frame()
+    if frame is not None:
+        camera_metadata = frame.annotated
         img_byte_arr, img = camera_utils.convert_array_image(camera_metadata, 'PNG')
         
         # Get VN response
@@ -159,8 +226,9 @@ def get_camera_image() -> dict:
     telegram_bot = _current_context.get("telegram_bot")
     chat_id = _current_context.get("chat_id")
     
-    if camera_queue is not None:
-        camera_metadata = camera_queue.get()['image']
+    frame = latest_frame()
+    if frame is not None:
+        camera_metadata = frame.annotated
         img_byte_arr, img = camera_utils.convert_array_image(camera_metadata, 'PNG')
         if telegram_bot and chat_id:
             telegram_bot.send_photo(chat_id, photo=img_byte_arr)
@@ -178,17 +246,10 @@ def get_scene() -> dict:
     telegram_bot = _current_context.get("telegram_bot")
     chat_id = _current_context.get("chat_id")
     
-    if video_queue is not None:
-        image_array = []
-        while not video_queue.empty():
-            image_array.append(video_queue.get()['image'])
-        
-        video_data = camera_utils.create_mp4_from_images(image_array)
-        video_data.seek(0)
-
-        if video_data is not None and telegram_bot and chat_id:
-            telegram_bot.send_video(chat_id=chat_id, video=video_data)
-            return {"status": "success", "message": "Video captured and sent"}
+    video_data = scene_video()
+    if video_data is not None and telegram_bot and chat_id:
+        telegram_bot.send_video(chat_id=chat_id, video=video_data)
+        return {"status": "success", "message": "Video captured and sent"}
     
     return {"status": "error", "message": "No video data available"}
 
@@ -202,13 +263,8 @@ def describe_scene() -> dict:
     telegram_bot = _current_context.get("telegram_bot")
     chat_id = _current_context.get("chat_id")
     
-    if video_queue is not None:
-        image_array = []
-        while not video_queue.empty():
-            image_array.append(video_queue.get()['image'])
-        
-        video_data = camera_utils.create_mp4_from_images(image_array)
-        video_data.seek(0)
+    video_data = scene_video()
+    if video_data is not None:
         
         # Debug
         #if video_data:
@@ -318,7 +374,7 @@ def process_audio(downloaded_file, telegram_bot: telebot.TeleBot, chat_id: int):
     print(f'transcription: {transcription}')
     send_message_to_AI(transcription, telegram_bot, chat_id)
 
-def send_action_to_robot(message: str) -> dict:
+def send_action_to_robot(message: str, wait: bool = True) -> dict:
     """
     Sends an action command to the robot.
     
@@ -342,11 +398,16 @@ def send_action_to_robot(message: str) -> dict:
             - "hold": Make the robot hold an object
             - "release": Make the robot release an object
             - "throw": Make the robot throw an object
+        wait (bool): Whether to wait for the action to finish. If False the action is
+            started in the background and the function returns immediately.
         
     Returns:
         A dictionary with status and message about the action execution.
     """
-    hailo_bot.do_action(message)
+    motion = hailo_bot.submit_action(message)
+    if not wait:
+        return {"status": "success", "message": f"Started robot action: {message}"}
+    motion.result()
     return {"status": "success", "message": f"Executed robot action: {message}"}
 
 def list_commands(telegram_bot: telebot.TeleBot, chat_id: int):
@@ -379,28 +440,42 @@ def track(object_name: str, object_id: str) -> dict:
     """
     global tracking
     tracking = False
-    if camera_queue is not None:
+    if frame_bus is not None:
         tracking = True
-        tracking_counter = 0
-        while tracking:
-            detections = camera_queue.get()['detections']
-            instructions = camera_processor.get_direction_to_object(object_name, detections, object_id)
-            if instructions is not None:
-                if 'up' in instructions:
-                    hailo_bot.move_up(instructions['up'])
-                if 'down' in instructions:
-                    hailo_bot.move_down(instructions['down'])
-                if 'left' in instructions:
-                    hailo_bot.move_left(instructions['left'])
-                if 'right' in instructions: 
-                    hailo_bot.move_right(instructions['right'])
-                tracking_counter = 0
-            else:
-                tracking_counter = tracking_counter + 1
-                if tracking_counter > 25:
-                    tracking = False
-                    break
-            time.sleep(0.25)
+        last_seen = time.monotonic()
+        seq = 0
+        # Corrections from every frame go through a latest-wins mailbox, so a slow arm
+        # or network drops stale corrections instead of queueing them up.
+        mailbox = CommandMailbox(hailo_bot)
+        # Only stop the poller afterwards if it was not already running, e.g. from Robot(poll_rate=...)
+        started_poller = hailo_bot.start_state_poller(TRACKING_POLL_RATE)
+        try:
+            with ExitStack() as stack:
+                # Run inference on every frame while tracking, whatever the scene's motion,
+                # and on a crop around the object once it has been seen
+                if inference_gate is not None:
+                    stack.enter_context(inference_gate.full_rate())
+                if roi_selector is not None and object_name in camera_processor.class_names:
+                    tracker_id = int(object_id) if str(object_id).isdigit() else 0
+                    stack.enter_context(roi_selector.follow(camera_processor.class_names.index(object_name), tracker_id))
+                while tracking:
+                    # Each frame is read once, and other readers still see it
+                    latest = frame_bus.wait_newer(seq, FRAME_TIMEOUT)
+                    instructions = None
+                    if latest is not None:
+                        seq, frame = latest
+                        if frame.detections is not None:
+                            instructions = camera_processor.get_direction_to_object(object_name, frame.detections, object_id)
+                    if instructions is not None:
+                        mailbox.move(instructions)
+                        last_seen = time.monotonic()
+                    elif time.monotonic() - last_seen > TRACKING_TIMEOUT:
+                        tracking = False
+                        break
+        finally:
+            mailbox.close()
+            if started_poller:
+                hailo_bot.stop_state_poller()
         
         return {"status": "success", "message": f"Tracked {object_name} (ID: {object_id})"}
     
@@ -419,7 +494,7 @@ def wait(time_seconds: int) -> dict:
 # Initialize the bot and robot
 BOT_TOKEN = os.environ.get('TELEGRAM_TOKEN')
 bot = telebot.TeleBot(BOT_TOKEN)
-hailo_bot = Robot(speed=20, acceleration=10)
+hailo_bot = Robot(speed=20, acceleration=10, settle=True)
 ROBOT_COMMANDS = Robot.get_actions()
 
 # Define controller tools as actual Python functions for automatic function calling
@@ -438,6 +513,12 @@ _controller_tools = [
 ]
 
 ai_chat_bot: ai_chat.AIChat = ai_chat.GeminiChat(_controller_tools)
-camera_queue = None
-video_queue = None
-tracking = False
\ No newline at end of file
+frame_bus = None
+video_buffer = None
+scene_encoder = None
+inference_gate = None
+roi_selector = None
+tracking = False
+TRACKING_TIMEOUT = 6.0
+FRAME_TIMEOUT = 5.0
+TRACKING_POLL_RATE = 10.0
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""Decoding of HailoRT NMS output into supervision detections."""
+
+from typing import List, Tuple
+import numpy as np
+import supervision as sv
+
+def _per_class(hailo_output: list) -> list:
+    """
+    Returns the per-class list of an NMS output, unwrapping a single-image batch.
+
+    Args:
+        hailo_output: The NMS output of one image, or a batch holding one image.
+
+    Returns:
+        One (n, 5) array of [y_min, x_min, y_max, x_max, score] rows per class.
+    """
+    if len(hailo_output) > 0 and isinstance(hailo_output[0], (list, tuple)):
+        return hailo_output[0]
+    return hailo_output
+
+def decode_nms(hailo_output: list, h: int, w: int, threshold: float = 0.5
+               ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decodes the per-class NMS output of HailoRT in bulk.
+
+    The ragged per-class arrays are stacked into one array with a matching class
+    id per row, then thresholded and converted from normalized y/x boxes to pixel
+    x/y boxes with whole-array operations.
+
+    Args:
+        hailo_output: One (n, 5) array of [y_min, x_min, y_max, x_max, score] rows per class.
+        h: The height of the image the boxes are scaled to.
+        w: The width of the image the boxes are scaled to.
+        threshold: The minimum score of a detection.
+
+    Returns:
+        The (n, 4) float32 xyxy boxes in pixels, the (n,) confidences and the (n,) class ids.
+    """
+    per_class = _per_class(hailo_output)
+    counts = np.fromiter((len(detections) for detections in per_class), dtype=np.intp, count=len(per_class))
+    if counts.sum() == 0:
+        return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.float32), np.empty(0, dtype=int)
+    rows = np.concatenate([np.asarray(detections, dtype=np.float32).reshape(-1, 5)
+                           for detections, count in zip(per_class, counts) if count])
+    class_id = np.repeat(np.arange(len(per_class)), counts)
+    keep = rows[:, 4] >= threshold
+    rows, class_id = rows[keep], class_id[keep]
+    xyxy = rows[:, [1, 0, 3, 2]] * np.array([w, h, w, h], dtype=np.float32)
+    return xyxy, rows[:, 4], class_id
+
+def nms_to_detections(hailo_output: list, h: int, w: int, threshold: float = 0.5) -> sv.Detections:
+    """
+    Decodes the per-class NMS output of HailoRT straight into supervision detections.
+
+    Args:
+        hailo_output: One (n, 5) array of [y_min, x_min, y_max, x_max, score] rows per class.
+        h: The height of the image the boxes are scaled to.
+        w: The width of the image the boxes are scaled to.
+        threshold: The minimum score of a detection.
+
+    Returns:
+        The detections.
+    """
+    xyxy, confidence, class_id = decode_nms(hailo_output, h, w, threshold)
+    return sv.Detections(xyxy=xyxy, confidence=confidence, class_id=class_id)
+
+def decode_nms_loop(hailo_output: list, h: int, w: int, threshold: float = 0.5
+                    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decodes the per-class NMS output one detection at a time. This is the reference
+    the vectorized decode_nms is tested and benchmarked against.
+
+    Args:
+        hailo_output: One (n, 5) array of [y_min, x_min, y_max, x_max, score] rows per class.
+        h: The height of the image the boxes are scaled to.
+        w: The width of the image the boxes are scaled to.
+        threshold: The minimum score of a detection.
+
+    Returns:
+        The (n, 4) xyxy boxes in pixels, the (n,) confidences and the (n,) class ids.
+    """
+    xyxy: List[List[float]] = []
+    confidence: List[float] = []
+    class_id: List[int] = []
+    for i, detections in enumerate(_per_class(hailo_output)):
+        for detection in detections:
+            bbox, score = detection[:4], detection[4]
+            if score < threshold:
+                continue
+            xyxy.append([bbox[1] * w, bbox[0] * h, bbox[3] * w, bbox[2] * h])
+            confidence.append(score)
+            class_id.append(i)
+    return np.array(xyxy).reshape(-1, 4), np.array(confidence), np.array(class_id, dtype=int)
@@ -0,0 +1,69 @@
+import threading
+from typing import Any, Tuple
+
+class LatestFrameBus():
+    """
+        Hands the latest processed frame to any number of readers.
+
+        The camera thread publishes each frame with publish(), which replaces the
+        previous one and numbers it. Readers never remove a frame: latest() returns
+        the current frame without waiting or taking a lock, and wait_newer() blocks
+        until a frame newer than the one a reader last saw arrives. Every reader
+        gets the same object, so frames are not copied and must not be modified.
+
+        Attributes:
+            _latest (tuple): The (seq, frame) of the latest frame, replaced as a whole on publish.
+            _condition (threading.Condition): Wakes readers waiting for a newer frame.
+    """
+    _latest: Tuple[int, Any] = (0, None)
+    _condition: threading.Condition
+
+    def __init__(self) -> None:
+        """
+            Initializes a new instance of the LatestFrameBus class with no frame.
+        """
+        self._condition = threading.Condition()
+
+    def publish(self, frame: Any) -> int:
+        """
+            Publishes a frame, replacing the previous one.
+
+            Args:
+                frame: The frame.
+
+            Returns:
+                int: The sequence number of the frame, starting at 1.
+        """
+        with self._condition:
+            seq = self._latest[0] + 1
+            self._latest = (seq, frame)
+            self._condition.notify_all()
+        return seq
+
+    def latest(self) -> Tuple[int, Any]:
+        """
+            Returns the latest frame without waiting.
+
+            Returns:
+                tuple: The (seq, frame) of the latest frame, or (0, None) before the first frame.
+        """
+        return self._latest
+
+    def wait_newer(self, seq: int = 0, timeout: float = None) -> Tuple[int, Any] | None:
+        """
+            Returns the latest frame once it is newer than seq, waiting for it if needed.
+
+            Args:
+                seq (int): The sequence number of the last frame seen, or 0 for any frame.
+                timeout (float): The longest to wait in seconds, or None to wait indefinitely.
+
+            Returns:
+                tuple: The (seq, frame) of the latest frame, or None if no newer frame arrived in time.
+        """
+        latest = self._latest
+        if latest[0] > seq:
+            return latest
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._latest[0] > seq, timeout):
+                return None
+            return self._latest
@@ -0,0 +1,91 @@
+import threading
+from typing import Callable
+import numpy as np
+import supervision as sv
+
+class FramePacket():
+    """
+        A processed frame as handed to the consumers of the camera feed.
+
+        The annotated image is only drawn the first time it is asked for, then kept,
+        so frames nobody displays, streams or sends never pay for the copy and the
+        drawing. Packets are shared between threads and must be treated as read-only.
+
+        full_image is always the raw capture, without annotations: the full-resolution
+        image captured with the frame when the frame itself was read from a smaller
+        stream, otherwise the frame. A smaller stream only captures it on request,
+        see FrameSource.request_full_image.
+
+        Attributes:
+            seq (int): The sequence number of the frame, in capture order.
+            timestamp (float): The wall-clock capture time of the frame.
+            frame (np.ndarray): The captured BGR frame.
+            full_image (np.ndarray): The captured BGR frame at the highest resolution captured, without annotations.
+            detections (sv.Detections): The tracked detections, or None if nothing was detected.
+            _annotate (Callable): Draws detections on a copy of a frame, or None to show the frame as captured.
+            _annotated (np.ndarray): The annotated image, once drawn.
+            _lock (threading.Lock): Makes sure the annotated image is drawn once.
+    """
+    __slots__ = ('seq', 'timestamp', 'frame', 'full_image', 'detections', '_annotate', '_annotated', '_lock')
+    seq: int
+    timestamp: float
+    frame: np.ndarray
+    full_image: np.ndarray
+    detections: sv.Detections
+    _annotate: Callable
+    _annotated: np.ndarray
+    _lock: threading.Lock
+
+    def __init__(self, seq: int, timestamp: float, frame: np.ndarray, detections: sv.Detections = None,
+                 annotate: Callable = None, full_image: np.ndarray = None) -> None:
+        """
+            Initializes a new instance of the FramePacket class.
+
+            Args:
+                seq (int): The sequence number of the frame.
+                timestamp (float): The wall-clock capture time of the frame.
+                frame (np.ndarray): The captured BGR frame.
+                detections (sv.Detections): The tracked detections, or None if nothing was detected.
+                annotate (Callable): Called as annotate(frame, detections) to draw the annotated image.
+                full_image (np.ndarray): The full-resolution image captured with the frame, for frames
+                                         read from a lores stream. Defaults to the frame.
+        """
+        self.seq = seq
+        self.timestamp = timestamp
+        self.frame = frame
+        self.full_image = full_image if full_image is not None else frame
+        self.detections = detections
+        self._annotate = annotate
+        self._annotated = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracker_ids(self) -> np.ndarray:
+        """The tracker ids of the detections."""
+        if self.detections is None or self.detections.tracker_id is None:
+            return np.empty(0, dtype=int)
+        return self.detections.tracker_id
+
+    @property
+    def annotated(self) -> np.ndarray:
+        """The frame with the detections drawn on it, drawn on first access."""
+        if self._annotated is None:
+            with self._lock:
+                if self._annotated is None:
+                    if self._annotate is None or self.detections is None or len(self.detections) == 0:
+                        self._annotated = self.frame
+                    else:
+                        self._annotated = self._annotate(self.frame, self.detections)
+        return self._annotated
+
+def as_image(frame: np.ndarray | FramePacket) -> np.ndarray:
+    """
+    Returns the image to show for a frame, drawing the annotations of a packet if needed.
+
+    Args:
+        frame: A BGR image or a frame packet.
+
+    Returns:
+        The BGR image.
+    """
+    return frame.annotated if isinstance(frame, FramePacket) else frame
@@ -0,0 +1,325 @@
+import os
+import time
+from pathlib import Path
+from typing import Tuple
+import cv2
+import numpy as np
+from camera_capture import DualStreamCapture
+
+class FrameSource():
+    """
+        Base class for the sources of frames fed to the detection pipeline.
+
+        Frames are BGR arrays in the same layout as the Picamera2 RGB888 stream.
+        Sources that are not a live camera can be paced to their frame rate, to
+        replay footage as if it were live, or read as fast as possible.
+
+        Attributes:
+            size (tuple): The (width, height) of the frames returned by read().
+            full_size (tuple): The (width, height) of the full-resolution frames.
+            fps (float): The frame rate of the source.
+            realtime (bool): Whether read() waits so frames are returned at fps.
+            frames (int): The number of frames to read before the source is exhausted, or None for no limit.
+            _frames_read (int): The number of frames read.
+            _next_time (float): The monotonic time at which the next frame is due.
+    """
+    size: Tuple[int, int]
+    full_size: Tuple[int, int]
+    fps: float = 0.0
+    realtime: bool = False
+    frames: int = None
+    _frames_read: int = 0
+    _next_time: float = None
+
+    def start(self) -> 'FrameSource':
+        """
+            Starts the source.
+
+            Returns:
+                FrameSource: This source.
+        """
+        return self
+
+    def stop(self) -> None:
+        """
+            Stops the source and releases its resources.
+        """
+        pass
+
+    def read(self) -> np.ndarray:
+        """
+            Returns the next frame, waiting for it to be due in realtime mode.
+
+            Returns:
+                np.ndarray: The frame, or None when the source is exhausted.
+        """
+        captured = self.read_with_full_image()
+        return captured[0] if captured is not None else None
+
+    def read_with_full_image(self) -> Tuple[np.ndarray, np.ndarray] | None:
+        """
+            Returns the next frame together with the full-resolution image captured with
+            it, waiting for it to be due in realtime mode.
+
+            Returns:
+                tuple: The frame and its full-resolution image, which is None if the frame is
+                       already full resolution or the image was not captured, or None when the
+                       source is exhausted.
+        """
+        if self.frames is not None and self._frames_read >= self.frames:
+            return None
+        frame, full_image = self._read_with_full_image()
+        if frame is None:
+            return None
+        self._frames_read += 1
+        if self.realtime and self.fps > 0:
+            now = time.monotonic()
+            if self._next_time is None:
+                self._next_time = now
+            if self._next_time > now:
+                time.sleep(self._next_time - now)
+            self._next_time = max(self._next_time + 1.0 / self.fps, time.monotonic() - 1.0 / self.fps)
+        return frame, full_image
+
+    def request_full_image(self) -> bool:
+        """
+            Asks for the full-resolution image to be captured with the next frame, for
+            sources that only capture it on request.
+
+            Returns:
+                bool: Whether the source captures it on request. Otherwise every frame already has it.
+        """
+        return False
+
+    def _read(self) -> np.ndarray:
+        raise NotImplementedError
+
+    def _read_with_full_image(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Sources whose frames are smaller than full_size read both images of a frame here
+        return self._read(), None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+class Picamera2Source(FrameSource):
+    """
+        Reads frames from the Pi camera, either as full-resolution frames flipped on
+        the CPU or, in dual-stream mode, as model-size lores frames flipped by the ISP.
+
+        Attributes:
+            _camera (Picamera2): The camera, in single-stream mode.
+            _dual_capture (DualStreamCapture): The dual-stream capture, in dual-stream mode.
+    """
+    _camera: object = None
+    _dual_capture: DualStreamCapture = None
+
+    def __init__(self, width: int = 1280, height: int = 1280, dual_stream: bool = False,
+                 lores_size: Tuple[int, int] = None, keep_full_images: bool = False, camera=None) -> None:
+        """
+            Initializes a new instance of the Picamera2Source class and configures the camera.
+
+            Args:
+                width (int): The width of the full-resolution frames.
+                height (int): The height of the full-resolution frames.
+                dual_stream (bool): Whether to read model-size lores frames, each with its full-resolution image.
+                lores_size (tuple): The (width, height) of the lores frames, usually the model input size.
+                keep_full_images (bool): Whether, in dual-stream mode, every frame is read with its
+                                         full-resolution image rather than only on request.
+                camera: The Picamera2 to use. Defaults to a new Picamera2().
+        """
+        self.full_size = (width, height)
+        if dual_stream:
+            self._dual_capture = DualStreamCapture(self.full_size, lores_size, keep_main=keep_full_images, camera=camera)
+            self.size = self._dual_capture.lores_size
+        else:
+            if camera is None:
+                from picamera2 import Picamera2
+                camera = Picamera2()
+            camera.configure(camera.create_preview_configuration(main={"format": 'RGB888', "size": self.full_size}))
+            self._camera = camera
+            self.size = self.full_size
+
+    def start(self) -> 'Picamera2Source':
+        if self._dual_capture is not None:
+            self._dual_capture.start()
+        else:
+            self._camera.start()
+        return self
+
+    def stop(self) -> None:
+        if self._dual_capture is not None:
+            self._dual_capture.stop()
+        else:
+            self._camera.stop()
+
+    def request_full_image(self) -> bool:
+        if self._dual_capture is None:
+            return False
+        self._dual_capture.request_main()
+        return True
+
+    def _read_with_full_image(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._dual_capture is not None:
+            return self._dual_capture.capture()
+        return self._read(), None
+
+    def _read(self) -> np.ndarray:
+        image = self._camera.capture_array()
+
+        # flip image
+        image = cv2.flip(image, 0)
+        return cv2.flip(image, 1)
+
+class VideoFileSource(FrameSource):
+    """
+        Reads frames from a video file.
+
+        Attributes:
+            _path (str): The path of the video file.
+            _loop (bool): Whether to restart the video when it ends.
+            _capture (cv2.VideoCapture): The open video.
+    """
+    _path: str
+    _loop: bool
+    _capture: cv2.VideoCapture
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False) -> None:
+        """
+            Initializes a new instance of the VideoFileSource class.
+
+            Args:
+                path (str): The path of the video file.
+                realtime (bool): Whether frames are returned at the frame rate of the video.
+                loop (bool): Whether to restart the video when it ends.
+        """
+        self._path = path
+        self._loop = loop
+        self.realtime = realtime
+        self._capture = cv2.VideoCapture(path)
+        if not self._capture.isOpened():
+            raise ValueError(f'Could not open video file {path}')
+        self.fps = self._capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self.size = (int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self.full_size = self.size
+
+    def stop(self) -> None:
+        self._capture.release()
+
+    def _read(self) -> np.ndarray:
+        ok, frame = self._capture.read()
+        if not ok and self._loop:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self._capture.read()
+        return frame if ok else None
+
+class ImageDirectorySource(FrameSource):
+    """
+        Reads frames from an image file or a directory of images, in file name order.
+
+        Attributes:
+            _images (list): The images to read.
+            _loop (bool): Whether to start again after the last image.
+            _index (int): The index of the next image.
+    """
+    _images: list
+    _loop: bool
+    _index: int = 0
+
+    def __init__(self, path: str, fps: float = 10.0, realtime: bool = False, loop: bool = False) -> None:
+        """
+            Initializes a new instance of the ImageDirectorySource class.
+
+            Args:
+                path (str): The path of an image or of a directory of images.
+                fps (float): The frame rate used in realtime mode.
+                realtime (bool): Whether images are returned at fps.
+                loop (bool): Whether to start again after the last image.
+        """
+        from utils import load_input_images
+        images = sorted(load_input_images(path), key=lambda image: image.filename)
+        if not images:
+            raise ValueError(f'No valid images found in {path}')
+        # PIL images are RGB; the pipeline works on BGR frames like the camera's.
+        self._images = [cv2.cvtColor(np.asarray(image.convert('RGB')), cv2.COLOR_RGB2BGR) for image in images]
+        self._loop = loop
+        self.fps = fps
+        self.realtime = realtime
+        height, width = self._images[0].shape[:2]
+        self.size = self.full_size = (width, height)
+
+    def _read(self) -> np.ndarray:
+        if self._index >= len(self._images):
+            if not self._loop:
+                return None
+            self._index = 0
+        image = self._images[self._index]
+        self._index += 1
+        return image
+
+class SyntheticSource(FrameSource):
+    """
+        Generates frames of a box moving across a gradient, for benchmarks and tests
+        that need a deterministic source.
+
+        Attributes:
+            _background (np.ndarray): The gradient background.
+            _count (int): The number of frames generated.
+    """
+    _background: np.ndarray
+    _count: int = 0
+
+    def __init__(self, width: int = 1280, height: int = 1280, fps: float = 30.0, realtime: bool = False,
+                 frames: int = None) -> None:
+        """
+            Initializes a new instance of the SyntheticSource class.
+
+            Args:
+                width (int): The width of the frames.
+                height (int): The height of the frames.
+                fps (float): The frame rate used in realtime mode.
+                realtime (bool): Whether frames are returned at fps.
+                frames (int): The number of frames to generate, or None for no limit.
+        """
+        self.size = self.full_size = (width, height)
+        self.fps = fps
+        self.realtime = realtime
+        self.frames = frames
+        gradient = np.linspace(0, 255, width, dtype=np.uint8)
+        self._background = np.ascontiguousarray(np.broadcast_to(gradient[None, :, None], (height, width, 3)))
+
+    def _read(self) -> np.ndarray:
+        width, height = self.size
+        box = min(width, height) // 8
+        x = (self._count * 8) % max(1, width - box)
+        y = (height - box) // 2
+        frame = self._background.copy()
+        frame[y:y + box, x:x + box] = (0, 0, 255)
+        self._count += 1
+        return frame
+
+def create_frame_source(source: str, width: int = 1280, height: int = 1280, dual_stream: bool = False,
+                        lores_size: Tuple[int, int] = None, realtime: bool = True) -> FrameSource:
+    """
+    Creates a frame source from a command line value.
+
+    Args:
+        source: 'camera', 'synthetic', a video file or an image file or directory.
+        width: The width of camera and synthetic frames.
+        height: The height of camera and synthetic frames.
+        dual_stream: Whether the camera reads model-size lores frames.
+        lores_size: The (width, height) of lores frames.
+        realtime: Whether file and synthetic sources are paced to their frame rate.
+
+    Returns:
+        The frame source.
+    """
+    if source == 'camera':
+        return Picamera2Source(width, height, dual_stream, lores_size)
+    if source == 'synthetic':
+        return SyntheticSource(width, height, realtime=realtime)
+    if os.path.isdir(source) or Path(source).suffix.lower() in ('.jpg', '.png', '.bmp', '.jpeg'):
+        return ImageDirectorySource(source, realtime=realtime)
+    return VideoFileSource(source, realtime=realtime)
@@ -0,0 +1,212 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+import cv2
+import numpy as np
+import supervision as sv
+
+class MotionGate():
+    """
+        Decides per captured frame whether it is worth running the detector on.
+
+        Each frame is reduced to a small grey thumbnail and compared with the
+        thumbnail of the last frame sent to inference. A frame is inferred when
+        anything in it has moved since, but no more often than max_fps, and at
+        least min_fps frames are inferred even when the scene is still, so new
+        objects and slow drift are picked up. Comparing against the last inferred
+        frame rather than the previous frame means slow changes add up until
+        they are large enough to trigger inference.
+
+        While any caller holds full_rate(), e.g. while the arm is tracking an
+        object, every frame is inferred.
+
+        Attributes:
+            min_fps (float): The lowest inference rate, on a still scene.
+            max_fps (float): The highest inference rate on a moving scene, or 0 for every frame.
+            threshold (float): The change in grey levels some pixel of the thumbnail must
+                reach for the frame to count as moving. 0 infers every frame.
+            inferred (int): The number of frames let through to inference.
+            skipped (int): The number of frames skipped.
+            _last_time (float): The capture time of the last inferred frame.
+            _last_thumbnail (np.ndarray): The thumbnail of the last inferred frame.
+            _full_rate (int): The number of callers holding full_rate().
+            _lock (threading.Lock): Guards _full_rate.
+    """
+    min_fps: float
+    max_fps: float
+    threshold: float
+    inferred: int = 0
+    skipped: int = 0
+    _last_time: float = None
+    _last_thumbnail: np.ndarray = None
+    _full_rate: int = 0
+    _lock: threading.Lock
+
+    _thumbnail_size: Tuple[int, int] = (64, 64)
+
+    def __init__(self, min_fps: float = 2.0, max_fps: float = 0.0, threshold: float = 6.0) -> None:
+        """
+            Initializes a new instance of the MotionGate class.
+
+            Args:
+                min_fps (float): The lowest inference rate, on a still scene.
+                max_fps (float): The highest inference rate on a moving scene, or 0 for every frame.
+                threshold (float): The change in grey levels that counts as motion. 0 infers every frame.
+        """
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.threshold = threshold
+        self._lock = threading.Lock()
+
+    @property
+    def at_full_rate(self) -> bool:
+        """Whether every frame is being inferred because a caller holds full_rate()."""
+        return self._full_rate > 0
+
+    @contextmanager
+    def full_rate(self) -> Iterator['MotionGate']:
+        """
+            Infers every frame for the duration of the context, starting with the next frame captured.
+
+            Yields:
+                MotionGate: This gate.
+        """
+        with self._lock:
+            self._full_rate += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._full_rate -= 1
+
+    def __call__(self, frame: np.ndarray, timestamp: float = None) -> bool:
+        """
+            Decides whether a frame is sent to inference.
+
+            Args:
+                frame (np.ndarray): The captured BGR frame.
+                timestamp (float): The capture time of the frame. Defaults to now.
+
+            Returns:
+                bool: Whether to run the detector on the frame.
+        """
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        infer = self.at_full_rate or self.threshold <= 0 or self._last_time is None
+        elapsed = timestamp - self._last_time if self._last_time is not None else 0.0
+        if not infer and self.min_fps > 0 and elapsed >= 1.0 / self.min_fps:
+            infer = True
+        thumbnail = None
+        # A small tolerance so a camera running at exactly max_fps is not subsampled by jitter
+        if not infer and (self.max_fps <= 0 or elapsed >= 0.9 / self.max_fps):
+            thumbnail = self._thumbnail(frame)
+            infer = cv2.absdiff(thumbnail, self._last_thumbnail).max() >= self.threshold
+        if not infer:
+            self.skipped += 1
+            return False
+        self.inferred += 1
+        self._last_time = timestamp
+        self._last_thumbnail = thumbnail if thumbnail is not None else self._thumbnail(frame)
+        return True
+
+    def stats(self) -> dict:
+        """
+            Returns a summary of the gate for logs and diagnostics.
+
+            Returns:
+                dict: The frames inferred and skipped, and the share of frames inferred.
+        """
+        total = self.inferred + self.skipped
+        return {
+            "inferred": self.inferred,
+            "skipped": self.skipped,
+            "inferred_ratio": self.inferred / total if total else 0.0,
+            "full_rate": self.at_full_rate,
+        }
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        # Area averaging down to the thumbnail also averages out sensor noise, so comparing
+        # the largest change catches a small object moving without tripping on noise
+        thumbnail = cv2.resize(frame, self._thumbnail_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY) if thumbnail.ndim == 3 else thumbnail
+
+class TrackExtrapolator():
+    """
+        Carries tracked boxes across frames that skipped inference.
+
+        After each inferred frame the tracked detections are recorded along with
+        each track's velocity since the previous inferred frame it appeared in.
+        On skipped frames the boxes are moved on at that velocity, for at most
+        max_extrapolation seconds, and keep their tracker ids. The tracker itself
+        is only updated on inferred frames, so skipped frames do not age tracks
+        out of its lost track buffer.
+
+        Attributes:
+            max_extrapolation (float): The longest boxes are moved on for after an inferred frame, in seconds.
+            _detections (sv.Detections): The tracked detections of the last inferred frame.
+            _velocities (np.ndarray): The velocity of each box's corners in pixels per second.
+            _time (float): The capture time of the last inferred frame.
+            _history (dict): The last box and capture time of each tracker id.
+    """
+    max_extrapolation: float
+    _detections: sv.Detections = None
+    _velocities: np.ndarray = None
+    _time: float = None
+    _history: Dict[int, Tuple[np.ndarray, float]]
+
+    def __init__(self, max_extrapolation: float = 0.5) -> None:
+        """
+            Initializes a new instance of the TrackExtrapolator class.
+
+            Args:
+                max_extrapolation (float): The longest boxes are moved on for after an inferred frame, in seconds.
+        """
+        self.max_extrapolation = max_extrapolation
+        self._history = {}
+
+    def update(self, detections: sv.Detections | None, timestamp: float) -> None:
+        """
+            Records the tracked detections of an inferred frame.
+
+            Args:
+                detections (sv.Detections): The tracked detections, or None if nothing was detected.
+                timestamp (float): The capture time of the frame.
+        """
+        self._time = timestamp
+        if detections is None or len(detections) == 0:
+            self._detections, self._velocities = None, None
+            return
+        self._detections = detections
+        self._velocities = np.zeros((len(detections), 4))
+        history = {}
+        tracker_ids = detections.tracker_id if detections.tracker_id is not None else [None] * len(detections)
+        for i, (box, tracker_id) in enumerate(zip(detections.xyxy, tracker_ids)):
+            if tracker_id is None:
+                continue
+            previous = self._history.get(int(tracker_id))
+            if previous is not None and timestamp > previous[1]:
+                self._velocities[i] = (box - previous[0]) / (timestamp - previous[1])
+            history[int(tracker_id)] = (box.copy(), timestamp)
+        self._history = history
+
+    def predict(self, timestamp: float) -> sv.Detections | None:
+        """
+            Returns the tracked detections moved on to a frame that skipped inference.
+
+            Args:
+                timestamp (float): The capture time of the skipped frame.
+
+            Returns:
+                sv.Detections: The extrapolated detections, or None if the last inferred frame had none.
+        """
+        if self._detections is None:
+            return None
+        elapsed = min(max(0.0, timestamp - self._time), self.max_extrapolation)
+        if elapsed == 0.0 or not self._velocities.any():
+            return self._detections
+        return sv.Detections(
+            xyxy=(self._detections.xyxy + self._velocities * elapsed).astype(self._detections.xyxy.dtype),
+            confidence=self._detections.confidence,
+            class_id=self._detections.class_id,
+            tracker_id=self._detections.tracker_id,
+        )
@@ -0,0 +1,100 @@
+"""Vectorized forward and inverse kinematics for the b/s/e/t joints of the RoArm-M2.
+
+Joint angles are in radians with the same conventions as the robot feedback: the
+shoulder (s) is 0 when the upper arm is vertical and the elbow (e) is pi/2 when the
+forearm is horizontal. Positions are (x, y, z) in mm from the shoulder joint. Every
+function works on a single pose of shape (3,) or on arrays of poses of shape (..., 3).
+
+The hand (t) turns the gripper at the end of the forearm and does not move it, so
+it passes through the position math. It is only checked against its limits, by
+within_limits() on (b, s, e, t) angles of shape (..., 4).
+"""
+
+from typing import Tuple
+import numpy as np
+
+# Link lengths of the RoArm-M2 in mm. Each link is offset slightly from its joint axis.
+UPPER_ARM_LENGTH = float(np.hypot(236.82, 30.00))
+UPPER_ARM_OFFSET = float(np.arctan2(30.00, 236.82))
+FOREARM_LENGTH = float(np.hypot(280.15, 1.73))
+FOREARM_OFFSET = float(np.arctan2(1.73, 280.15))
+
+# (min, max) angles in radians of the b, s, e and t joints. The t range covers the
+# gripper from fully open (45) past closed on an object (220).
+JOINT_LIMITS = np.radians([[-180.0, 180.0], [-90.0, 90.0], [-45.0, 180.0], [45.0, 315.0]])
+
+def forward_kinematics(joints: np.ndarray) -> np.ndarray:
+    """
+    Computes the position of the end of the forearm for joint angles.
+
+    Args:
+        joints: The (b, s, e) joint angles in radians, shape (..., 3).
+
+    Returns:
+        The (x, y, z) positions in mm, shape (..., 3).
+    """
+    joints = np.asarray(joints, dtype=np.float64)
+    b, s, e = joints[..., 0], joints[..., 1], joints[..., 2]
+    forearm = e + s - np.pi / 2 - FOREARM_OFFSET
+    r = UPPER_ARM_LENGTH * np.sin(s + UPPER_ARM_OFFSET) + FOREARM_LENGTH * np.cos(forearm)
+    z = UPPER_ARM_LENGTH * np.cos(s + UPPER_ARM_OFFSET) - FOREARM_LENGTH * np.sin(forearm)
+    return np.stack((r * np.cos(b), r * np.sin(b), z), axis=-1)
+
+def inverse_kinematics(positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the elbow-up joint angles that place the end of the forearm at positions.
+
+    Positions out of reach are clamped onto the workspace boundary, which is
+    reported in the returned mask.
+
+    Args:
+        positions: The (x, y, z) positions in mm, shape (..., 3).
+
+    Returns:
+        The (b, s, e) joint angles in radians, shape (..., 3), and a boolean mask of
+        shape (...) that is True where the position is reachable within the joint limits.
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    x, y, z = positions[..., 0], positions[..., 1], positions[..., 2]
+    b = np.arctan2(y, x)
+    r = np.hypot(x, y)
+    distance = np.hypot(r, z)
+    min_distance = abs(UPPER_ARM_LENGTH - FOREARM_LENGTH)
+    max_distance = UPPER_ARM_LENGTH + FOREARM_LENGTH
+    within_reach = (distance >= min_distance) & (distance <= max_distance)
+    d = np.clip(distance, min_distance + 1e-9, max_distance - 1e-9)
+
+    upper = np.arctan2(z, r) + np.arccos(
+        np.clip((UPPER_ARM_LENGTH**2 + d**2 - FOREARM_LENGTH**2) / (2 * UPPER_ARM_LENGTH * d), -1.0, 1.0))
+    fore = upper - np.pi + np.arccos(
+        np.clip((UPPER_ARM_LENGTH**2 + FOREARM_LENGTH**2 - d**2) / (2 * UPPER_ARM_LENGTH * FOREARM_LENGTH), -1.0, 1.0))
+    s = np.pi / 2 - upper - UPPER_ARM_OFFSET
+    e = np.pi / 2 - fore - s + FOREARM_OFFSET
+    joints = np.stack((b, s, e), axis=-1)
+    return joints, within_reach & within_limits(joints)
+
+def within_limits(joints: np.ndarray) -> np.ndarray:
+    """
+    Checks joint angles against the joint limits.
+
+    Args:
+        joints: The (b, s, e) or (b, s, e, t) joint angles in radians, shape (..., 3) or (..., 4).
+
+    Returns:
+        A boolean mask of shape (...) that is True where every joint is within its limits.
+    """
+    joints = np.asarray(joints, dtype=np.float64)
+    limits = JOINT_LIMITS[:joints.shape[-1]]
+    return np.all((joints >= limits[:, 0]) & (joints <= limits[:, 1]), axis=-1)
+
+def is_reachable(positions: np.ndarray) -> np.ndarray:
+    """
+    Checks whether positions can be reached within the joint limits.
+
+    Args:
+        positions: The (x, y, z) positions in mm, shape (..., 3).
+
+    Returns:
+        A boolean mask of shape (...).
+    """
+    return inverse_kinematics(positions)[1]
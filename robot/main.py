@@ -3,10 +3,18 @@
 
 import argparse
 import camera_processor
+from frame_source import create_frame_source
+from preview import DISPLAY_POLICIES
+from stream_server import FrameBroadcaster, serve
+from frame_bus import LatestFrameBus
+from video_buffer import VideoRingBuffer
+from scene_encoder import SceneEncoder
+from inference_gate import MotionGate
+from roi import RoiSelector
+from tiling import TileGrid
 import controller
 import telegram
 import threading
-import queue
 import time
 
 def initialize_arg_parser() -> argparse.ArgumentParser:
@@ -26,6 +34,78 @@ def initialize_arg_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "-a", "--annotations", action="store_true", help="Annotations Flag True or False."
     )
+    parser.add_argument(
+        "-b", "--batch_size", type=int, default=1, help="Number of frames sent to the Hailo device as one job."
+    )
+    parser.add_argument(
+        "--host_nms", action="store_true", help="Decode and NMS raw YOLO outputs on the host, for HEFs without on-chip NMS."
+    )
+    parser.add_argument(
+        "--iou_thresh", type=float, default=0.45, help="IoU threshold for host NMS."
+    )
+    parser.add_argument(
+        "--dual_stream", action="store_true", help="Run inference on a model-size lores stream, capturing the full-resolution image with each frame."
+    )
+    parser.add_argument(
+        "--source", default="camera", help="Frame source: camera, synthetic, a video file, or an image file or directory."
+    )
+    parser.add_argument(
+        "--fast", action="store_true", help="Read file and synthetic sources as fast as possible instead of at their frame rate."
+    )
+    parser.add_argument(
+        "--display", default="preview", choices=DISPLAY_POLICIES,
+        help="Preview window: off, preview, or annotated to preview only when annotations are enabled."
+    )
+    parser.add_argument(
+        "--preview_fps", type=float, default=10.0, help="Highest rate at which the preview window is redrawn."
+    )
+    parser.add_argument(
+        "--stream_port", type=int, default=8000, help="Port of the live MJPEG/WebSocket stream, or 0 to disable it."
+    )
+    parser.add_argument(
+        "--stream_host", type=str, default="127.0.0.1",
+        help="Address the live stream listens on. Defaults to this machine only; use 0.0.0.0 to expose it on the network."
+    )
+    parser.add_argument(
+        "--video_seconds", type=float, default=30.0, help="Seconds of footage kept for scene videos."
+    )
+    parser.add_argument(
+        "--video_fps", type=float, default=10.0, help="Frame rate of the footage kept for scene videos."
+    )
+    parser.add_argument(
+        "--scene_video", default="h264", choices=("h264", "frames"),
+        help="Keep scene footage encoded as H.264 in the background, or as frames encoded on request."
+    )
+    parser.add_argument(
+        "--video_jpeg_quality", type=int, default=None, help="Keep scene frames as JPEG at this quality instead of raw frames."
+    )
+    parser.add_argument(
+        "--stream_fps", type=float, default=15.0, help="Highest frame rate of the live stream."
+    )
+    parser.add_argument(
+        "--motion_thresh", type=float, default=0.0,
+        help="Only infer frames whose grey levels changed by this much, e.g. 6. Defaults to 0, inferring every frame."
+    )
+    parser.add_argument(
+        "--min_inference_fps", type=float, default=2.0, help="Lowest inference rate, on a still scene."
+    )
+    parser.add_argument(
+        "--max_inference_fps", type=float, default=0.0,
+        help="Highest inference rate on a moving scene, or 0 for every frame. Tracking always infers every frame."
+    )
+    parser.add_argument(
+        "--roi", action="store_true", help="While tracking, run inference on a crop around the tracked object."
+    )
+    parser.add_argument(
+        "--roi_refresh", type=int, default=10, help="Every how many inferred frames ROI mode uses the whole frame."
+    )
+    parser.add_argument(
+        "--tiles", default=None,
+        help="Run inference on a ROWSxCOLS grid of overlapping tiles plus the whole frame, e.g. 2x2, for small objects."
+    )
+    parser.add_argument(
+        "--tile_overlap", type=float, default=0.2, help="Overlap of neighbouring tiles as a fraction of the tile size."
+    )
     return parser
 
 def main() -> None:
@@ -33,22 +113,60 @@ def main() -> None:
     # Parse command-line arguments
     args = initialize_arg_parser().parse_args()
 
-    camera_queue: queue.Queue = queue.LifoQueue(maxsize=1)
-    video_queue: queue.Queue = queue.Queue(maxsize=300)
-    camera_processor.camera_queue = camera_queue
-    camera_processor.video_queue = video_queue
-    controller.camera_queue = camera_queue
-    controller.video_queue = video_queue
+    frame_bus = LatestFrameBus()
+    camera_processor.frame_bus = frame_bus
+    controller.frame_bus = frame_bus
+    scene_encoder = None
+    if args.scene_video == 'h264':
+        scene_encoder = SceneEncoder(window=args.video_seconds, fps=args.video_fps).start()
+        camera_processor.scene_encoder = scene_encoder
+        controller.scene_encoder = scene_encoder
+    else:
+        video_buffer = VideoRingBuffer(window=args.video_seconds, fps=args.video_fps, jpeg_quality=args.video_jpeg_quality)
+        camera_processor.video_buffer = video_buffer
+        controller.video_buffer = video_buffer
 
     # Start the telegram listener
     telegram_thread: threading.Thread = threading.Thread(target=telegram.telegram_bot.infinity_polling)
     telegram_thread.start()
 
     # Start the camera listener
-    camera_thread: threading.Thread = threading.Thread(target=camera_processor.run, args=(args.net, args.labels, args.score_thresh, args.annotations))
+    camera_options = {
+        'batch_size': args.batch_size,
+        'host_nms': args.host_nms,
+        'iou_thresh': args.iou_thresh,
+        'dual_stream': args.dual_stream,
+        'display': args.display,
+        'preview_fps': args.preview_fps,
+    }
+    if args.motion_thresh > 0:
+        inference_gate = MotionGate(args.min_inference_fps, args.max_inference_fps, args.motion_thresh)
+        camera_options['gate'] = inference_gate
+        controller.inference_gate = inference_gate
+    if args.roi:
+        roi_selector = RoiSelector(refresh_interval=args.roi_refresh)
+        camera_options['roi'] = roi_selector
+        controller.roi_selector = roi_selector
+    if args.tiles:
+        camera_options['tiles'] = TileGrid.parse(args.tiles, args.tile_overlap)
+    if args.source != 'camera':
+        camera_options['source'] = create_frame_source(args.source, camera_processor.camera_width,
+                                                       camera_processor.camera_height, realtime=not args.fast)
+
+    # Start the live stream server
+    broadcaster = None
+    if args.stream_port:
+        broadcaster = FrameBroadcaster(max_fps=args.stream_fps).start()
+        serve(broadcaster, host=args.stream_host, port=args.stream_port)
+        camera_options['broadcaster'] = broadcaster
+    camera_thread: threading.Thread = threading.Thread(target=camera_processor.run, args=(args.net, args.labels, args.score_thresh, args.annotations), kwargs=camera_options)
     camera_thread.start()
 
     camera_thread.join()
+    if broadcaster is not None:
+        broadcaster.stop()
+    if scene_encoder is not None:
+        scene_encoder.stop()
     telegram.telegram_bot.stop_polling()
 
 if __name__ == "__main__":
@@ -0,0 +1,206 @@
+import bisect
+import re
+import sys
+import threading
+from typing import Dict, List, Tuple
+from loguru import logger
+
+# Upper bounds in seconds of the latency histogram buckets, from 0.5 ms to 30 s.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0
+)
+
+_COMMAND_TYPE = re.compile(r'"T"\s*:\s*(\d+)')
+
+def command_type(command: str) -> str:
+    """
+    Returns the T: type of a JSON command without decoding it.
+
+    Args:
+        command: The JSON command.
+
+    Returns:
+        The command type, e.g. '105', or 'unknown'.
+    """
+    match = _COMMAND_TYPE.search(command)
+    return match.group(1) if match else 'unknown'
+
+def call_site(filename: str) -> str:
+    """
+    Returns the name of the outermost function of a module in the current call chain,
+    i.e. the method through which a command entered the robot layer.
+
+    Args:
+        filename: The file of the module, usually __file__ of the caller.
+
+    Returns:
+        The function name.
+    """
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename != filename:
+        frame = frame.f_back
+    name = 'unknown'
+    while frame is not None and frame.f_code.co_filename == filename:
+        name = frame.f_code.co_name
+        frame = frame.f_back
+    return name
+
+class LatencyHistogram():
+    """
+        A fixed-bucket latency histogram.
+
+        Attributes:
+            counts (List[int]): The number of observations per bucket, with a final overflow bucket.
+            count (int): The total number of observations.
+            total (float): The sum of all observations in seconds.
+    """
+    counts: List[int]
+    count: int
+    total: float
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """
+            Records one observation.
+
+            Args:
+                seconds (float): The latency in seconds.
+        """
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, q: float) -> float:
+        """
+            Estimates a percentile by interpolating within its bucket.
+
+            Args:
+                q (float): The percentile, between 0 and 100.
+
+            Returns:
+                float: The estimated latency in seconds.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = LATENCY_BUCKETS[index - 1] if index > 0 else 0.0
+                upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else LATENCY_BUCKETS[-1]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return LATENCY_BUCKETS[-1]
+
+class CommandMetrics():
+    """
+        Counts, errors and latency histograms of robot commands, keyed by command type
+        and call site. Recording is a lock, a bisect and three increments, so it is
+        cheap enough to leave on.
+
+        Attributes:
+            slow_threshold (float): Commands slower than this many seconds are logged, if set.
+            _series (dict): The (histogram, errors) pair of each (command type, call site).
+            _lock (threading.Lock): Guards _series.
+    """
+    slow_threshold: float
+    _series: Dict[Tuple[str, str], list]
+    _lock: threading.Lock
+
+    def __init__(self, slow_threshold: float = None) -> None:
+        """
+            Initializes a new instance of the CommandMetrics class.
+
+            Args:
+                slow_threshold (float): Commands slower than this many seconds are logged.
+        """
+        self.slow_threshold = slow_threshold
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def record(self, command_type: str, call_site: str, seconds: float, error: bool = False) -> None:
+        """
+            Records one command.
+
+            Args:
+                command_type (str): The T: type of the command, or a label such as 'wait'.
+                call_site (str): The robot method that issued the command.
+                seconds (float): How long the command took.
+                error (bool): Whether the command failed.
+        """
+        key = (command_type, call_site)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [LatencyHistogram(), 0]
+            series[0].observe(seconds)
+            if error:
+                series[1] += 1
+        if self.slow_threshold is not None and seconds > self.slow_threshold:
+            logger.warning(f'Slow robot command T:{command_type} from {call_site} took {seconds * 1000:.1f} ms')
+
+    def reset(self) -> None:
+        """
+            Clears all recorded metrics.
+        """
+        with self._lock:
+            self._series = {}
+
+    def snapshot(self) -> Dict[str, Dict[str, dict]]:
+        """
+            Returns the recorded metrics.
+
+            Returns:
+                dict: For each command type, a dict per call site with count, errors,
+                      total_seconds and p50/p95/p99 latencies in milliseconds.
+        """
+        with self._lock:
+            series = {key: (histogram.count, histogram.total, errors, list(histogram.counts))
+                      for key, (histogram, errors) in self._series.items()}
+        snapshot = {}
+        for (command_type, call_site), (count, total, errors, counts) in sorted(series.items()):
+            histogram = LatencyHistogram()
+            histogram.counts, histogram.count, histogram.total = counts, count, total
+            snapshot.setdefault(command_type, {})[call_site] = {
+                "count": count,
+                "errors": errors,
+                "total_seconds": total,
+                "p50_ms": histogram.percentile(50) * 1000,
+                "p95_ms": histogram.percentile(95) * 1000,
+                "p99_ms": histogram.percentile(99) * 1000,
+            }
+        return snapshot
+
+    def to_prometheus(self, prefix: str = 'robot_command') -> str:
+        """
+            Returns the recorded metrics in the Prometheus text exposition format.
+
+            Args:
+                prefix (str): The prefix of the metric names.
+
+            Returns:
+                str: The metrics text.
+        """
+        with self._lock:
+            series = {key: (list(histogram.counts), histogram.count, histogram.total, errors)
+                      for key, (histogram, errors) in self._series.items()}
+        lines = [f'# HELP {prefix}_latency_seconds Latency of robot commands.',
+                 f'# TYPE {prefix}_latency_seconds histogram']
+        for (command_type, call_site), (counts, count, total, _) in sorted(series.items()):
+            labels = f'command="{command_type}",call_site="{call_site}"'
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS, counts):
+                cumulative += bucket_count
+                lines.append(f'{prefix}_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_latency_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'{prefix}_latency_seconds_sum{{{labels}}} {total}')
+            lines.append(f'{prefix}_latency_seconds_count{{{labels}}} {count}')
+        lines += [f'# HELP {prefix}_errors_total Failed robot commands.',
+                  f'# TYPE {prefix}_errors_total counter']
+        for (command_type, call_site), (_, _, _, errors) in sorted(series.items()):
+            lines.append(f'{prefix}_errors_total{{command="{command_type}",call_site="{call_site}"}} {errors}')
+        return '\n'.join(lines) + '\n'
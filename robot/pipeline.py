@@ -0,0 +1,341 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict
+import numpy as np
+from loguru import logger
+
+class CameraPipeline():
+    """
+        Runs capture, preprocessing, inference and postprocessing as overlapping stages.
+
+        Each stage runs in its own thread and hands frames to the next through a
+        bounded queue. Up to in_flight frames may be between preprocessing and the
+        end of postprocessing at once, so the inference device always has work
+        queued while the host captures and annotates other frames. Frames are sent
+        to inference tagged with their sequence number (HailoAsyncInference with
+        send_original_frame=True returns it with the result) and are matched back to
+        their source frame and handed to postprocess in capture order.
+
+        With batch_size above 1, preprocessed frames are collected into batches of
+        up to batch_size frames, or fewer once the oldest frame has waited
+        max_batch_wait seconds, and each batch is sent to inference as one job.
+
+        With a gate set, frames the gate turns down skip preprocessing and
+        inference and are handed to postprocess with a result of None, still in
+        capture order, so postprocess can carry the last results forward.
+        Frames whose inference job failed, which come back with a result of
+        None, are handed to postprocess the same way and free their place in
+        the window.
+
+        With tiles_per_frame set, preprocess returns one model input per tile
+        of the frame, the tiles of each frame are sent to inference as one job,
+        tagged (seq, tile), and postprocess receives the list of tile results in
+        tile order. Frames are then not batched together.
+
+        With full_images set, capture returns (frame, full_image) pairs, such as
+        FrameSource.read_with_full_image, and the full-resolution image captured
+        with each frame travels with it to preprocess and, by sequence number,
+        to postprocess.
+
+        If any stage raises, the error is logged, the other stages stop without
+        waiting for the frames still in flight, and join() raises it.
+
+        Attributes:
+            _capture (Callable): Returns the next frame, or None when the source is exhausted.
+            _preprocess (Callable): Converts a captured frame, and its full image with full_images set, to the model input.
+            _postprocess (Callable): Called as postprocess(seq, timestamp, frame, result) for each frame in order.
+            _release (Callable): Called with each result once it has been postprocessed, if set.
+            _gate (Callable): Called as gate(frame, timestamp) to decide whether a frame is inferred, if set.
+            _input_queue (queue.Queue): The inference input queue.
+            _output_queue (queue.Queue): The inference output queue.
+            _window (threading.Semaphore): Limits the number of frames in flight.
+            _batch_size (int): The largest number of frames sent to inference as one job.
+            _max_batch_wait (float): The longest a frame waits for its batch to fill in seconds.
+            _tiles_per_frame (int): The number of model inputs preprocess returns per frame, or None for one.
+            _captured (queue.Queue): Frames waiting to be preprocessed.
+            _full_images (bool): Whether capture returns (frame, full_image) pairs.
+            _pending (dict): The (timestamp, frame, full_image, inferred) of captured frames waiting
+                             for their inference result, keyed by sequence number.
+            _stop (threading.Event): Signals the stages to stop.
+            _error (BaseException): The first error raised by a stage, if any.
+            _threads (list): The stage threads.
+            frames (int): The number of frames postprocessed.
+            skipped (int): The number of frames that skipped inference.
+            failed (int): The number of frames whose inference failed.
+            started (float): The monotonic time at which the pipeline started.
+    """
+    _capture: Callable
+    _preprocess: Callable
+    _postprocess: Callable
+    _release: Callable = None
+    _gate: Callable = None
+    _input_queue: queue.Queue
+    _output_queue: queue.Queue
+    _window: threading.Semaphore
+    _batch_size: int
+    _max_batch_wait: float
+    _tiles_per_frame: int = None
+    _full_images: bool = False
+    _captured: queue.Queue
+    _pending: Dict[int, tuple]
+    _pending_lock: threading.Lock
+    _submitted: int
+    _submitting_done: threading.Event
+    _stop: threading.Event
+    _error: BaseException = None
+    _threads: list
+    frames: int = 0
+    skipped: int = 0
+    failed: int = 0
+    started: float = 0.0
+
+    def __init__(self, capture: Callable, preprocess: Callable, postprocess: Callable,
+                 input_queue: queue.Queue, output_queue: queue.Queue,
+                 in_flight: int = 4, queue_size: int = 2, batch_size: int = 1,
+                 max_batch_wait: float = 0.02, release: Callable = None, gate: Callable = None,
+                 tiles_per_frame: int = None, full_images: bool = False) -> None:
+        """
+            Initializes a new instance of the CameraPipeline class.
+
+            Args:
+                capture (Callable): Returns the next frame, or None when the source is exhausted.
+                preprocess (Callable): Converts a captured frame to the model input.
+                postprocess (Callable): Called as postprocess(seq, timestamp, frame, result).
+                input_queue (queue.Queue): The input queue of a HailoAsyncInference created
+                                           with send_original_frame=True.
+                output_queue (queue.Queue): The output queue of the same HailoAsyncInference.
+                in_flight (int): The number of frames allowed on the device and in postprocessing.
+                queue_size (int): The number of captured frames buffered before preprocessing.
+                batch_size (int): The largest number of frames sent to inference as one job.
+                max_batch_wait (float): The longest a frame waits for its batch to fill in seconds.
+                release (Callable): Called with each result once it has been postprocessed, e.g.
+                                    HailoAsyncInference.release to recycle pooled buffers.
+                gate (Callable): Called as gate(frame, timestamp) for each captured frame. Frames it
+                                 returns False for are not inferred and are postprocessed with a result of None.
+                tiles_per_frame (int): The number of model inputs, one per tile, preprocess returns per
+                                       frame, if set. Each frame is then sent to inference as one job
+                                       and postprocessed with the list of its tile results.
+                full_images (bool): Whether capture returns (frame, full_image) pairs. preprocess is
+                                    then called as preprocess(frame, full_image) and postprocess
+                                    as postprocess(seq, timestamp, frame, result, full_image).
+        """
+        self._capture = capture
+        self._preprocess = preprocess
+        self._postprocess = postprocess
+        self._release = release
+        self._gate = gate
+        self._input_queue = input_queue
+        self._output_queue = output_queue
+        self._window = threading.Semaphore(max(in_flight, batch_size))
+        self._batch_size = batch_size
+        self._max_batch_wait = max_batch_wait
+        self._tiles_per_frame = tiles_per_frame
+        self._full_images = full_images
+        self._captured = queue.Queue(maxsize=queue_size)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._submitted = 0
+        self._submitting_done = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self) -> 'CameraPipeline':
+        """
+            Starts the stage threads.
+
+            Returns:
+                CameraPipeline: This pipeline.
+        """
+        self.started = time.monotonic()
+        for target in (self._capture_loop, self._preprocess_loop, self._postprocess_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self) -> None:
+        """
+            Stops capturing. Frames already captured are still processed.
+        """
+        self._stop.set()
+
+    def join(self, timeout: float = None) -> None:
+        """
+            Waits for the pipeline to finish processing.
+
+            Args:
+                timeout (float): The number of seconds to wait for each stage.
+
+            Raises:
+                Exception: The first error raised by a stage, if any.
+        """
+        for thread in self._threads:
+            thread.join(timeout)
+        if self._error is not None:
+            raise self._error
+
+    def fps(self) -> float:
+        """
+            Returns the average number of frames postprocessed per second.
+
+            Returns:
+                float: The frame rate.
+        """
+        elapsed = time.monotonic() - self.started
+        return self.frames / elapsed if elapsed > 0 else 0.0
+
+    def _fail(self, error: BaseException) -> None:
+        logger.opt(exception=error).error(f'Camera pipeline stage failed: {error}')
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _capture_loop(self) -> None:
+        seq = 0
+        try:
+            while not self._stop.is_set():
+                captured = self._capture()
+                if captured is None:
+                    break
+                frame, full_image = captured if self._full_images else (captured, None)
+                if not self._put(self._captured, (seq, time.time(), frame, full_image)):
+                    break
+                seq += 1
+        except Exception as e:
+            self._fail(e)
+        finally:
+            # Wake the preprocess stage, unless it has already exited and will never take the marker
+            while not self._submitting_done.is_set():
+                try:
+                    self._captured.put(None, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def _submit(self, seqs: list, model_inputs: list) -> None:
+        if seqs:
+            self._input_queue.put((list(seqs), list(model_inputs)))
+            seqs.clear()
+            model_inputs.clear()
+
+    def _acquire_window(self, seqs: list, model_inputs: list) -> bool:
+        if self._window.acquire(blocking=False):
+            return True
+        # Send what has been collected rather than wait on frames that cannot finish without it.
+        self._submit(seqs, model_inputs)
+        while not self._window.acquire(timeout=0.1):
+            if self._error is not None or (self._stop.is_set() and self._captured.empty()):
+                return False
+        return True
+
+    def _preprocess_loop(self) -> None:
+        seqs, model_inputs = [], []
+        deadline = 0.0
+        try:
+            while True:
+                try:
+                    timeout = max(0.0, deadline - time.monotonic()) if seqs else None
+                    item = self._captured.get(timeout=timeout)
+                except queue.Empty:
+                    self._submit(seqs, model_inputs)
+                    continue
+                if item is None or self._error is not None:
+                    break
+                seq, timestamp, frame, full_image = item
+                if self._gate is not None and not self._gate(frame, timestamp):
+                    self._skip(seq, timestamp, frame, full_image)
+                    continue
+                model_input = self._preprocess(frame, full_image) if self._full_images else self._preprocess(frame)
+                if not self._acquire_window(seqs, model_inputs):
+                    return
+                with self._pending_lock:
+                    self._pending[seq] = (timestamp, frame, full_image, True)
+                    self._submitted += 1
+                if self._tiles_per_frame is not None:
+                    self._input_queue.put(([(seq, tile) for tile in range(len(model_input))], list(model_input)))
+                    continue
+                if not seqs:
+                    deadline = time.monotonic() + self._max_batch_wait
+                seqs.append(seq)
+                model_inputs.append(model_input)
+                if len(seqs) >= self._batch_size:
+                    self._submit(seqs, model_inputs)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._submit(seqs, model_inputs)
+            self._submitting_done.set()
+
+    def _skip(self, seq: int, timestamp: float, frame: np.ndarray, full_image: np.ndarray) -> None:
+        with self._pending_lock:
+            self._pending[seq] = (timestamp, frame, full_image, False)
+            self._submitted += 1
+        # Skipped frames take no window slot and reach postprocess through the output queue,
+        # behind the inferred frames captured before them
+        self._output_queue.put((seq, None))
+        self.skipped += 1
+
+    def _postprocess_loop(self) -> None:
+        completed = 0
+        # Captured frames are numbered from 0; the first result to arrive need not be
+        # frame 0 once skipped frames bypass inference
+        next_seq = 0
+        results = {}
+        tiles = {}
+        while not (self._submitting_done.is_set() and completed == self._submitted) and self._error is None:
+            try:
+                seq, result = self._output_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if isinstance(seq, tuple):
+                # A tile: the frame is complete once all its tiles are back
+                seq, tile = seq
+                frame_tiles = tiles.setdefault(seq, {})
+                frame_tiles[tile] = result
+                if len(frame_tiles) < self._tiles_per_frame:
+                    continue
+                del tiles[seq]
+                result = [frame_tiles[tile] for tile in range(self._tiles_per_frame)]
+                if any(tile_result is None for tile_result in result):
+                    # A failed tile fails the whole frame
+                    self._release_results(tile_result for tile_result in result if tile_result is not None)
+                    result = None
+            results[seq] = result
+            # Hand frames on in capture order so the tracker sees a consistent timeline.
+            while next_seq in results:
+                with self._pending_lock:
+                    timestamp, frame, full_image, inferred = self._pending.pop(next_seq)
+                result = results.pop(next_seq)
+                try:
+                    if self._full_images:
+                        self._postprocess(next_seq, timestamp, frame, result, full_image)
+                    else:
+                        self._postprocess(next_seq, timestamp, frame, result)
+                except Exception as e:
+                    self._fail(e)
+                    return
+                finally:
+                    if inferred:
+                        if result is None:
+                            self.failed += 1
+                        else:
+                            self._release_results(result if self._tiles_per_frame is not None else [result])
+                        self._window.release()
+                    completed += 1
+                    self.frames += 1
+                next_seq += 1
+
+    def _release_results(self, results) -> None:
+        if self._release is not None:
+            for result in results:
+                self._release(result)
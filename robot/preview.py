@@ -0,0 +1,156 @@
+import os
+import sys
+import threading
+import time
+from typing import Callable
+import cv2
+import numpy as np
+from frame_packet import FramePacket, as_image
+
+DISPLAY_OFF = 'off'
+DISPLAY_PREVIEW = 'preview'
+DISPLAY_ANNOTATED = 'annotated'
+DISPLAY_POLICIES = (DISPLAY_OFF, DISPLAY_PREVIEW, DISPLAY_ANNOTATED)
+
+def has_display() -> bool:
+    """
+    Checks whether there is a display to open a preview window on.
+
+    Returns:
+        False on a headless Linux unit with neither X11 nor Wayland, True otherwise.
+    """
+    if not sys.platform.startswith('linux'):
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+class PreviewDisplay():
+    """
+        Shows frames in a preview window from its own thread, at no more than max_fps.
+
+        show() only swaps the frame into a slot and never blocks, so the GUI event
+        pump and the cost of drawing the window stay off the frame processing path.
+        Frames arriving faster than max_fps replace each other and only the latest
+        one is drawn.
+
+        Attributes:
+            window (str): The name of the preview window.
+            max_fps (float): The highest rate at which the window is redrawn.
+            shown (int): The number of frames drawn.
+            _on_quit (Callable): Called when 'q' is pressed in the window, if set.
+            _imshow (Callable): Draws a frame, cv2.imshow by default.
+            _wait_key (Callable): Pumps GUI events and returns the key pressed, cv2.waitKey by default.
+            _frame (np.ndarray): The latest frame not yet drawn.
+            _lock (threading.Lock): Guards _frame.
+            _new_frame (threading.Event): Set when _frame holds a frame.
+            _stop (threading.Event): Signals the display thread to stop.
+            _thread (threading.Thread): The display thread.
+    """
+    window: str
+    max_fps: float
+    shown: int = 0
+    _on_quit: Callable = None
+    _imshow: Callable
+    _wait_key: Callable
+    _frame: np.ndarray | FramePacket = None
+    _lock: threading.Lock
+    _new_frame: threading.Event
+    _stop: threading.Event
+    _thread: threading.Thread = None
+
+    def __init__(self, max_fps: float = 10.0, window: str = 'preview', on_quit: Callable = None,
+                 imshow: Callable = cv2.imshow, wait_key: Callable = cv2.waitKey) -> None:
+        """
+            Initializes a new instance of the PreviewDisplay class.
+
+            Args:
+                max_fps (float): The highest rate at which the window is redrawn.
+                window (str): The name of the preview window.
+                on_quit (Callable): Called when 'q' is pressed in the window.
+                imshow (Callable): Draws a frame as imshow(window, frame).
+                wait_key (Callable): Pumps GUI events as wait_key(milliseconds) and returns the key pressed.
+        """
+        self.window = window
+        self.max_fps = max_fps
+        self._on_quit = on_quit
+        self._imshow = imshow
+        self._wait_key = wait_key
+        self._lock = threading.Lock()
+        self._new_frame = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self) -> 'PreviewDisplay':
+        """
+            Starts the display thread.
+
+            Returns:
+                PreviewDisplay: This display.
+        """
+        self._thread = threading.Thread(target=self._run, name='preview', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+            Stops the display thread and closes the window.
+        """
+        self._stop.set()
+        self._new_frame.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def show(self, frame: np.ndarray | FramePacket) -> None:
+        """
+            Hands a frame to the display thread, replacing any frame not yet drawn. The
+            annotations of a packet are drawn on the display thread, only for frames shown.
+
+            Args:
+                frame (np.ndarray | FramePacket): The BGR frame or packet. It must not be modified afterwards.
+        """
+        with self._lock:
+            self._frame = frame
+        self._new_frame.set()
+
+    def _run(self) -> None:
+        interval = 1.0 / self.max_fps if self.max_fps > 0 else 0.0
+        next_time = time.monotonic()
+        while not self._stop.is_set():
+            if self._new_frame.wait(max(interval, 0.05)):
+                with self._lock:
+                    frame, self._frame = self._frame, None
+                    self._new_frame.clear()
+                if frame is not None:
+                    self._imshow(self.window, as_image(frame))
+                    self.shown += 1
+            if self._wait_key(1) & 0xFF == ord('q') and self._on_quit is not None:
+                self._on_quit()
+            next_time = max(next_time + interval, time.monotonic())
+            self._stop.wait(next_time - time.monotonic())
+        if self.shown:
+            try:
+                cv2.destroyWindow(self.window)
+            except cv2.error:
+                pass
+
+def create_preview(policy: str, annotations: bool, max_fps: float = 10.0, on_quit: Callable = None
+                   ) -> PreviewDisplay | None:
+    """
+    Creates the preview display for a display policy.
+
+    Args:
+        policy: 'off' for no window, 'preview' to show every frame at up to max_fps, or
+            'annotated' to show frames only when annotations are enabled.
+        annotations: Whether frames are annotated with the detections.
+        max_fps: The highest rate at which the window is redrawn.
+        on_quit: Called when 'q' is pressed in the window.
+
+    Returns:
+        The started display, or None if nothing is to be shown.
+    """
+    if policy not in DISPLAY_POLICIES:
+        raise ValueError(f'Unknown display policy {policy}, expected one of {", ".join(DISPLAY_POLICIES)}')
+    if policy == DISPLAY_OFF or (policy == DISPLAY_ANNOTATED and not annotations):
+        return None
+    if not has_display():
+        print('No display found, running without a preview window')
+        return None
+    return PreviewDisplay(max_fps, on_quit=on_quit).start()
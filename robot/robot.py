@@ -1,9 +1,16 @@
-import requests
 import math
 import json
 import time
-
-DEFAULT_ROARM_IP = '192.168.0.251'
+import threading
+from concurrent.futures import Future
+from transport import Transport, HttpTransport, SerialTransport
+from trajectory import Trajectory, MotionExecutor
+from metrics import CommandMetrics, command_type, call_site
+import kinematics
+from arm import (DEFAULT_ROARM_IP, JOINT_LETTERS, COORDINATE_LETTERS, INITIAL_POSITION, DIRECTIONS, ACTIONS,
+                 PRESET_POSITIONS, SettleMonitor, commanded_state, initial_target, joint_values,
+                 look_around_trajectory, pickup_trajectory, throw_trajectory)
+import numpy as np
 
 class Robot():
     """
@@ -11,52 +18,50 @@ class Robot():
     
         Attributes:
             _ip_addr (str): The IP address of the robot.
+            _transport (Transport): The link used to send commands to the robot.
             _state (dict): The current state of the robot.
+            _state_time (float): The monotonic time at which _state was last read.
+            _state_ttl (float): The number of seconds a cached state is considered fresh.
+            _state_lock (threading.Lock): Guards _state, _state_time, _feedback and _feedback_time.
+            _feedback (dict): The last state read from the robot, without commanded values.
+            _feedback_time (float): The monotonic time at which _feedback was read.
+            _poller_thread (threading.Thread): The background state poller, if running.
+            _poller_stop (threading.Event): Signals the state poller to stop.
+            _target (dict): The state values of the last motion command.
+            _settle (bool): Whether motions wait for joint feedback instead of their full delay.
+            _executor (MotionExecutor): The thread that runs submitted motions, created on first use.
+            _metrics (CommandMetrics): Latency and error metrics of the commands sent to the robot.
             _speed (int): The speed of the robot.
             _acceleration (int): The acceleration of the robot.
             _delay (int): The delay between commands.
             _directions (dict): A dictionary of directions.
     """
     _ip_addr: str
+    _transport: Transport
     _state: dict
+    _state_time: float
+    _state_ttl: float
+    _state_lock: threading.Lock
+    _feedback: dict
+    _feedback_time: float
+    _poller_thread: threading.Thread = None
+    _poller_stop: threading.Event = None
+    _target: dict
+    _settle: bool
+    _executor: MotionExecutor = None
+    _metrics: CommandMetrics
     _speed: int
     _acceleration: int
-    _directions: dict = {      'up': {'joint_letter': 'e', 'sign': -1, 'joint_index': 3},
-                             'down': {'joint_letter': 'e', 'sign': +1, 'joint_index': 3},
-                             'left': {'joint_letter': 'b', 'sign': +1, 'joint_index': 1},
-                            'right': {'joint_letter': 'b', 'sign': -1, 'joint_index': 1},
-                          'forward': {'joint_letter': 's', 'sign': +1, 'joint_index': 2},
-                         'backward': {'joint_letter': 's', 'sign': -1, 'joint_index': 2}}
-    _action_dictionary = {
-            'go_left': lambda robot: robot.move_left(15),
-            'go_right': lambda robot: robot.move_right(15),
-            'go_up': lambda robot: robot.move_up(15),
-            'go_down': lambda robot: robot.move_down(15),
-            'go_forward': lambda robot: robot.move_forward(15),
-            'go_backward': lambda robot: robot.move_backward(15),
-            'light_on': lambda robot: robot.set_light(255),
-            'light_off': lambda robot: robot.set_light(0),
-            'look_around': lambda robot: robot.look_around(),
-            'look_left': lambda robot: robot.move_to_position(b=90,speed=20,delay=6),
-            'look_right': lambda robot: robot.move_to_position(b=-90,speed=20,delay=6),
-            'pick_up_start': lambda robot: robot.move_to_pick_up_start(),
-            'grab': lambda robot: robot.grab(),
-            'reset': lambda robot: robot.reset(),
-            'hold': lambda robot: robot.hold(),
-            'release': lambda robot: robot.release(),
-            'throw': lambda robot: robot.throw()
-        }
-    
-    _preset_positions_dictionary = {
-        1: lambda robot: robot.move_to_position(e=60, b=60, h=180,speed=20,delay=4),
-        2: lambda robot: robot.move_to_position(e=60, b=-60,      speed=20,delay=6),
-        3: lambda robot: robot.move_to_position(e=80, b=0,        speed=20,delay=4),
-        4: lambda robot: robot.move_to_position(e=150,b=0,        speed=20,delay=4),
-        5: lambda robot: robot.move_to_position(e=100,b=-60,      speed=20,delay=4),
-        6: lambda robot: robot.move_to_position(e=100,b=60,       speed=20,delay=6),
-        7: lambda robot: robot.reset(),
-    }
-    
+    _joint_letters: tuple = JOINT_LETTERS
+    _coordinate_letters: tuple = COORDINATE_LETTERS
+    _initial_position: dict = INITIAL_POSITION
+    _directions: dict = DIRECTIONS
+    _action_dictionary: dict = ACTIONS
+    _preset_positions_dictionary: dict = PRESET_POSITIONS
+    look_around_trajectory = look_around_trajectory
+    pickup_trajectory = pickup_trajectory
+    throw_trajectory = throw_trajectory
+
     def get_preset_positions():
         """
             Returns the list of available presets.
@@ -66,6 +71,37 @@ class Robot():
         """
         return Robot._preset_positions_dictionary.keys()
     
+    @staticmethod
+    def is_reachable(x: float, y: float, z: float) -> bool:
+        """
+            Checks locally, without querying the arm, whether a position can be reached.
+
+            Args:
+                x (float): The x coordinate.
+                y (float): The y coordinate.
+                z (float): The z coordinate.
+
+            Returns:
+                bool: True if the position is within the workspace and joint limits.
+        """
+        return bool(kinematics.is_reachable([x, y, z]))
+
+    @staticmethod
+    def coordinates_to_joints(x: float, y: float, z: float) -> dict:
+        """
+            Converts a position to the joint angles that reach it.
+
+            Args:
+                x (float): The x coordinate.
+                y (float): The y coordinate.
+                z (float): The z coordinate.
+
+            Returns:
+                dict: The b, s and e joint angles in degrees.
+        """
+        joints, _ = kinematics.inverse_kinematics([x, y, z])
+        return dict(zip(('b', 's', 'e'), np.degrees(joints).tolist()))
+
     def get_actions():
         """
             Returns the list of available actions.
@@ -75,35 +111,243 @@ class Robot():
         """
         return Robot._action_dictionary.keys()
     
-    def __init__(self, speed: int = 0, acceleration: int = 2, ip_address: str = DEFAULT_ROARM_IP) -> None:
+    def __init__(self, speed: int = 0, acceleration: int = 2, ip_address: str = DEFAULT_ROARM_IP,
+                 transport: Transport = None, state_ttl: float = 0.5, poll_rate: float = None,
+                 settle: bool = False, serial_port: str = None, metrics: CommandMetrics = None) -> None:
         """
             Initializes a new instance of the Robot class.
 
             Args:
                 speed (int): The speed of the robot.
                 acceleration (int): The acceleration of the robot.
-                delay (int): The delay between commands.
+                ip_address (str): The IP address of the robot.
+                transport (Transport): The link used to send commands. Defaults to a
+                                       keep-alive HttpTransport to ip_address.
+                serial_port (str): If set, and no transport is given, commands are sent
+                                   over USB serial on this device instead of HTTP.
+                state_ttl (float): Seconds a cached state is used before it is re-read.
+                poll_rate (float): If set, polls the robot state in the background at
+                                   this many reads per second.
+                settle (bool): If True, motions return as soon as the arm has settled on
+                               its target, using their delay only as a timeout.
+                metrics (CommandMetrics): Where command metrics are recorded. Defaults to
+                                          a new CommandMetrics for this robot.
         """
         self._ip_addr = ip_address
-        self._state = self.get_state()
+        self._metrics = metrics if metrics is not None else CommandMetrics()
+        if transport is None and serial_port is not None:
+            transport = SerialTransport(serial_port)
+        elif transport is None:
+            transport = HttpTransport(ip_address)
+        self._transport = transport
+        self._state_lock = threading.Lock()
+        self._state_ttl = state_ttl
+        self._state = {}
+        self._state_time = 0.0
+        self._feedback = {}
+        self._feedback_time = 0.0
+        self._target = {}
+        self._settle = settle
+        self.get_state()
         self._speed = speed
         self._acceleration = acceleration
         self.reset()
+        if poll_rate:
+            self.start_state_poller(poll_rate)
     
     def reset(self):
         """
             Resets the robot to its initial state.
         """
         self.do('{"T":100}')
+        self.invalidate_state()
+        self._target = initial_target()
 
     def get_state(self):
         """
-            Returns the current state of the robot.
+            Reads the current state of the robot and updates the cached state.
 
             Returns:
                 dict: The current state of the robot.
         """
-        return json.loads(self.do('{"T":105}'))
+        state = json.loads(self.do('{"T":105}'))
+        with self._state_lock:
+            self._state = self._feedback = state
+            self._state_time = self._feedback_time = time.monotonic()
+        return state
+
+    def get_cached_state(self, max_age: float = None, keys: tuple = ()):
+        """
+            Returns the cached state of the robot, reading it again if it is older
+            than max_age or is missing any of the requested keys.
+
+            Args:
+                max_age (float): The maximum age in seconds. Defaults to the robot's state TTL.
+                keys (tuple): The state keys that must be present in the cached state.
+
+            Returns:
+                dict: The state of the robot.
+        """
+        if max_age is None:
+            max_age = self._state_ttl
+        with self._state_lock:
+            state = self._state
+            age = time.monotonic() - self._state_time
+        if age > max_age or any(key not in state for key in keys):
+            state = self.get_state()
+        return state
+
+    def get_feedback(self, max_age: float = None):
+        """
+            Returns the last state read from the robot, ignoring values recorded from
+            commands that the arm may not have reached yet.
+
+            Args:
+                max_age (float): The maximum age in seconds. Defaults to the robot's state TTL.
+
+            Returns:
+                dict: The measured state of the robot.
+        """
+        if max_age is None:
+            max_age = self._state_ttl
+        with self._state_lock:
+            state = self._feedback
+            age = time.monotonic() - self._feedback_time
+        if age > max_age:
+            state = self.get_state()
+        return state
+
+    def invalidate_state(self):
+        """
+            Marks the cached state as stale so that the next read goes to the robot.
+        """
+        with self._state_lock:
+            self._state_time = 0.0
+
+    def _update_cached_state(self, stale_keys: tuple, **values):
+        """
+            Records the commanded values in the cached state so that chained relative
+            moves build on the last command instead of waiting for a fresh read.
+
+            Args:
+                stale_keys (tuple): State keys that the command makes out of date.
+                values: The commanded state values.
+        """
+        with self._state_lock:
+            self._state = commanded_state(self._state, stale_keys, values)
+        self._target = values
+
+    def _read_state(self, fresh: bool, keys: tuple):
+        """
+            Returns the state used to fill in a motion command.
+
+            Args:
+                fresh (bool): Whether to read the state from the robot.
+                keys (tuple): The state keys the command needs.
+
+            Returns:
+                dict: The state of the robot.
+        """
+        if fresh:
+            return self.get_state()
+        return self.get_cached_state(keys=keys)
+
+    def wait_until_settled(self, tolerance: float = 2.0, timeout: float = 10.0, poll_interval: float = 0.05,
+                           stall_time: float = 0.5) -> bool:
+        """
+            Polls the robot feedback until the arm has converged on the target of the
+            last motion command, or has moved and then stopped short of it (e.g. the
+            gripper closed on an object).
+
+            Args:
+                tolerance (float): The allowed error in degrees for joints and mm for coordinates.
+                timeout (float): The maximum number of seconds to wait.
+                poll_interval (float): The number of seconds between feedback reads.
+                stall_time (float): Seconds without movement after which the arm counts as stopped.
+
+            Returns:
+                bool: True if the arm settled on the target, False if it stopped short of
+                      it or the timeout expired first.
+        """
+        monitor = SettleMonitor(self._target, tolerance, stall_time)
+        deadline = time.monotonic() + timeout
+        while True:
+            state = self.get_feedback(max_age=poll_interval)
+            now = time.monotonic()
+            if monitor.update(state, now):
+                return monitor.settled
+            if now >= deadline:
+                return False
+            time.sleep(min(poll_interval, max(0.0, deadline - now)))
+
+    def _finish_motion(self, delay: float):
+        """
+            Waits for a motion to complete, either for the full delay or, in settle
+            mode, until the arm has settled with the delay as the timeout.
+
+            Args:
+                delay (float): The number of seconds the motion is allowed to take.
+        """
+        if delay <= 0:
+            return
+        started = time.perf_counter()
+        if self._settle:
+            self.wait_until_settled(timeout=delay)
+        else:
+            time.sleep(delay)
+        self._metrics.record('wait', call_site(__file__), time.perf_counter() - started)
+
+    def get_metrics(self) -> CommandMetrics:
+        """
+            Returns the metrics of the commands sent to the robot. Time spent waiting
+            for motions to complete is recorded under the 'wait' command type.
+
+            Returns:
+                CommandMetrics: The command metrics.
+        """
+        return self._metrics
+
+    def start_state_poller(self, rate: float = 10.0):
+        """
+            Starts a background thread that keeps the cached state fresh.
+
+            Args:
+                rate (float): The number of state reads per second.
+
+            Returns:
+                bool: True if a poller was started, False if one was already running.
+        """
+        if self._poller_thread is not None:
+            return False
+        self._poller_stop = threading.Event()
+        self._poller_thread = threading.Thread(target=self._poll_state, args=(1.0 / rate,), daemon=True)
+        self._poller_thread.start()
+        return True
+
+    def stop_state_poller(self):
+        """
+            Stops the background state poller.
+        """
+        if self._poller_thread is None:
+            return
+        self._poller_stop.set()
+        self._poller_thread.join()
+        self._poller_thread = None
+
+    def _poll_state(self, interval: float):
+        """
+            Reads the robot state every interval seconds until stopped.
+
+            Args:
+                interval (float): The number of seconds between reads.
+        """
+        while not self._poller_stop.is_set():
+            started = time.monotonic()
+            try:
+                self.get_state()
+            except Exception as e:
+                print(f'State poll failed: {e}')
+            self._poller_stop.wait(max(0.0, interval - (time.monotonic() - started)))
 
     def do(self, command: str):
         """
@@ -115,12 +359,27 @@ class Robot():
             Returns:
                 str: The response from the robot.
         """
-        url = "http://" + self._ip_addr + "/js?json=" + command
-        response = requests.get(url)
-        content = response.text
-        return content
+        started = time.perf_counter()
+        error = True
+        try:
+            response = self._transport.send(command)
+            error = False
+            return response
+        finally:
+            self._metrics.record(command_type(command), call_site(__file__), time.perf_counter() - started, error)
+
+    def close(self):
+        """
+            Stops the state poller and closes the link to the robot.
+        """
+        self.stop_state_poller()
+        if self._executor is not None:
+            self._executor.stop()
+            self._executor = None
+        self._transport.close()
     
-    def move_to_coordinates(self, x:int = None, y:int = None, z:int = None, t:int = None, speed:int = None, delay:float = 0):
+    def move_to_coordinates(self, x:int = None, y:int = None, z:int = None, t:int = None, speed:int = None, delay:float = 0,
+                            fresh: bool = False):
         """
             Moves the robot to a specific position.
 
@@ -130,26 +389,30 @@ class Robot():
                 z (int): The value of joint z.
                 t (int): The value of joint t.
                 delay (int): The delay between commands.
+                fresh (bool): Whether to read the state from the robot instead of the cache.
             
             Returns:
                 None
         """
-        self._state = self.get_state()
-        if x is None:
-            x = self._state['x']
-        if y is None:
-            y = self._state['y']
-        if z is None:
-            z = self._state['z']
-        if t is None:
-            t = self._state['t']
+        if None in (x, y, z, t):
+            state = self._read_state(fresh, ('x', 'y', 'z', 't'))
+            if x is None:
+                x = state['x']
+            if y is None:
+                y = state['y']
+            if z is None:
+                z = state['z']
+            if t is None:
+                t = state['t']
         if speed is None:
             speed = self._speed
         command = f'{{"T":104,"x":{x},"y":{y},"z":{z},"t":{t},"spd":{speed}}}'
         self.do(command)
-        time.sleep(delay)
+        self._update_cached_state(('b', 's', 'e'), x=x, y=y, z=z, t=t)
+        self._finish_motion(delay)
     
-    def move_to_relative_position(self, e:int = 0, b:int = 0, s:int = 0, h:int = 0, speed:int = None, delay:float = 0):
+    def move_to_relative_position(self, e:int = 0, b:int = 0, s:int = 0, h:int = 0, speed:int = None, delay:float = 0,
+                                  fresh: bool = False):
         """
             Moves the robot to a relative position.
 
@@ -159,22 +422,25 @@ class Robot():
                 s (int): The value of joint s.
                 h (int): The value of joint h.
                 delay (int): The delay between commands.
+                fresh (bool): Whether to read the state from the robot instead of the cache.
             
             Returns:
                 None
         """
-        self._state = self.get_state()
-        e += math.degrees(self._state['e'])
-        b += math.degrees(self._state['b'])
-        s += math.degrees(self._state['s'])
-        h += math.degrees(self._state['t'])
+        state = self._read_state(fresh, self._joint_letters)
+        e += math.degrees(state['e'])
+        b += math.degrees(state['b'])
+        s += math.degrees(state['s'])
+        h += math.degrees(state['t'])
         if speed is None:
             speed = self._speed
         command = f'{{"T":122,"b":{b},"s":{s},"e":{e},"h":{h},"spd":{speed},"acc":{self._acceleration}}}'
         self.do(command)
-        time.sleep(delay)
+        self._update_joint_targets(b=b, s=s, e=e, h=h)
+        self._finish_motion(delay)
 
-    def move_to_position(self, e:int = None, b:int = None, s:int = None, h:int = None, speed:int = None, delay:float = 0):
+    def move_to_position(self, e:int = None, b:int = None, s:int = None, h:int = None, speed:int = None, delay:float = 0,
+                         fresh: bool = False, acceleration: int = None):
         """
             Moves the robot to a specific position.
 
@@ -184,24 +450,39 @@ class Robot():
                 s (int): The value of joint s.
                 h (int): The value of joint h.
                 delay (int): The delay between commands.
+                fresh (bool): Whether to read the state from the robot instead of the cache.
+                acceleration (int): The acceleration of the move. Defaults to the robot's acceleration.
             
             Returns:
                 None
         """
-        self._state = self.get_state()
-        if e is None:
-            e = math.degrees(self._state['e'])
-        if b is None:
-            b = math.degrees(self._state['b'])
-        if s is None:
-            s = math.degrees(self._state['s'])
-        if h is None:
-            h = math.degrees(self._state['t'])
+        if None in (e, b, s, h):
+            state = self._read_state(fresh, self._joint_letters)
+            if e is None:
+                e = math.degrees(state['e'])
+            if b is None:
+                b = math.degrees(state['b'])
+            if s is None:
+                s = math.degrees(state['s'])
+            if h is None:
+                h = math.degrees(state['t'])
         if speed is None:
             speed = self._speed
-        command = f'{{"T":122,"b":{b},"s":{s},"e":{e},"h":{h},"spd":{speed},"acc":{self._acceleration}}}'
+        if acceleration is None:
+            acceleration = self._acceleration
+        command = f'{{"T":122,"b":{b},"s":{s},"e":{e},"h":{h},"spd":{speed},"acc":{acceleration}}}'
         self.do(command)
-        time.sleep(delay)
+        self._update_joint_targets(b=b, s=s, e=e, h=h)
+        self._finish_motion(delay)
+
+    def _update_joint_targets(self, **degrees):
+        """
+            Records commanded joint angles in the cached state.
+
+            Args:
+                degrees: The commanded angles in degrees keyed by joint letter (b, s, e, h).
+        """
+        self._update_cached_state(self._coordinate_letters, **joint_values(**degrees))
         
     def exact_move(self, joint_index: int, degrees: int, delay: float = 0):
         """
@@ -217,9 +498,10 @@ class Robot():
         """
         command = f'{{"T":121,"joint":{joint_index},"angle":{degrees},"spd":{self._speed},"acc":{self._acceleration}}}'
         self.do(command)
-        time.sleep(delay)
+        self._update_joint_targets(**{self._joint_letters[joint_index - 1]: degrees})
+        self._finish_motion(delay)
 
-    def move(self, degrees: int, direction: str, delay: float = 0):
+    def move(self, degrees: int, direction: str, delay: float = 0, fresh: bool = False):
         """
             Moves the robot in a specific direction.
 
@@ -227,6 +509,7 @@ class Robot():
                 degrees (int): The number of degrees to move.
                 direction (str): The direction to move.
                 delay (int): The delay between commands.
+                fresh (bool): Whether to read the state from the robot instead of the cache.
 
             Returns:
                 None
@@ -234,68 +517,74 @@ class Robot():
         joint = self._directions[direction]['joint_letter']
         sign = self._directions[direction]['sign']
         joint_index = self._directions[direction]['joint_index']
-        self._state = self.get_state()
-        adjusted_degrees = math.degrees(self._state[joint]) + sign * degrees
+        state = self._read_state(fresh, (joint,))
+        adjusted_degrees = math.degrees(state[joint]) + sign * degrees
         self.exact_move(joint_index, adjusted_degrees, delay=delay)
 
 
-    def move_left(self, degrees: int, delay: float = 0):
+    def move_left(self, degrees: int, delay: float = 0, fresh: bool = False):
         """
             Moves the robot to the left.
 
             Args:
                 degrees (int): The number of degrees to move.
                 delay (int): The delay between commands.
+                fresh (bool): Whether to read the state from the robot instead of the cache.
         """
-        self.move(degrees, 'left', delay=delay)
+        self.move(degrees, 'left', delay=delay, fresh=fresh)
 
-    def move_right(self, degrees: int, delay: float = 0):
+    def move_right(self, degrees: int, delay: float = 0, fresh: bool = False):
         """
             Moves the robot to the right.
 
             Args:
                 degrees (int): The number of degrees to move.
                 delay (int): The delay between commands.
+                fresh (bool): Whether to read the state from the robot instead of the cache.
         """
-        self.move(degrees, 'right', delay=delay)
+        self.move(degrees, 'right', delay=delay, fresh=fresh)
 
-    def move_up(self, degrees: int, delay: float = 0):
+    def move_up(self, degrees: int, delay: float = 0, fresh: bool = False):
         """
             Moves the robot up.
 
             Args:
                 degrees (int): The number of degrees to move.
                 delay (int): The delay between commands.
+                fresh (bool): Whether to read the state from the robot instead of the cache.
         """
-        self.move(degrees, 'up', delay=delay)
+        self.move(degrees, 'up', delay=delay, fresh=fresh)
 
-    def move_down(self, degrees: int, delay: float = 0):
+    def move_down(self, degrees: int, delay: float = 0, fresh: bool = False):
         """
             Moves the robot down.
 
             Args:
                 degrees (int): The number of degrees to move.
                 delay (int): The delay between commands.
+                fresh (bool): Whether to read the state from the robot instead of the cache.
         """
-        self.move(degrees, 'down', delay=delay)
+        self.move(degrees, 'down', delay=delay, fresh=fresh)
 
-    def move_forward(self, degrees: int, delay: float = 0):
+    def move_forward(self, degrees: int, delay: float = 0, fresh: bool = False):
         """
             Moves the robot forward.
 
             Args:
                 delay (int): The delay between commands.
+                fresh (bool): Whether to read the state from the robot instead of the cache.
         """
-        self.move(degrees, 'forward', delay=delay)
+        self.move(degrees, 'forward', delay=delay, fresh=fresh)
 
-    def move_backward(self, degrees: int, delay:float = 0):
+    def move_backward(self, degrees: int, delay: float = 0, fresh: bool = False):
         """
             Moves the robot backward.
 
             Args:
                 delay (int): The delay between commands.
+                fresh (bool): Whether to read the state from the robot instead of the cache.
         """
-        self.move(degrees, 'backward', delay=delay)
+        self.move(degrees, 'backward', delay=delay, fresh=fresh)
 
 
     def set_light(self, intensity: int = 0):
@@ -332,11 +621,7 @@ class Robot():
         """
             Moves the robot to look around
         """
-        self.move_to_position(e=60,b=60,h=180,delay=4)
-        self.move_to_position(e=60,b=-60,delay=10)
-        self.move_to_position(e=100,b=-60,delay=4)
-        self.move_to_position(e=100,b=60,delay=11)
-        self.move_to_coordinates(x=250, y=0, z=250, delay=5)
+        self.run_trajectory(Robot.look_around_trajectory())
 
     def move_to_coordinates_for_pickup(self, x: int, y: int, z:int):
         """
@@ -347,23 +632,60 @@ class Robot():
                 y (int): The y coordinate.
                 z (int): The z coordinate.
         """
-        y_offset = 40
-        x_offset = 20
-        self.move_to_coordinates(x=x/2, y=y, z=z+200, t=1.5, delay=4)
-        if y < 0:
-            self.move_to_coordinates(x=x+x_offset, y=y-y_offset, z=z, t=2, speed=1, delay=4)
-        else:
-            self.move_to_coordinates(x=x+x_offset, y=y-y_offset, z=z, t=2, speed=1, delay=4)
-        self.hold()
+        self.run_trajectory(Robot.pickup_trajectory(x, y, z))
 
     def throw(self):
         """
             Throws the object
         """
-        self.move_to_position(e=145,b=-120,s=0,h=200,speed=0,delay=1)
-        self.move_to_position(e=60,b=15,s=0,h=200,speed=0,delay=0.25)
-        self.move_to_position(e=45,b=45,s=0,h=90,speed=0,delay=1)
-        self.reset()
+        self.run_trajectory(Robot.throw_trajectory())
+
+    def _get_executor(self) -> MotionExecutor:
+        """
+            Returns the motion executor, starting it on first use.
+
+            Returns:
+                MotionExecutor: The motion executor.
+        """
+        if self._executor is None:
+            self._executor = MotionExecutor(self)
+        return self._executor
+
+    def submit(self, trajectory: Trajectory) -> Future:
+        """
+            Queues a trajectory on the motion executor thread and returns immediately.
+
+            Args:
+                trajectory (Trajectory): The trajectory to execute.
+
+            Returns:
+                Future: A future that completes when the trajectory has finished.
+        """
+        return self._get_executor().submit(trajectory.run)
+
+    def submit_action(self, action: str) -> Future:
+        """
+            Queues an action on the motion executor thread and returns immediately.
+
+            Args:
+                action (str): The action to perform.
+
+            Returns:
+                Future: A future that completes when the action has finished.
+        """
+        return self._get_executor().submit(lambda robot: robot.do_action(action))
+
+    def run_trajectory(self, trajectory: Trajectory):
+        """
+            Executes a trajectory, waiting for any previously submitted motions first.
+
+            Args:
+                trajectory (Trajectory): The trajectory to execute.
+        """
+        if self._executor is None or self._executor.is_executor_thread():
+            trajectory.run(self)
+        else:
+            self.submit(trajectory).result()
 
     def move_to_pick_up_start(self):
         """
@@ -0,0 +1,206 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Tuple
+import numpy as np
+import supervision as sv
+
+class RoiSelector():
+    """
+        Picks the part of the frame to run the detector on while one object is followed.
+
+        Resizing the whole frame to the model input throws away most of the
+        resolution of a small or distant target and spends the inference on
+        pixels nobody is looking at. While a target is followed, the detector
+        instead runs on a crop around where the target is expected, padded by
+        padding times its size, with the model's aspect ratio and at least as many
+        pixels as the model input, so the target is seen at up to the resolution
+        of the frame. On frames no larger than the model input, such as a lores
+        stream at the model size, there is nothing to gain and the whole frame is
+        always used. The detections of a crop are in the crop's coordinates and
+        must be moved back by its top-left corner.
+
+        Every refresh_interval-th inferred frame, and every frame after the
+        target has been missing from max_misses crops in a row, runs on the
+        whole frame, so the target can be found again when it leaves the crop
+        and the other tracks are kept alive.
+
+        crop() is called from the preprocessing thread and update() from the
+        postprocessing thread, for the same frames in the same order.
+
+        Attributes:
+            model_size (tuple): The (width, height) of the model input.
+            padding (float): The size of the crop relative to the target's box.
+            refresh_interval (int): Every how many inferred frames the whole frame is used.
+            max_misses (int): The number of crops in a row the target may be missing from.
+            cropped (int): The number of frames inferred on a crop.
+            full (int): The number of frames inferred on the whole frame.
+            _class_id (int): The class of the target, or None if nothing is followed.
+            _tracker_id (int): The tracker id of the target, or 0 for the most confident object of the class.
+            _box (np.ndarray): The last xyxy box of the target in full-frame pixels.
+            _velocity (np.ndarray): The velocity of the box's corners in pixels per second.
+            _time (float): The capture time of the frame the box was seen in.
+            _misses (int): The number of crops in a row the target was missing from.
+            _since_refresh (int): The number of crops since the last whole frame.
+            _lock (threading.Lock): Guards the target state.
+    """
+    model_size: Tuple[int, int]
+    padding: float
+    refresh_interval: int
+    max_misses: int
+    cropped: int = 0
+    full: int = 0
+    _class_id: int = None
+    _tracker_id: int = 0
+    _box: np.ndarray = None
+    _velocity: np.ndarray = None
+    _time: float = None
+    _misses: int = 0
+    _since_refresh: int = 0
+    _lock: threading.Lock
+
+    def __init__(self, model_size: Tuple[int, int] = (640, 640), padding: float = 2.5, refresh_interval: int = 10,
+                 max_misses: int = 3) -> None:
+        """
+            Initializes a new instance of the RoiSelector class.
+
+            Args:
+                model_size (tuple): The (width, height) of the model input.
+                padding (float): The size of the crop relative to the target's box.
+                refresh_interval (int): Every how many inferred frames the whole frame is used.
+                max_misses (int): The number of crops in a row the target may be missing from
+                                  before the whole frame is used until it is found again.
+        """
+        self.model_size = model_size
+        self.padding = padding
+        self.refresh_interval = refresh_interval
+        self.max_misses = max_misses
+        self._lock = threading.Lock()
+
+    @property
+    def following(self) -> bool:
+        """Whether a target is being followed."""
+        return self._class_id is not None
+
+    @contextmanager
+    def follow(self, class_id: int, tracker_id: int = 0) -> Iterator['RoiSelector']:
+        """
+            Crops the frames around a target for the duration of the context, once it has been seen.
+
+            Args:
+                class_id (int): The class of the target.
+                tracker_id (int): The tracker id of the target, or 0 for the most confident object of the class.
+
+            Yields:
+                RoiSelector: This selector.
+        """
+        with self._lock:
+            self._class_id, self._tracker_id = class_id, int(tracker_id)
+            self._box, self._misses, self._since_refresh = None, 0, 0
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._class_id, self._box = None, None
+
+    def crop(self, full_size: Tuple[int, int], frame_size: Tuple[int, int] = None,
+             now: float = None) -> Tuple[int, int, int, int] | None:
+        """
+            Returns the region of the next frame to run the detector on.
+
+            Args:
+                full_size (tuple): The (width, height) of the full-resolution frame.
+                frame_size (tuple): The (width, height) of the frame inferred on. Defaults to full_size.
+                now (float): The capture time of the frame. Defaults to now.
+
+            Returns:
+                tuple: The (x0, y0, x1, y1) crop in full-frame pixels, or None for the whole frame.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            crop = None
+            if self._box is not None and self._misses <= self.max_misses and self._since_refresh < self.refresh_interval - 1:
+                # Move the box on to where the target should be by the time the frame was captured
+                box = self._box + self._velocity * min(max(0.0, now - self._time), 0.5)
+                crop = self._fit(box, full_size, frame_size or full_size)
+            if crop is None:
+                self._since_refresh = 0
+                self.full += 1
+            else:
+                self._since_refresh += 1
+                self.cropped += 1
+            return crop
+
+    def update(self, detections: sv.Detections | None, timestamp: float, cropped: bool) -> None:
+        """
+            Records where the target was found in an inferred frame.
+
+            Args:
+                detections (sv.Detections): The tracked detections in full-frame pixels, or None.
+                timestamp (float): The capture time of the frame.
+                cropped (bool): Whether the frame was inferred on a crop.
+        """
+        with self._lock:
+            if self._class_id is None:
+                return
+            index = self._find(detections)
+            if index is None:
+                if cropped:
+                    self._misses += 1
+                return
+            box = detections.xyxy[index].astype(np.float64)
+            if self._box is not None and timestamp > self._time:
+                self._velocity = (box - self._box) / (timestamp - self._time)
+            else:
+                self._velocity = np.zeros(4)
+            self._box, self._time, self._misses = box, timestamp, 0
+
+    def stats(self) -> dict:
+        """
+            Returns a summary of the selector for logs and diagnostics.
+
+            Returns:
+                dict: The frames inferred on a crop and on the whole frame, and whether a target is followed.
+        """
+        return {"cropped": self.cropped, "full": self.full, "following": self.following}
+
+    def _find(self, detections: sv.Detections | None) -> int | None:
+        if detections is None or len(detections) == 0:
+            return None
+        candidates = np.flatnonzero(detections.class_id == self._class_id)
+        if self._tracker_id and detections.tracker_id is not None:
+            candidates = candidates[detections.tracker_id[candidates] == self._tracker_id]
+        if len(candidates) == 0:
+            return None
+        return int(candidates[np.argmax(detections.confidence[candidates])])
+
+    def _fit(self, box: np.ndarray, full_size: Tuple[int, int], frame_size: Tuple[int, int]
+             ) -> Tuple[int, int, int, int] | None:
+        full_w, full_h = full_size
+        model_w, model_h = self.model_size
+        aspect = model_w / model_h
+        # No smaller than the model input in frame pixels, where cropping further would only upscale
+        min_width = model_w * full_w / frame_size[0]
+        width = max((box[2] - box[0]) * self.padding, (box[3] - box[1]) * self.padding * aspect, min_width)
+        height = width / aspect
+        if width >= full_w or height >= full_h:
+            return None
+        x0 = min(max(0.0, (box[0] + box[2] - width) / 2), full_w - width)
+        y0 = min(max(0.0, (box[1] + box[3] - height) / 2), full_h - height)
+        return int(x0), int(y0), int(x0 + width), int(y0 + height)
+
+def crop_frame(frame: np.ndarray, crop: Tuple[int, int, int, int], full_size: Tuple[int, int]) -> np.ndarray:
+    """
+    Cuts a crop given in full-frame pixels out of a frame that may be smaller, such as a lores frame.
+
+    Args:
+        frame: The frame.
+        crop: The (x0, y0, x1, y1) crop in full-frame pixels.
+        full_size: The (width, height) of the full-resolution frame.
+
+    Returns:
+        A view of the cropped region of the frame.
+    """
+    scale_x, scale_y = frame.shape[1] / full_size[0], frame.shape[0] / full_size[1]
+    x0, y0, x1, y1 = crop
+    return frame[round(y0 * scale_y):round(y1 * scale_y), round(x0 * scale_x):round(x1 * scale_x)]
@@ -0,0 +1,257 @@
+import io
+import queue
+import threading
+import time
+from collections import deque
+from fractions import Fraction
+from typing import Deque, List, Tuple
+import av
+import cv2
+import numpy as np
+from frame_packet import FramePacket, as_image
+
+class Segment():
+    """
+        A run of encoded H.264 packets starting at a keyframe, so it can be muxed on its own.
+
+        Attributes:
+            start_time (float): The monotonic capture time of the first frame.
+            packets (list): The (pts, dts, data, is_keyframe) of each packet.
+    """
+    start_time: float
+    packets: List[Tuple[int, int, bytes, bool]]
+
+    def __init__(self, start_time: float) -> None:
+        self.start_time = start_time
+        self.packets = []
+
+class SceneEncoder():
+    """
+        Encodes the camera feed to H.264 in the background and keeps the last window
+        seconds in memory as short segments, each starting at a keyframe.
+
+        add() is called from the camera thread and only hands the frame to the
+        encoder thread, dropping it if the encoder has fallen behind. clip() remuxes
+        the segments covering the last seconds into an MP4 in memory, without
+        encoding anything or touching the disk, so it returns in milliseconds.
+
+        Attributes:
+            window (float): The number of seconds of footage kept.
+            fps (float): The highest rate at which frames are encoded.
+            segment_seconds (float): The length of a segment, and so the keyframe interval.
+            max_side (int): The longest side of encoded frames in pixels.
+            codec (str): The H.264 encoder.
+            dropped (int): The number of frames dropped because the encoder was busy.
+            _options (dict): The encoder options.
+            _queue (queue.Queue): Frames waiting for the encoder thread.
+            _segments (deque): The encoded segments, oldest first.
+            _lock (threading.Lock): Guards _segments.
+            _stream (av.VideoStream): The encoder stream, also the template of remuxed clips.
+            _size (tuple): The (width, height) of encoded frames.
+            _frame_index (int): The number of frames encoded.
+            _last_time (float): The capture time of the last frame accepted.
+            _stop (threading.Event): Signals the encoder thread to stop.
+            _thread (threading.Thread): The encoder thread.
+    """
+    window: float
+    fps: float
+    segment_seconds: float
+    max_side: int
+    codec: str
+    dropped: int = 0
+    _options: dict
+    _queue: queue.Queue
+    _segments: Deque[Segment]
+    _lock: threading.Lock
+    _stream: av.VideoStream = None
+    _size: Tuple[int, int] = None
+    _frame_index: int = 0
+    _last_time: float = None
+    _stop: threading.Event
+    _thread: threading.Thread = None
+
+    def __init__(self, window: float = 30.0, fps: float = 10.0, segment_seconds: float = 2.0, max_side: int = 640,
+                 codec: str = 'libx264', options: dict = None, queue_size: int = 4) -> None:
+        """
+            Initializes a new instance of the SceneEncoder class.
+
+            Args:
+                window (float): The number of seconds of footage to keep.
+                fps (float): The highest rate at which frames are encoded.
+                segment_seconds (float): The length of a segment, and so the keyframe interval.
+                max_side (int): The longest side of encoded frames in pixels.
+                codec (str): The H.264 encoder.
+                options (dict): The encoder options. Defaults to the fastest libx264 preset without B-frames.
+                queue_size (int): The number of frames that may wait for the encoder before frames are dropped.
+        """
+        self.window = window
+        self.fps = fps
+        self.segment_seconds = segment_seconds
+        self.max_side = max_side
+        self.codec = codec
+        self._options = options if options is not None else {'preset': 'ultrafast', 'tune': 'zerolatency'}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._segments = deque()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self) -> 'SceneEncoder':
+        """
+            Starts the encoder thread.
+
+            Returns:
+                SceneEncoder: This encoder.
+        """
+        self._thread = threading.Thread(target=self._run, name='scene-encoder', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+            Encodes the frames still waiting and stops the encoder thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def add(self, frame: np.ndarray | FramePacket, timestamp: float = None) -> bool:
+        """
+            Offers a frame to the encoder. It is skipped if it comes sooner than 1 / fps
+            after the last frame accepted, and dropped if the encoder is busy.
+
+            Args:
+                frame (np.ndarray | FramePacket): The BGR frame, or a packet whose annotations are
+                                                  drawn on the encoder thread. It must not be modified afterwards.
+                timestamp (float): The monotonic capture time of the frame. Defaults to now.
+
+            Returns:
+                bool: Whether the frame was queued for encoding.
+        """
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        # A small tolerance so a source running at exactly fps is not subsampled by jitter
+        if self._last_time is not None and timestamp - self._last_time < 0.9 / self.fps:
+            return False
+        self._last_time = timestamp
+        try:
+            self._queue.put_nowait((timestamp, frame))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def clip(self, seconds: float = None) -> io.BytesIO | None:
+        """
+            Returns the last seconds of footage as an MP4. The clip starts at a segment
+            boundary, so it can be up to segment_seconds longer than asked for.
+
+            Args:
+                seconds (float): How far back to read, or None for the whole window.
+
+            Returns:
+                io.BytesIO: The MP4, positioned at its start, or None if nothing has been encoded.
+        """
+        cutoff = time.monotonic() - (self.window if seconds is None else seconds)
+        with self._lock:
+            segments = list(self._segments)
+            start = 0
+            for i, segment in enumerate(segments):
+                if segment.start_time <= cutoff:
+                    start = i
+            packets = [packet for segment in segments[start:] for packet in list(segment.packets)]
+        if not packets:
+            return None
+
+        clip = io.BytesIO()
+        time_base = self._stream.codec_context.time_base
+        first_pts, first_dts = packets[0][0], packets[0][1]
+        with av.open(clip, 'w', format='mp4') as output:
+            stream = output.add_stream_from_template(self._stream)
+            # The template's parameters are only filled in when its own container starts,
+            # which never happens, so the SPS/PPS are copied from the encoder
+            stream.codec_context.extradata = self._stream.codec_context.extradata
+            for pts, dts, data, is_keyframe in packets:
+                packet = av.Packet(data)
+                packet.pts, packet.dts = pts - first_pts, dts - first_dts
+                packet.time_base = time_base
+                packet.is_keyframe = is_keyframe
+                packet.stream = stream
+                output.mux(packet)
+        clip.seek(0)
+        return clip
+
+    def duration(self) -> float:
+        """
+            Returns the length of the footage kept.
+
+            Returns:
+                float: The number of seconds from the start of the oldest segment to the last frame.
+        """
+        with self._lock:
+            if not self._segments:
+                return 0.0
+            frames = sum(len(segment.packets) for segment in self._segments)
+        return frames / self.fps
+
+    def memory_bytes(self) -> int:
+        """
+            Returns the memory held by the encoded footage.
+
+            Returns:
+                int: The total size of the packets kept in bytes.
+        """
+        with self._lock:
+            return sum(len(packet[2]) for segment in self._segments for packet in segment.packets)
+
+    def _open(self, shape: Tuple[int, ...]) -> None:
+        height, width = shape[:2]
+        scale = min(1.0, self.max_side / max(width, height))
+        # yuv420p needs even dimensions
+        self._size = (max(2, int(width * scale) // 2 * 2), max(2, int(height * scale) // 2 * 2))
+        # The stream of a container that is never written to: it is used as an encoder and
+        # as the template of the clips, whose container needs a Stream to copy from
+        container = av.open(io.BytesIO(), 'w', format='mp4')
+        self._stream = container.add_stream(self.codec, rate=Fraction(self.fps).limit_denominator(1000),
+                                            options=self._options)
+        self._stream.width, self._stream.height = self._size
+        self._stream.pix_fmt = 'yuv420p'
+        self._stream.codec_context.gop_size = self._frames_per_segment()
+
+    def _frames_per_segment(self) -> int:
+        return max(1, round(self.segment_seconds * self.fps))
+
+    def _encode(self, timestamp: float, frame: np.ndarray | FramePacket) -> None:
+        frame = as_image(frame)
+        if self._stream is None:
+            self._open(frame.shape)
+        if frame.shape[1::-1] != self._size:
+            frame = cv2.resize(frame, self._size, interpolation=cv2.INTER_AREA)
+        video_frame = av.VideoFrame.from_ndarray(frame, format='bgr24')
+        video_frame.pts = self._frame_index
+        if self._frame_index % self._frames_per_segment() == 0:
+            video_frame.pict_type = av.video.frame.PictureType.I
+        self._frame_index += 1
+        self._store(timestamp, self._stream.encode(video_frame))
+
+    def _store(self, timestamp: float, packets: List[av.Packet]) -> None:
+        with self._lock:
+            for packet in packets:
+                if packet.is_keyframe or not self._segments:
+                    self._segments.append(Segment(timestamp))
+                self._segments[-1].packets.append((packet.pts, packet.dts, bytes(packet), packet.is_keyframe))
+            # Keep the newest segment that starts before the window, so clips cover all of it
+            cutoff = timestamp - self.window
+            while len(self._segments) > 1 and self._segments[1].start_time <= cutoff:
+                self._segments.popleft()
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                timestamp, frame = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                self._encode(timestamp, frame)
+            except (av.FFmpegError, ValueError) as e:
+                print(f'Could not encode scene frame: {e}')
+        if self._stream is not None:
+            self._store(time.monotonic(), self._stream.encode(None))
@@ -0,0 +1,132 @@
+import queue
+import threading
+import time
+from typing import Callable, List, Tuple
+import numpy as np
+
+def empty_nms_output(frame: np.ndarray, num_classes: int = 80) -> List[List[np.ndarray]]:
+    """
+    Returns an NMS output without any detections, shaped like HailoRT's per-class output.
+
+    Args:
+        frame: The model input.
+        num_classes: The number of classes of the model.
+
+    Returns:
+        A single-image batch holding one empty (0, 5) array per class.
+    """
+    return [[np.zeros((0, 5), dtype=np.float32) for _ in range(num_classes)]]
+
+class SimulatedInference():
+    """
+        A stand-in for HailoAsyncInference that runs without a Hailo device.
+
+        It reads batches from the input queue and writes (original, result) pairs to
+        the output queue exactly like HailoAsyncInference. The simulated device
+        works on one job at a time for job_overhead seconds plus frame_time seconds
+        per frame, and a job's results arrive latency seconds after the device
+        starts it, so several jobs can be in flight at once as on the real accelerator.
+
+        Attributes:
+            input_queue (queue.Queue): Queue from which to pull input batches.
+            output_queue (queue.Queue): Queue to hold the inference results.
+            send_original_frame (bool): Whether batches are (original, preprocessed) pairs.
+            jobs (int): The number of jobs run.
+            _model (Callable): Returns the result for one preprocessed frame.
+            _input_shape (tuple): The shape of the model input.
+            _frame_time (float): The device time per frame in seconds.
+            _job_overhead (float): The device time per job in seconds.
+            _latency (float): The time from the start of a job to its results in seconds.
+            _completions (queue.Queue): Jobs waiting for their completion time.
+    """
+    input_queue: queue.Queue
+    output_queue: queue.Queue
+    send_original_frame: bool
+    jobs: int = 0
+    _model: Callable
+    _input_shape: Tuple[int, ...]
+    _frame_time: float
+    _job_overhead: float
+    _latency: float
+    _completions: queue.Queue
+
+    def __init__(self, input_queue: queue.Queue, output_queue: queue.Queue, batch_size: int = 1,
+                 send_original_frame: bool = False, frame_time: float = 0.01, latency: float = 0.03,
+                 input_shape: Tuple[int, ...] = (640, 640, 3), model: Callable = empty_nms_output,
+                 job_overhead: float = 0.0) -> None:
+        """
+            Initializes a new instance of the SimulatedInference class.
+
+            Args:
+                input_queue (queue.Queue): Queue from which to pull input batches.
+                output_queue (queue.Queue): Queue to hold the inference results.
+                batch_size (int): Accepted for compatibility with HailoAsyncInference.
+                send_original_frame (bool): Whether batches are (original, preprocessed) pairs.
+                frame_time (float): The device time per frame in seconds.
+                latency (float): The time from the start of a job to its results in seconds.
+                input_shape (tuple): The shape of the model input.
+                model (Callable): Returns the result for one preprocessed frame.
+                job_overhead (float): The device time per job in seconds.
+        """
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.send_original_frame = send_original_frame
+        self._model = model
+        self._input_shape = input_shape
+        self._frame_time = frame_time
+        self._job_overhead = job_overhead
+        self._latency = latency
+        self._completions = queue.Queue()
+
+    def get_input_shape(self) -> Tuple[int, ...]:
+        """
+            Get the shape of the model's input layer.
+
+            Returns:
+                Tuple[int, ...]: Shape of the model's input layer.
+        """
+        return self._input_shape
+
+    def release(self, result) -> None:
+        """
+            Accepts a consumed result like HailoAsyncInference.release. The simulated
+            device does not pool its buffers, so there is nothing to recycle.
+
+            Args:
+                result: A result taken from the output queue.
+        """
+        pass
+
+    def run(self) -> None:
+        completion_thread = threading.Thread(target=self._complete_jobs, daemon=True)
+        completion_thread.start()
+        device_free = time.monotonic()
+        while True:
+            batch_data = self.input_queue.get()
+            if batch_data is None:
+                break  # Sentinel value to stop the inference loop
+
+            if self.send_original_frame:
+                original_batch, preprocessed_batch = batch_data
+            else:
+                original_batch = preprocessed_batch = batch_data
+
+            started = max(time.monotonic(), device_free)
+            device_free = started + self._job_overhead + self._frame_time * len(preprocessed_batch)
+            results = [self._model(frame) for frame in preprocessed_batch]
+            self._completions.put((max(device_free, started + self._latency), original_batch, results))
+            self.jobs += 1
+            # Like wait_for_async_ready, block while the device is busy with earlier jobs.
+            time.sleep(max(0.0, started - time.monotonic()))
+        self._completions.put(None)
+        completion_thread.join()
+
+    def _complete_jobs(self) -> None:
+        while True:
+            job = self._completions.get()
+            if job is None:
+                break
+            complete_at, original_batch, results = job
+            time.sleep(max(0.0, complete_at - time.monotonic()))
+            for original, result in zip(original_batch, results):
+                self.output_queue.put((original, result))
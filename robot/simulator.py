@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Local RoArm-M2 simulator serving the same /js?json= endpoint as the arm."""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import kinematics
+
+class SimulatedArm():
+    """
+        Simulates the joints of a RoArm-M2. Each joint moves towards its target at a
+        constant angular speed, so feedback reads taken during a motion see the arm
+        part of the way there.
+
+        Attributes:
+            _joints (dict): The current joint angles in radians, keyed by b, s, e, t.
+            _targets (dict): The target joint angles in radians.
+            _rates (dict): The angular speed of each joint in radians per second.
+            _max_speed (float): The speed in degrees per second used for a speed of 0.
+            _led (int): The intensity of the light.
+            _time (float): The monotonic time of the last update.
+            _lock (threading.Lock): Guards the arm state.
+    """
+    _initial_position: dict = {'b': 0, 's': 0, 'e': 90, 't': 180}
+    _joint_indexes: dict = {1: 'b', 2: 's', 3: 'e', 4: 't'}
+
+    def __init__(self, max_speed: float = 180.0) -> None:
+        """
+            Initializes a new instance of the SimulatedArm class at the initial position.
+
+            Args:
+                max_speed (float): The speed in degrees per second used for a speed of 0.
+        """
+        self._max_speed = max_speed
+        self._joints = {joint: math.radians(angle) for joint, angle in self._initial_position.items()}
+        self._targets = dict(self._joints)
+        self._rates = {joint: math.radians(max_speed) for joint in self._joints}
+        self._led = 0
+        self._time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _update(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._time
+        self._time = now
+        for joint, target in self._targets.items():
+            error = target - self._joints[joint]
+            step = self._rates[joint] * elapsed
+            self._joints[joint] = target if abs(error) <= step else self._joints[joint] + math.copysign(step, error)
+
+    def _set_targets(self, targets: dict, speed: float) -> None:
+        rate = math.radians(speed if speed else self._max_speed)
+        for joint, target in targets.items():
+            self._targets[joint] = target
+            self._rates[joint] = rate
+
+    def is_moving(self) -> bool:
+        """
+            Returns whether any joint is still moving towards its target.
+
+            Returns:
+                bool: True while the arm is moving.
+        """
+        with self._lock:
+            self._update()
+            return any(self._joints[joint] != target for joint, target in self._targets.items())
+
+    def state(self) -> dict:
+        """
+            Returns the feedback of a T:105 command.
+
+            Returns:
+                dict: The position and joint angles of the arm.
+        """
+        with self._lock:
+            self._update()
+            joints = dict(self._joints)
+        x, y, z = kinematics.forward_kinematics([joints['b'], joints['s'], joints['e']]).tolist()
+        return {"T": 1051, "x": x, "y": y, "z": z, **joints, "torB": 0, "torS": 0, "torE": 0, "torH": 0}
+
+    def handle(self, command: dict) -> str:
+        """
+            Applies a JSON command to the arm and returns the response text.
+
+            Args:
+                command (dict): The decoded command.
+
+            Returns:
+                str: The response of the arm.
+        """
+        command_type = command.get('T')
+        if command_type == 105:
+            return json.dumps(self.state())
+        with self._lock:
+            self._update()
+            if command_type == 100:
+                targets = {joint: math.radians(angle) for joint, angle in self._initial_position.items()}
+                self._set_targets(targets, 0)
+            elif command_type == 104:
+                (b, s, e), _ = kinematics.inverse_kinematics([command['x'], command['y'], command['z']])
+                self._set_targets({'b': float(b), 's': float(s), 'e': float(e), 't': command['t']}, command.get('spd', 0))
+            elif command_type == 114:
+                self._led = command['led']
+            elif command_type == 121:
+                joint = self._joint_indexes[command['joint']]
+                self._set_targets({joint: math.radians(command['angle'])}, command.get('spd', 0))
+            elif command_type == 122:
+                targets = {joint: math.radians(command[key]) for joint, key in (('b', 'b'), ('s', 's'), ('e', 'e'), ('t', 'h'))}
+                self._set_targets(targets, command.get('spd', 0))
+            else:
+                return json.dumps({"error": f"Unsupported command: {command_type}"})
+        return ''
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        simulator = self.server.simulator
+        simulator.wait_latency()
+        if url.path != '/js' or 'json' not in parse_qs(url.query):
+            self.send_error(404)
+            return
+        try:
+            body = simulator.arm.handle(json.loads(parse_qs(url.query)['json'][0])).encode()
+            status = 200
+        except (ValueError, KeyError) as e:
+            body = json.dumps({"error": str(e)}).encode()
+            status = 400
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class RoArmSimulator():
+    """
+        Serves a SimulatedArm over HTTP on the RoArm-M2 /js?json= endpoint, with
+        configurable network latency and jitter.
+
+            with RoArmSimulator(latency=0.02, jitter=0.01) as simulator:
+                robot = Robot(ip_address=simulator.address)
+
+        Attributes:
+            arm (SimulatedArm): The simulated arm.
+            _latency (float): The mean added latency per request in seconds.
+            _jitter (float): The maximum random deviation from the latency in seconds.
+            _server (ThreadingHTTPServer): The HTTP server.
+            _thread (threading.Thread): The thread serving requests.
+    """
+    arm: SimulatedArm
+    _latency: float
+    _jitter: float
+    _server: ThreadingHTTPServer
+    _thread: threading.Thread = None
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 max_speed: float = 180.0) -> None:
+        """
+            Initializes a new instance of the RoArmSimulator class.
+
+            Args:
+                host (str): The address to listen on.
+                port (int): The port to listen on, or 0 for any free port.
+                latency (float): The mean added latency per request in seconds.
+                jitter (float): The maximum random deviation from the latency in seconds.
+                max_speed (float): The joint speed in degrees per second used for a speed of 0.
+        """
+        self.arm = SimulatedArm(max_speed)
+        self._latency = latency
+        self._jitter = jitter
+        self._server = ThreadingHTTPServer((host, port), _RequestHandler)
+        self._server.daemon_threads = True
+        self._server.simulator = self
+
+    @property
+    def address(self) -> str:
+        """
+            The host:port address to pass to Robot as its IP address.
+        """
+        host, port = self._server.server_address[:2]
+        return f'{host}:{port}'
+
+    def wait_latency(self) -> None:
+        """
+            Sleeps for the simulated network latency of one request.
+        """
+        delay = self._latency + random.uniform(-self._jitter, self._jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def start(self) -> 'RoArmSimulator':
+        """
+            Starts serving requests on a background thread.
+
+            Returns:
+                RoArmSimulator: This simulator.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+            Stops serving requests and closes the server socket.
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+def initialize_arg_parser() -> argparse.ArgumentParser:
+    """Initialize argument parser for the script."""
+    parser = argparse.ArgumentParser(description="RoArm-M2 HTTP simulator")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("-p", "--port", type=int, default=8080, help="Port to listen on.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added latency per request in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum latency jitter in seconds.")
+    parser.add_argument("--max_speed", type=float, default=180.0, help="Joint speed in degrees per second for speed 0.")
+    return parser
+
+def main() -> None:
+    args = initialize_arg_parser().parse_args()
+    simulator = RoArmSimulator(args.host, args.port, args.latency, args.jitter, args.max_speed)
+    print(f'Simulating RoArm-M2 on http://{simulator.address}/js?json=')
+    try:
+        simulator._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+
+if __name__ == "__main__":
+    main()
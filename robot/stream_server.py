@@ -0,0 +1,323 @@
+"""Live MJPEG and WebSocket stream of the camera feed, served with FastAPI."""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Set, Tuple
+import cv2
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from frame_packet import FramePacket, as_image
+
+MJPEG_BOUNDARY = 'frame'
+
+class Subscription():
+    """
+        One viewer of a FrameBroadcaster. It holds only the latest encoded frame, so
+        a viewer that sends slower than frames arrive skips the frames it missed
+        instead of queueing them or holding up the encoder.
+
+        Attributes:
+            dropped (int): The number of frames replaced before the viewer took them.
+            _loop (asyncio.AbstractEventLoop): The event loop of the viewer.
+            _ready (asyncio.Event): Set when a frame is waiting.
+            _frame (tuple): The (seq, jpeg) of the waiting frame.
+            _lock (threading.Lock): Guards _frame.
+    """
+    dropped: int = 0
+    _loop: asyncio.AbstractEventLoop
+    _ready: asyncio.Event
+    _frame: Tuple[int, bytes] = None
+    _lock: threading.Lock
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+            Initializes a new instance of the Subscription class.
+
+            Args:
+                loop (asyncio.AbstractEventLoop): The event loop the viewer runs on.
+        """
+        self._loop = loop
+        self._ready = asyncio.Event()
+        self._lock = threading.Lock()
+
+    def offer(self, seq: int, jpeg: bytes) -> None:
+        """
+            Hands a frame to the viewer from the encoder thread, replacing any frame it has not taken.
+
+            Args:
+                seq (int): The sequence number of the frame.
+                jpeg (bytes): The encoded frame, shared with the other viewers.
+        """
+        with self._lock:
+            if self._frame is not None:
+                self.dropped += 1
+            self._frame = (seq, jpeg)
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # The viewer's event loop has closed
+            pass
+
+    async def next(self) -> Tuple[int, bytes]:
+        """
+            Waits for the next frame.
+
+            Returns:
+                tuple: The (seq, jpeg) of the frame.
+        """
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            with self._lock:
+                frame, self._frame = self._frame, None
+            if frame is not None:
+                return frame
+
+class FrameBroadcaster():
+    """
+        Encodes the camera feed to JPEG once per frame and fans the bytes out to
+        every connected viewer.
+
+        publish() is called from the camera thread and only swaps the frame into a
+        slot, so encoding never runs on the frame processing path. The encoder
+        thread encodes the latest published frame at up to max_fps, and only while
+        at least one viewer is subscribed.
+
+        Attributes:
+            max_fps (float): The highest rate at which frames are encoded.
+            quality (int): The JPEG quality.
+            encoded (int): The number of frames encoded.
+            _subscribers (set): The subscriptions of the connected viewers.
+            _lock (threading.Lock): Guards _subscribers, _frame and _latest.
+            _frame (tuple): The (seq, frame) of the latest published frame not yet encoded.
+            _latest (tuple): The (seq, jpeg) of the last encoded frame.
+            _seq (int): The sequence number of the last published frame.
+            _new_frame (threading.Event): Set when a frame has been published.
+            _stop (threading.Event): Signals the encoder thread to stop.
+            _thread (threading.Thread): The encoder thread.
+    """
+    max_fps: float
+    quality: int
+    encoded: int = 0
+    _subscribers: Set[Subscription]
+    _lock: threading.Lock
+    _frame: Tuple[int, np.ndarray | FramePacket] = None
+    _latest: Tuple[int, bytes] = None
+    _seq: int = 0
+    _new_frame: threading.Event
+    _stop: threading.Event
+    _thread: threading.Thread = None
+
+    def __init__(self, max_fps: float = 15.0, quality: int = 80) -> None:
+        """
+            Initializes a new instance of the FrameBroadcaster class.
+
+            Args:
+                max_fps (float): The highest rate at which frames are encoded, or 0 for every frame.
+                quality (int): The JPEG quality, from 0 to 100.
+        """
+        self.max_fps = max_fps
+        self.quality = quality
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._new_frame = threading.Event()
+        self._stop = threading.Event()
+
+    @property
+    def viewers(self) -> int:
+        """The number of connected viewers."""
+        return len(self._subscribers)
+
+    def start(self) -> 'FrameBroadcaster':
+        """
+            Starts the encoder thread.
+
+            Returns:
+                FrameBroadcaster: This broadcaster.
+        """
+        self._thread = threading.Thread(target=self._run, name='stream-encoder', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+            Stops the encoder thread.
+        """
+        self._stop.set()
+        self._new_frame.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def publish(self, frame: np.ndarray | FramePacket) -> None:
+        """
+            Publishes a frame of the feed. Returns at once when nobody is watching. The
+            annotations of a packet are drawn on the encoder thread, only for frames encoded.
+
+            Args:
+                frame (np.ndarray | FramePacket): The BGR frame or packet. It must not be modified afterwards.
+        """
+        with self._lock:
+            self._seq += 1
+            if not self._subscribers:
+                return
+            self._frame = (self._seq, frame)
+        self._new_frame.set()
+
+    def latest(self) -> Tuple[int, bytes] | None:
+        """
+            Returns the last encoded frame.
+
+            Returns:
+                tuple: The (seq, jpeg) of the frame, or None if no frame has been encoded.
+        """
+        return self._latest
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[Subscription]:
+        """
+            Subscribes a viewer for the duration of the context. The viewer first
+            receives the last encoded frame, if any, so it does not start blank.
+
+            Yields:
+                Subscription: The subscription to read frames from.
+        """
+        subscription = Subscription(asyncio.get_running_loop())
+        latest = self._latest
+        if latest is not None:
+            subscription.offer(*latest)
+        with self._lock:
+            self._subscribers.add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscription)
+
+    def _encode(self, frame: np.ndarray) -> bytes:
+        success, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not success:
+            raise ValueError('Failed to encode frame')
+        return jpeg.tobytes()
+
+    def _run(self) -> None:
+        interval = 1.0 / self.max_fps if self.max_fps > 0 else 0.0
+        next_time = time.monotonic()
+        while not self._stop.is_set():
+            if not self._new_frame.wait(0.5):
+                continue
+            with self._lock:
+                self._new_frame.clear()
+                published, self._frame = self._frame, None
+                subscribers = list(self._subscribers)
+            if published is None or not subscribers:
+                continue
+            seq, frame = published
+            try:
+                jpeg = self._encode(as_image(frame))
+            except (ValueError, cv2.error) as e:
+                print(f'Could not encode stream frame: {e}')
+                continue
+            self.encoded += 1
+            self._latest = (seq, jpeg)
+            for subscription in subscribers:
+                subscription.offer(seq, jpeg)
+            next_time = max(next_time + interval, time.monotonic())
+            self._stop.wait(next_time - time.monotonic())
+
+def mjpeg_part(jpeg: bytes) -> bytes:
+    """
+    Wraps a JPEG as one part of a multipart/x-mixed-replace MJPEG stream.
+
+    Args:
+        jpeg: The encoded frame.
+
+    Returns:
+        The part, with its boundary and headers.
+    """
+    return (f'--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n'.encode()
+            + jpeg + b'\r\n')
+
+INDEX_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Robot camera</title></head>
+<body style="margin:0;background:#000">
+<img src="/stream.mjpg" style="max-width:100vw;max-height:100vh;display:block;margin:auto">
+</body>
+</html>
+"""
+
+def create_app(broadcaster: FrameBroadcaster) -> FastAPI:
+    """
+    Creates the FastAPI app serving the feed of a broadcaster.
+
+    Routes:
+        /             A page showing the MJPEG stream.
+        /stream.mjpg  The MJPEG stream.
+        /snapshot.jpg The last encoded frame.
+        /ws           The stream as one binary WebSocket message per JPEG frame.
+
+    Args:
+        broadcaster: The broadcaster of the feed.
+
+    Returns:
+        The app.
+    """
+    app = FastAPI(title='Robot camera stream')
+
+    @app.get('/', response_class=HTMLResponse)
+    async def index() -> str:
+        return INDEX_PAGE
+
+    @app.get('/stream.mjpg')
+    async def mjpeg() -> StreamingResponse:
+        async def parts():
+            async with broadcaster.subscribe() as subscription:
+                while True:
+                    _, jpeg = await subscription.next()
+                    yield mjpeg_part(jpeg)
+        return StreamingResponse(parts(), media_type=f'multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}')
+
+    @app.get('/snapshot.jpg')
+    async def snapshot() -> Response:
+        latest = broadcaster.latest()
+        if latest is None:
+            async with broadcaster.subscribe() as subscription:
+                try:
+                    latest = await asyncio.wait_for(subscription.next(), timeout=5.0)
+                except asyncio.TimeoutError:
+                    return Response(status_code=503)
+        return Response(content=latest[1], media_type='image/jpeg')
+
+    @app.websocket('/ws')
+    async def websocket(websocket: WebSocket) -> None:
+        await websocket.accept()
+        async with broadcaster.subscribe() as subscription:
+            try:
+                while True:
+                    _, jpeg = await subscription.next()
+                    await websocket.send_bytes(jpeg)
+            except WebSocketDisconnect:
+                pass
+
+    return app
+
+def serve(broadcaster: FrameBroadcaster, host: str = '127.0.0.1', port: int = 8000) -> threading.Thread:
+    """
+    Serves the feed of a broadcaster with uvicorn on a daemon thread.
+
+    Args:
+        broadcaster: The broadcaster of the feed.
+        host: The address to listen on. Defaults to this machine only; '0.0.0.0' exposes the feed on every interface.
+        port: The port to listen on.
+
+    Returns:
+        The server thread.
+    """
+    server = uvicorn.Server(uvicorn.Config(create_app(broadcaster), host=host, port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, name='stream-server', daemon=True)
+    thread.start()
+    return thread
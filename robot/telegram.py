@@ -22,7 +22,7 @@ def go_to(message):
 
 @telegram_bot.message_handler(commands=ROBOT_COMMANDS)
 def do_robot_action(message):
-    controller.send_action_to_robot(message.text.replace('/',''))
+    controller.send_action_to_robot(message.text.replace('/',''), wait=False)
 
 @telegram_bot.message_handler(commands=['get_camera_metadata'])
 def send_camera_metadata(message):
@@ -0,0 +1,128 @@
+from typing import List, Tuple
+import numpy as np
+from yolo_postprocess import non_max_suppression
+
+class TileGrid():
+    """
+        Splits frames into overlapping tiles for sliced inference.
+
+        Shrinking a 1280x1280 frame to a 640x640 model input halves the size of
+        every object, and tiny objects vanish. Running the model on a grid of
+        tiles, each scaled down far less, keeps them visible at the cost of one
+        inference per tile. Neighbouring tiles overlap by overlap times the tile
+        size, so an object cut by one tile's edge is whole in the next. With
+        include_full, the whole frame is added as a last tile, so objects larger
+        than a tile are still found in one piece.
+
+        The tiles of a frame are sent to the device as one batch and their
+        detections merged with merge_detections().
+
+        Attributes:
+            rows (int): The number of rows of tiles.
+            cols (int): The number of columns of tiles.
+            overlap (float): The overlap of neighbouring tiles as a fraction of the tile size.
+            include_full (bool): Whether the whole frame is added as a last tile.
+    """
+    rows: int
+    cols: int
+    overlap: float
+    include_full: bool
+
+    def __init__(self, rows: int = 2, cols: int = 2, overlap: float = 0.2, include_full: bool = True) -> None:
+        """
+            Initializes a new instance of the TileGrid class.
+
+            Args:
+                rows (int): The number of rows of tiles.
+                cols (int): The number of columns of tiles.
+                overlap (float): The overlap of neighbouring tiles as a fraction of the tile size, below 1.
+                include_full (bool): Whether to add the whole frame as a last tile.
+        """
+        if rows < 1 or cols < 1 or not 0 <= overlap < 1:
+            raise ValueError(f'Invalid tile grid {rows}x{cols} with overlap {overlap}')
+        self.rows = rows
+        self.cols = cols
+        self.overlap = overlap
+        self.include_full = include_full
+
+    @classmethod
+    def parse(cls, grid: str, overlap: float = 0.2, include_full: bool = True) -> 'TileGrid':
+        """
+            Creates a tile grid from a ROWSxCOLS string such as '2x2'.
+
+            Args:
+                grid (str): The grid.
+                overlap (float): The overlap of neighbouring tiles as a fraction of the tile size.
+                include_full (bool): Whether to add the whole frame as a last tile.
+
+            Returns:
+                TileGrid: The tile grid.
+        """
+        try:
+            rows, cols = (int(n) for n in grid.lower().split('x'))
+        except ValueError:
+            raise ValueError(f'Invalid tile grid {grid!r}, expected ROWSxCOLS such as 2x2') from None
+        return cls(rows, cols, overlap, include_full)
+
+    def __len__(self) -> int:
+        count = self.rows * self.cols
+        return count + int(self.include_full and count > 1)
+
+    def __str__(self) -> str:
+        return f'{self.rows}x{self.cols}' + (' + full' if self.include_full and self.rows * self.cols > 1 else '')
+
+    def boxes(self, size: Tuple[int, int]) -> np.ndarray:
+        """
+            Returns the tiles of a frame.
+
+            Args:
+                size (tuple): The (width, height) of the frame.
+
+            Returns:
+                np.ndarray: The (n, 4) int xyxy tiles in pixels, row by row, then the whole frame if included.
+        """
+        width, height = size
+        xs = self._spans(width, self.cols)
+        ys = self._spans(height, self.rows)
+        boxes = [(x0, y0, x1, y1) for y0, y1 in ys for x0, x1 in xs]
+        if self.include_full and len(boxes) > 1:
+            boxes.append((0, 0, width, height))
+        return np.array(boxes, dtype=np.int64).reshape(-1, 4)
+
+    def _spans(self, length: int, count: int) -> List[Tuple[int, int]]:
+        # count tiles of equal size, each overlapping the next by overlap of its size, covering length
+        tile = length / (count - (count - 1) * self.overlap)
+        step = tile * (1 - self.overlap)
+        return [(round(i * step), min(length, round(i * step + tile))) for i in range(count)]
+
+def merge_detections(xyxy: List[np.ndarray], confidence: List[np.ndarray], class_id: List[np.ndarray],
+                     tiles: np.ndarray, iou_threshold: float = 0.45
+                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Merges the detections of the tiles of a frame into one set of frame detections.
+
+    The boxes of each tile are moved by the tile's top-left corner in one operation,
+    then class-aware NMS across all tiles drops the duplicates of objects seen in
+    more than one tile, keeping the most confident box of each.
+
+    Args:
+        xyxy: The (n, 4) boxes of each tile, in pixels of the tile.
+        confidence: The (n,) confidences of each tile.
+        class_id: The (n,) class ids of each tile.
+        tiles: The (t, 4) xyxy tiles, as returned by TileGrid.boxes().
+        iou_threshold: Boxes overlapping a more confident box of the same class by more than this are dropped.
+
+    Returns:
+        The (n, 4) float32 xyxy boxes in frame pixels, the (n,) confidences and the (n,) class ids.
+    """
+    counts = np.fromiter((len(boxes) for boxes in xyxy), dtype=np.intp, count=len(xyxy))
+    if counts.sum() == 0:
+        return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.float32), np.empty(0, dtype=int)
+    offsets = np.repeat(tiles[:len(xyxy), [0, 1, 0, 1]], counts, axis=0).astype(np.float32)
+    boxes = np.concatenate(xyxy).astype(np.float32) + offsets
+    scores = np.concatenate(confidence)
+    classes = np.concatenate(class_id)
+    if len(xyxy) == 1:
+        return boxes, scores, classes
+    keep = non_max_suppression(boxes, scores, classes, iou_threshold)
+    return boxes[keep], scores[keep], classes[keep]
@@ -0,0 +1,292 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Iterator, List
+import numpy as np
+import kinematics
+
+class Waypoint():
+    """
+        A single step of a trajectory.
+
+        Attributes:
+            kind (str): The type of step: 'joint', 'cartesian', 'gripper' or 'reset'.
+            values (dict): The target values of the step. Joint angles are in degrees
+                           (b, s, e, h), coordinates in mm (x, y, z) with t in radians,
+                           and gripper steps use 'angle' in degrees.
+            speed (int): The speed of the step, or None for the robot's speed.
+            acceleration (int): The acceleration of the step, or None for the robot's acceleration.
+            dwell (float): The number of seconds the step is given before the next one
+                           starts. In settle mode the step ends early once the arm has settled.
+    """
+    kind: str
+    values: dict
+    speed: int
+    acceleration: int
+    dwell: float
+
+    def __init__(self, kind: str, values: dict, speed: int = None, acceleration: int = None, dwell: float = 0) -> None:
+        self.kind = kind
+        self.values = values
+        self.speed = speed
+        self.acceleration = acceleration
+        self.dwell = dwell
+
+    def __repr__(self) -> str:
+        return f'Waypoint({self.kind!r}, {self.values!r}, speed={self.speed}, acceleration={self.acceleration}, dwell={self.dwell})'
+
+    def run(self, robot):
+        """
+            Sends the step to the robot and waits for its dwell time.
+
+            Args:
+                robot (Robot): The robot to move.
+
+            Returns:
+                The result of the robot call, which is awaitable for an AsyncRobot.
+        """
+        if self.kind == 'joint':
+            return robot.move_to_position(**self.values, speed=self.speed, acceleration=self.acceleration, delay=self.dwell)
+        elif self.kind == 'cartesian':
+            return robot.move_to_coordinates(**self.values, speed=self.speed, delay=self.dwell)
+        elif self.kind == 'gripper':
+            return robot.exact_move(4, self.values['angle'], delay=self.dwell)
+        elif self.kind == 'reset':
+            return robot.reset()
+        else:
+            raise ValueError(f'Unknown waypoint type: {self.kind}')
+
+class Trajectory():
+    """
+        A sequence of joint, Cartesian and gripper waypoints executed in order.
+
+        Waypoints are added with the builder methods, which return the trajectory so
+        that calls can be chained:
+
+            Trajectory().joint(e=60, b=60, dwell=4).cartesian(x=250, y=0, z=250, dwell=5)
+
+        Attributes:
+            _waypoints (List[Waypoint]): The waypoints of the trajectory.
+    """
+    _waypoints: List[Waypoint]
+
+    def __init__(self, waypoints: List[Waypoint] = None) -> None:
+        """
+            Initializes a new instance of the Trajectory class.
+
+            Args:
+                waypoints (List[Waypoint]): The initial waypoints.
+        """
+        self._waypoints = list(waypoints) if waypoints is not None else []
+
+    def __len__(self) -> int:
+        return len(self._waypoints)
+
+    def __iter__(self) -> Iterator[Waypoint]:
+        return iter(self._waypoints)
+
+    def add(self, waypoint: Waypoint) -> 'Trajectory':
+        """
+            Appends a waypoint to the trajectory.
+
+            Args:
+                waypoint (Waypoint): The waypoint to add.
+
+            Returns:
+                Trajectory: This trajectory.
+        """
+        self._waypoints.append(waypoint)
+        return self
+
+    def joint(self, e: float = None, b: float = None, s: float = None, h: float = None, speed: int = None,
+              acceleration: int = None, dwell: float = 0) -> 'Trajectory':
+        """
+            Appends a joint-space waypoint. Joints left as None keep their current angle.
+
+            Args:
+                e (float): The angle of the elbow joint in degrees.
+                b (float): The angle of the base joint in degrees.
+                s (float): The angle of the shoulder joint in degrees.
+                h (float): The angle of the hand joint in degrees.
+                speed (int): The speed of the step.
+                acceleration (int): The acceleration of the step.
+                dwell (float): The number of seconds the step is given.
+
+            Returns:
+                Trajectory: This trajectory.
+        """
+        return self.add(Waypoint('joint', {'e': e, 'b': b, 's': s, 'h': h}, speed, acceleration, dwell))
+
+    def cartesian(self, x: float = None, y: float = None, z: float = None, t: float = None, speed: int = None,
+                  dwell: float = 0) -> 'Trajectory':
+        """
+            Appends a Cartesian waypoint. Coordinates left as None keep their current value.
+
+            Args:
+                x (float): The x coordinate in mm.
+                y (float): The y coordinate in mm.
+                z (float): The z coordinate in mm.
+                t (float): The angle of the hand in radians.
+                speed (int): The speed of the step.
+                dwell (float): The number of seconds the step is given.
+
+            Returns:
+                Trajectory: This trajectory.
+        """
+        return self.add(Waypoint('cartesian', {'x': x, 'y': y, 'z': z, 't': t}, speed, None, dwell))
+
+    def gripper(self, angle: float, dwell: float = 0) -> 'Trajectory':
+        """
+            Appends a gripper waypoint.
+
+            Args:
+                angle (float): The angle of the gripper in degrees.
+                dwell (float): The number of seconds the step is given.
+
+            Returns:
+                Trajectory: This trajectory.
+        """
+        return self.add(Waypoint('gripper', {'angle': angle}, dwell=dwell))
+
+    def reset(self) -> 'Trajectory':
+        """
+            Appends a step that returns the robot to its initial position.
+
+            Returns:
+                Trajectory: This trajectory.
+        """
+        return self.add(Waypoint('reset', {}))
+
+    def validate(self) -> List[int]:
+        """
+            Checks every waypoint against the arm's workspace and joint limits without
+            querying the arm. Values left as None are not checked.
+
+            Returns:
+                List[int]: The indices of the waypoints that cannot be reached.
+        """
+        invalid = []
+        cartesian = [(index, waypoint) for index, waypoint in enumerate(self._waypoints)
+                     if waypoint.kind == 'cartesian' and None not in (waypoint.values['x'], waypoint.values['y'], waypoint.values['z'])]
+        if cartesian:
+            positions = np.array([[waypoint.values[key] for key in ('x', 'y', 'z')] for _, waypoint in cartesian], dtype=np.float64)
+            reachable = kinematics.is_reachable(positions)
+            # The hand angle of a cartesian waypoint is in radians
+            hand = np.array([np.nan if waypoint.values['t'] is None else waypoint.values['t'] for _, waypoint in cartesian])
+            t_min, t_max = kinematics.JOINT_LIMITS[3]
+            reachable &= np.isnan(hand) | ((hand >= t_min) & (hand <= t_max))
+            invalid += [index for (index, _), ok in zip(cartesian, reachable) if not ok]
+        joint = [(index, waypoint) for index, waypoint in enumerate(self._waypoints) if waypoint.kind == 'joint']
+        if joint:
+            angles = np.radians(np.array([[np.nan if waypoint.values[key] is None else waypoint.values[key] for key in ('b', 's', 'e', 'h')]
+                                          for _, waypoint in joint], dtype=np.float64))
+            within = np.isnan(angles) | ((angles >= kinematics.JOINT_LIMITS[:, 0]) & (angles <= kinematics.JOINT_LIMITS[:, 1]))
+            invalid += [index for (index, _), ok in zip(joint, within.all(axis=1)) if not ok]
+        return sorted(invalid)
+
+    def run(self, robot) -> None:
+        """
+            Executes the trajectory on the robot, blocking until it is finished.
+
+            Args:
+                robot (Robot): The robot to move.
+        """
+        for waypoint in self._waypoints:
+            waypoint.run(robot)
+
+    async def run_async(self, robot) -> None:
+        """
+            Executes the trajectory on an AsyncRobot.
+
+            Args:
+                robot (AsyncRobot): The robot to move.
+        """
+        for waypoint in self._waypoints:
+            await waypoint.run(robot)
+
+class MotionExecutor():
+    """
+        Runs motions one at a time on a dedicated thread so that callers can start a
+        motion and carry on with other work.
+
+        Attributes:
+            _robot (Robot): The robot the motions are run on.
+            _queue (queue.Queue): The pending (motion, future) pairs.
+            _thread (threading.Thread): The executor thread.
+    """
+    _robot: object
+    _queue: queue.Queue
+    _thread: threading.Thread
+
+    def __init__(self, robot) -> None:
+        """
+            Initializes a new instance of the MotionExecutor class and starts its thread.
+
+            Args:
+                robot (Robot): The robot the motions are run on.
+        """
+        self._robot = robot
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, motion: Callable) -> Future:
+        """
+            Queues a motion for execution.
+
+            Args:
+                motion (Callable): A callable taking the robot, such as Trajectory.run.
+
+            Returns:
+                Future: A future that completes when the motion has finished.
+        """
+        future = Future()
+        self._queue.put((motion, future))
+        return future
+
+    def is_executor_thread(self) -> bool:
+        """
+            Returns whether the caller is running on the executor thread.
+
+            Returns:
+                bool: True if called from a motion being executed.
+        """
+        return threading.current_thread() is self._thread
+
+    def cancel_pending(self) -> int:
+        """
+            Cancels all motions that have not started yet.
+
+            Returns:
+                int: The number of cancelled motions.
+        """
+        cancelled = 0
+        while True:
+            try:
+                motion, future = self._queue.get_nowait()
+            except queue.Empty:
+                return cancelled
+            if motion is None:
+                self._queue.put((motion, future))
+                return cancelled
+            future.cancel()
+            cancelled += 1
+
+    def stop(self) -> None:
+        """
+            Stops the executor thread once the queued motions have finished.
+        """
+        self._queue.put((None, None))
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            motion, future = self._queue.get()
+            if motion is None:
+                break
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(motion(self._robot))
+            except Exception as e:
+                future.set_exception(e)
@@ -0,0 +1,276 @@
+import json
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable
+import requests
+import serial
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+class Transport():
+    """
+        Base class for the links used to send JSON commands to the robot.
+
+        A transport takes a raw JSON command string (e.g. '{"T":105}') and returns
+        the raw response text from the robot. New backends only need to implement
+        send() and, if they hold resources, close().
+    """
+
+    def send(self, command: str) -> str:
+        """
+            Sends a command to the robot and returns the response.
+
+            Args:
+                command (str): The JSON command to send to the robot.
+
+            Returns:
+                str: The response from the robot.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+            Releases any resources held by the transport.
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class HttpTransport(Transport):
+    """
+        Sends commands to the robot over its HTTP JSON endpoint using a persistent
+        keep-alive session.
+
+        Attributes:
+            _ip_addr (str): The IP address of the robot.
+            _timeout (tuple): The (connect, read) timeouts in seconds.
+            _pool_size (int): The number of pooled connections kept to the robot.
+            _retries (int): The number of connection retries before giving up.
+            _session (requests.Session): The pooled session used for requests.
+    """
+    _ip_addr: str
+    _timeout: tuple
+    _pool_size: int
+    _retries: int
+    _session: requests.Session
+
+    def __init__(self, ip_address: str, connect_timeout: float = 2.0, read_timeout: float = 5.0,
+                 pool_size: int = 2, retries: int = 2) -> None:
+        """
+            Initializes a new instance of the HttpTransport class.
+
+            Args:
+                ip_address (str): The IP address of the robot.
+                connect_timeout (float): Seconds to wait for a connection to the robot.
+                read_timeout (float): Seconds to wait for the robot to respond.
+                pool_size (int): The number of pooled connections kept to the robot.
+                retries (int): The number of connection retries before giving up.
+        """
+        self._ip_addr = ip_address
+        self._timeout = (connect_timeout, read_timeout)
+        self._pool_size = pool_size
+        self._retries = retries
+        self._session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """
+            Creates a keep-alive session with a small connection pool. Only connection
+            errors are retried so that a command is never sent twice.
+
+            Returns:
+                requests.Session: The new session.
+        """
+        retry = Retry(total=self._retries, connect=self._retries, read=0, redirect=0,
+                      status=0, backoff_factor=0.05)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        return session
+
+    def reconnect(self) -> None:
+        """
+            Drops all pooled connections and starts a new session.
+        """
+        self._session.close()
+        self._session = self._create_session()
+
+    def send(self, command: str) -> str:
+        """
+            Sends a command to the robot and returns the response. Failures to
+            connect are retried by the session. Any other connection error may
+            come after the robot received the command, so it is not resent: the
+            pooled connections are dropped, so the next command starts afresh,
+            and the error is raised to the caller.
+
+            Args:
+                command (str): The JSON command to send to the robot.
+
+            Returns:
+                str: The response from the robot.
+        """
+        url = "http://" + self._ip_addr + "/js?json=" + command
+        try:
+            response = self._session.get(url, timeout=self._timeout)
+        except requests.ConnectionError:
+            self.reconnect()
+            raise
+        return response.text
+
+    def close(self) -> None:
+        """
+            Closes the session and all pooled connections.
+        """
+        self._session.close()
+
+class SerialTransport(Transport):
+    """
+        Sends commands to the robot as newline-framed JSON over its USB serial port.
+
+        Writes are pipelined: a command is written as soon as it is sent, without
+        waiting for earlier responses. A read thread parses every line from the
+        robot and hands it to the oldest request waiting for that response type;
+        lines nobody is waiting for (e.g. continuous feedback) are kept as the latest
+        feedback and passed to the feedback callback.
+
+        Attributes:
+            _port (str): The serial device, e.g. /dev/ttyUSB0.
+            _baudrate (int): The baud rate of the serial link.
+            _read_timeout (float): Seconds to wait for a response.
+            _serial (serial.Serial): The open serial port.
+            _write_lock (threading.Lock): Serializes writes and the pending queues.
+            _pending (dict): Futures waiting for a response, keyed by response type.
+            _closed (threading.Event): Signals the read thread to stop.
+            _reader (threading.Thread): The read thread.
+            latest_feedback (dict): The last unsolicited message from the robot.
+            on_feedback (Callable): Called with each unsolicited message, if set.
+    """
+    _responses: dict = {105: 1051}
+    _port: str
+    _baudrate: int
+    _read_timeout: float
+    _serial: serial.Serial
+    _write_lock: threading.Lock
+    _pending: dict
+    _closed: threading.Event
+    _reader: threading.Thread
+    latest_feedback: dict = None
+    on_feedback: Callable = None
+
+    def __init__(self, port: str, baudrate: int = 115200, read_timeout: float = 2.0,
+                 on_feedback: Callable = None) -> None:
+        """
+            Initializes a new instance of the SerialTransport class and starts its read thread.
+
+            Args:
+                port (str): The serial device, e.g. /dev/ttyUSB0.
+                baudrate (int): The baud rate of the serial link.
+                read_timeout (float): Seconds to wait for a response.
+                on_feedback (Callable): Called with each unsolicited message from the robot.
+        """
+        self._port = port
+        self._baudrate = baudrate
+        self._read_timeout = read_timeout
+        self.on_feedback = on_feedback
+        self._write_lock = threading.Lock()
+        self._pending = {}
+        self._closed = threading.Event()
+        self._serial = self._open()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def _open(self) -> serial.Serial:
+        return serial.Serial(self._port, self._baudrate, timeout=0.1)
+
+    def send_async(self, command: str) -> Future:
+        """
+            Writes a command without waiting for its response.
+
+            Args:
+                command (str): The JSON command to send to the robot.
+
+            Returns:
+                Future: A future holding the response text. Commands that have no
+                        response complete with an empty string once written.
+        """
+        response_type = self._responses.get(json.loads(command).get('T'))
+        future = Future()
+        with self._write_lock:
+            if response_type is not None:
+                self._pending.setdefault(response_type, deque()).append(future)
+            try:
+                self._serial.write(command.encode() + b'\n')
+            except serial.SerialException:
+                self.reconnect()
+                self._serial.write(command.encode() + b'\n')
+        if response_type is None:
+            future.set_result('')
+        return future
+
+    def send(self, command: str) -> str:
+        """
+            Sends a command to the robot and returns the response.
+
+            Args:
+                command (str): The JSON command to send to the robot.
+
+            Returns:
+                str: The response from the robot.
+        """
+        future = self.send_async(command)
+        try:
+            return future.result(timeout=self._read_timeout)
+        except TimeoutError:
+            with self._write_lock:
+                for waiting in self._pending.values():
+                    if future in waiting:
+                        waiting.remove(future)
+            raise
+
+    def reconnect(self) -> None:
+        """
+            Closes and reopens the serial port.
+        """
+        try:
+            self._serial.close()
+        except serial.SerialException:
+            pass
+        self._serial = self._open()
+
+    def _read_loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                line = self._serial.readline()
+            except (serial.SerialException, TypeError, OSError):
+                if self._closed.is_set():
+                    break
+                self._closed.wait(0.1)
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            with self._write_lock:
+                waiting = self._pending.get(message.get('T'))
+                future = waiting.popleft() if waiting else None
+            if future is not None:
+                future.set_result(line.decode())
+            else:
+                self.latest_feedback = message
+                if self.on_feedback is not None:
+                    self.on_feedback(message)
+
+    def close(self) -> None:
+        """
+            Stops the read thread and closes the serial port.
+        """
+        self._closed.set()
+        self._serial.close()
+        self._reader.join()
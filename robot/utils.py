@@ -15,7 +15,7 @@ class HailoAsyncInference:
         self, hef_path: str, input_queue: queue.Queue,
         output_queue: queue.Queue, batch_size: int = 1,
         input_type: Optional[str] = None, output_type: Optional[Dict[str, str]] = None,
-        send_original_frame: bool = False) -> None:
+        send_original_frame: bool = False, pool_size: Optional[int] = None) -> None:
         """
         Initialize the HailoAsyncInference class with the provided HEF model 
         file path and input/output queues.
@@ -30,6 +30,12 @@ class HailoAsyncInference:
                                         Possible values: 'UINT8', 'UINT16'.
             output_type Optional[dict[str, str]] : Format type of the output stream. 
                                          Possible values: 'UINT8', 'UINT16', 'FLOAT32'.
+            send_original_frame (bool): Whether input batches are (original, preprocessed)
+                                        pairs, with the original returned alongside each result.
+            pool_size (Optional[int]): If set, this many bindings and output buffers are
+                                       allocated once and reused. Each result then has to be
+                                       handed back with release() once it has been consumed.
+                                       Defaults to new bindings for every frame.
         """
         self.input_queue = input_queue
         self.output_queue = output_queue
@@ -48,6 +54,13 @@ class HailoAsyncInference:
 
         self.output_type = output_type
         self.send_original_frame = send_original_frame
+        self.input_dtype = self._get_input_dtype()
+        self.pool_size = pool_size
+        self._bindings_pool: Optional[queue.Queue] = None
+        # id of each leased result -> (result, bindings). Holding the result keeps its id
+        # from being reused by another object while the lease is live.
+        self._leased: Dict[int, Tuple[object, object]] = {}
+        self._output_buffer_specs = self._get_output_buffer_specs()
 
     def _set_input_type(self, input_type: Optional[str] = None) -> None:
         """
@@ -59,6 +72,16 @@ class HailoAsyncInference:
         """
         self.infer_model.input().set_format_type(getattr(FormatType, input_type))
     
+    def _get_input_dtype(self) -> np.dtype:
+        """
+        Get the dtype of the model input, after any input_type override, so that
+        input buffers are only converted when they do not already match it.
+
+        Returns:
+            np.dtype: The input dtype.
+        """
+        return np.dtype(getattr(np, str(self.infer_model.input().format.type).split(".")[1].lower()))
+
     def _set_output_type(self, output_type_dict: Optional[Dict[str, str]] = None) -> None:
         """
         Set the output type for the HEF model. If the model has multiple outputs,
@@ -87,6 +110,11 @@ class HailoAsyncInference:
         """
         if completion_info.exception:
             logger.error(f'Inference error: {completion_info.exception}')
+            for bindings in bindings_list:
+                self._return_bindings(bindings)
+            # A result of None for every frame of the job, so consumers waiting on them carry on
+            for original in input_batch:
+                self.output_queue.put((original, None))
         else:
             for i, bindings in enumerate(bindings_list):
                 # If the model has a single output, return the output buffer. 
@@ -100,8 +128,27 @@ class HailoAsyncInference:
                         )
                         for name in bindings._output_names
                     }
+                if self._bindings_pool is not None:
+                    self._leased[id(result)] = (result, bindings)
                 self.output_queue.put((input_batch[i], result))
 
+    def release(self, result) -> None:
+        """
+        Hands a result back so that its bindings and output buffers can be reused.
+        Does nothing unless the bindings are pooled.
+
+        Args:
+            result: A result taken from the output queue.
+        """
+        lease = self._leased.get(id(result))
+        if lease is not None and lease[0] is result:
+            del self._leased[id(result)]
+            self._return_bindings(lease[1])
+
+    def _return_bindings(self, bindings) -> None:
+        if self._bindings_pool is not None:
+            self._bindings_pool.put(bindings)
+
     def get_vstream_info(self) -> Tuple[list, list]:
 
         """
@@ -136,6 +183,10 @@ class HailoAsyncInference:
 
     def run(self) -> None:
         with self.infer_model.configure() as configured_infer_model:
+            if self.pool_size is not None:
+                self._bindings_pool = queue.Queue()
+                for _ in range(self.pool_size):
+                    self._bindings_pool.put(self._create_bindings(configured_infer_model))
             while True:
                 batch_data = self.input_queue.get()
                 if batch_data is None:
@@ -148,11 +199,11 @@ class HailoAsyncInference:
 
                 bindings_list = []
                 for frame in preprocessed_batch:
-                    bindings = self._create_bindings(configured_infer_model)
-                    bindings.input().set_buffer(np.array(frame))
+                    bindings = self._acquire_bindings(configured_infer_model)
+                    bindings.input().set_buffer(self._as_input_buffer(frame))
                     bindings_list.append(bindings)
 
-                configured_infer_model.wait_for_async_ready(timeout_ms=10000)
+                configured_infer_model.wait_for_async_ready(timeout_ms=10000, frames_count=len(bindings_list))
                 job = configured_infer_model.run_async(
                     bindings_list, partial(
                         self.callback,
@@ -166,7 +217,58 @@ class HailoAsyncInference:
         if self.output_type is None:
             return str(output_info.format.type).split(".")[1].lower()
         else:
-            self.output_type[output_info.name].lower()
+            return self.output_type[output_info.name].lower()
+
+    def _get_output_buffer_specs(self) -> Dict[str, Tuple[Tuple[int, ...], np.dtype]]:
+        """
+        Look up the shape and dtype of every output buffer once.
+
+        Returns:
+            Dict[str, Tuple[Tuple[int, ...], np.dtype]]: The (shape, dtype) of each output, by name.
+        """
+        if self.output_type is None:
+            names = [output_info.name for output_info in self.hef.get_output_vstream_infos()]
+            dtypes = [
+                getattr(np, self._get_output_type_str(output_info))
+                for output_info in self.hef.get_output_vstream_infos()
+            ]
+        else:
+            names = list(self.output_type)
+            dtypes = [getattr(np, self.output_type[name].lower()) for name in names]
+        return {
+            name: (self.infer_model.output(name).shape, dtype)
+            for name, dtype in zip(names, dtypes)
+        }
+
+    def _as_input_buffer(self, frame) -> np.ndarray:
+        """
+        Return the frame as a contiguous array of the input type, copying only if needed.
+
+        Args:
+            frame: The preprocessed frame.
+
+        Returns:
+            np.ndarray: The input buffer.
+        """
+        if (isinstance(frame, np.ndarray) and frame.dtype == self.input_dtype
+                and frame.flags.c_contiguous):
+            return frame
+        return np.ascontiguousarray(frame, dtype=self.input_dtype)
+
+    def _acquire_bindings(self, configured_infer_model) -> object:
+        """
+        Take bindings from the pool, waiting for a consumer to release some if all
+        are in use, or create new ones if the bindings are not pooled.
+
+        Args:
+            configured_infer_model: The configured inference model.
+
+        Returns:
+            object: Bindings object with input and output buffers.
+        """
+        if self._bindings_pool is None:
+            return self._create_bindings(configured_infer_model)
+        return self._bindings_pool.get()
 
     def _create_bindings(self, configured_infer_model) -> object:
         """
@@ -178,22 +280,10 @@ class HailoAsyncInference:
         Returns:
             object: Bindings object with input and output buffers.
         """
-        if self.output_type is None:
-            output_buffers = {
-                output_info.name: np.empty(
-                    self.infer_model.output(output_info.name).shape,
-                    dtype=(getattr(np, self._get_output_type_str(output_info)))
-                )
-            for output_info in self.hef.get_output_vstream_infos()
-            }
-        else:
-            output_buffers = {
-                name: np.empty(
-                    self.infer_model.output(name).shape, 
-                    dtype=(getattr(np, self.output_type[name].lower()))
-                )
-            for name in self.output_type
-            }
+        output_buffers = {
+            name: np.empty(shape, dtype=dtype)
+            for name, (shape, dtype) in self._output_buffer_specs.items()
+        }
         return configured_infer_model.create_bindings(
             output_buffers=output_buffers
         )
@@ -0,0 +1,205 @@
+import threading
+import time
+from typing import List, Tuple
+import cv2
+import numpy as np
+from frame_packet import FramePacket, as_image
+
+class VideoRingBuffer():
+    """
+        Keeps the last window seconds of the camera feed in a fixed amount of memory.
+
+        Frames are subsampled to fps and near-duplicates of the last stored frame
+        are skipped, so a still scene does not fill the window with copies. Stored
+        frames are scaled down to at most max_side pixels and written either into a
+        ring of preallocated arrays, or, with jpeg_quality set, as JPEG bytes in a
+        ring of slots, which is roughly ten times smaller again at some CPU cost.
+        The ring is allocated on the first frame, once its aspect ratio is known.
+
+        Reads are snapshots: they copy the frames out and leave the buffer as it is,
+        so any number of readers can ask for the same footage.
+
+        Attributes:
+            window (float): The number of seconds of footage kept.
+            fps (float): The highest rate at which frames are stored.
+            capacity (int): The number of frames the ring holds.
+            max_side (int): The longest side of stored frames in pixels.
+            jpeg_quality (int): The JPEG quality of stored frames, or None to store raw arrays.
+            duplicate_threshold (float): The change in grey levels that no pixel of a frame's
+                thumbnail may reach for the frame to count as a duplicate of the last stored
+                frame. 0 keeps every frame.
+            _frames (np.ndarray | list): The ring of stored frames.
+            _timestamps (np.ndarray): The monotonic capture time of each slot.
+            _next (int): The slot the next frame is written to.
+            _count (int): The number of slots holding a frame.
+            _size (tuple): The (width, height) of stored frames.
+            _last_time (float): The capture time of the last stored frame.
+            _last_thumbnail (np.ndarray): The thumbnail of the last stored frame.
+            _lock (threading.Lock): Guards the ring.
+    """
+    window: float
+    fps: float
+    capacity: int
+    max_side: int
+    jpeg_quality: int = None
+    duplicate_threshold: float
+    _frames: np.ndarray | list = None
+    _timestamps: np.ndarray
+    _next: int = 0
+    _count: int = 0
+    _size: Tuple[int, int] = None
+    _last_time: float = None
+    _last_thumbnail: np.ndarray = None
+    _lock: threading.Lock
+
+    _thumbnail_size: Tuple[int, int] = (64, 64)
+
+    def __init__(self, window: float = 30.0, fps: float = 10.0, max_side: int = 320, jpeg_quality: int = None,
+                 duplicate_threshold: float = 6.0) -> None:
+        """
+            Initializes a new instance of the VideoRingBuffer class.
+
+            Args:
+                window (float): The number of seconds of footage to keep.
+                fps (float): The highest rate at which frames are stored.
+                max_side (int): The longest side of stored frames in pixels.
+                jpeg_quality (int): Store frames as JPEG at this quality instead of as raw arrays.
+                duplicate_threshold (float): The change in grey levels below which a frame is skipped as
+                                             a duplicate. 0 keeps every frame.
+        """
+        self.window = window
+        self.fps = fps
+        self.capacity = max(1, int(round(window * fps)))
+        self.max_side = max_side
+        self.jpeg_quality = jpeg_quality
+        self.duplicate_threshold = duplicate_threshold
+        self._timestamps = np.zeros(self.capacity)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, frame: np.ndarray | FramePacket, timestamp: float = None) -> bool:
+        """
+            Offers a frame to the buffer. It is stored unless it comes sooner than 1 / fps
+            after the last stored frame or is a near-duplicate of it.
+
+            Args:
+                frame (np.ndarray | FramePacket): The BGR frame, or a packet whose annotations are drawn
+                                                  only if the frame is stored. It is not kept, only a scaled copy.
+                timestamp (float): The monotonic capture time of the frame. Defaults to now.
+
+            Returns:
+                bool: Whether the frame was stored.
+        """
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        # A small tolerance so a source running at exactly fps is not subsampled by jitter
+        if self._last_time is not None and timestamp - self._last_time < 0.9 / self.fps:
+            return False
+
+        frame = as_image(frame)
+        if self._size is None:
+            self._allocate(frame.shape)
+        small = frame
+        if frame.shape[1::-1] != self._size:
+            small = cv2.resize(frame, self._size, interpolation=cv2.INTER_AREA)
+
+        # Area averaging down to the thumbnail also averages out sensor noise, so comparing
+        # the largest change catches a small object moving without tripping on noise
+        thumbnail = cv2.cvtColor(cv2.resize(small, self._thumbnail_size, interpolation=cv2.INTER_AREA),
+                                 cv2.COLOR_BGR2GRAY)
+        if self._last_thumbnail is not None and self.duplicate_threshold > 0:
+            if cv2.absdiff(thumbnail, self._last_thumbnail).max() < self.duplicate_threshold:
+                return False
+
+        jpeg = self._encode(small) if self.jpeg_quality is not None else None
+        with self._lock:
+            slot = self._next
+            self._frames[slot] = small if jpeg is None else jpeg
+            self._timestamps[slot] = timestamp
+            self._next = (slot + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+        self._last_time = timestamp
+        self._last_thumbnail = thumbnail
+        return True
+
+    def snapshot(self, seconds: float = None) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+            Returns the stored frames of the last seconds, oldest first, without removing them.
+
+            Args:
+                seconds (float): How far back to read, or None for the whole window.
+
+            Returns:
+                tuple: The monotonic capture times and the BGR frames.
+        """
+        now = time.monotonic()
+        with self._lock:
+            order = (np.arange(self._count) + self._next - self._count) % self.capacity
+            if seconds is not None:
+                order = order[self._timestamps[order] >= now - seconds]
+            timestamps = self._timestamps[order]
+            if self.jpeg_quality is None:
+                # Fancy indexing copies, so the frames stay valid once the ring moves on
+                frames = list(self._frames[order]) if len(order) else []
+            else:
+                frames = [self._frames[slot] for slot in order]
+        if self.jpeg_quality is not None:
+            frames = [cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR) for jpeg in frames]
+        return timestamps, frames
+
+    def frames(self, seconds: float = None) -> List[np.ndarray]:
+        """
+            Returns the stored frames of the last seconds, oldest first, without removing them.
+
+            Args:
+                seconds (float): How far back to read, or None for the whole window.
+
+            Returns:
+                list: The BGR frames.
+        """
+        return self.snapshot(seconds)[1]
+
+    def memory_bytes(self) -> int:
+        """
+            Returns the memory held by the stored frames.
+
+            Returns:
+                int: The size of the preallocated ring, or of the JPEGs stored, in bytes.
+        """
+        if self._frames is None:
+            return 0
+        if self.jpeg_quality is None:
+            return self._frames.nbytes + self._timestamps.nbytes
+        with self._lock:
+            return sum(len(jpeg) for jpeg in self._frames if jpeg is not None) + self._timestamps.nbytes
+
+    def stats(self) -> dict:
+        """
+            Returns a summary of the buffer for logs and diagnostics.
+
+            Returns:
+                dict: The frames stored and capacity, the frame size, the storage and the memory in MB.
+        """
+        return {
+            "frames": self._count,
+            "capacity": self.capacity,
+            "size": self._size,
+            "storage": "raw" if self.jpeg_quality is None else f"jpeg q{self.jpeg_quality}",
+            "memory_mb": self.memory_bytes() / 2**20,
+        }
+
+    def _allocate(self, shape: Tuple[int, ...]) -> None:
+        height, width = shape[:2]
+        scale = min(1.0, self.max_side / max(width, height))
+        self._size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        if self.jpeg_quality is None:
+            self._frames = np.zeros((self.capacity, self._size[1], self._size[0], 3), dtype=np.uint8)
+        else:
+            self._frames = [None] * self.capacity
+
+    def _encode(self, frame: np.ndarray) -> bytes:
+        success, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not success:
+            raise ValueError('Failed to encode frame')
+        return jpeg.tobytes()
@@ -0,0 +1,277 @@
+"""Host-side decoding and NMS for YOLO HEFs compiled without on-chip NMS.
+
+Supports the anchor-free heads of YOLOv8 and YOLO11: for every stride there is
+one box output with 4 * reg_max distribution (DFL) channels and one class output
+with a channel per class. Integer outputs are dequantized with the quantization
+parameters of their vstream. Decoded detections are returned in the same
+per-class [y_min, x_min, y_max, x_max, score] layout as HailoRT's on-chip NMS, so
+the rest of the pipeline does not change.
+"""
+
+import time
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+def dequantize(output: np.ndarray, scale: float, zero_point: float) -> np.ndarray:
+    """
+    Converts a quantized UINT8/UINT16 output to float32. Float outputs are returned as is.
+
+    Args:
+        output: The raw output.
+        scale: The quantization scale of the output.
+        zero_point: The quantization zero point of the output.
+
+    Returns:
+        The float32 output.
+    """
+    if np.issubdtype(output.dtype, np.floating):
+        return output
+    return (output.astype(np.float32) - np.float32(zero_point)) * np.float32(scale)
+
+def box_iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """
+    Computes the IoU of one xyxy box with many.
+
+    Args:
+        box: The box, shape (4,).
+        boxes: The other boxes, shape (n, 4).
+
+    Returns:
+        The IoUs, shape (n,).
+    """
+    width = np.clip(np.minimum(box[2], boxes[:, 2]) - np.maximum(box[0], boxes[:, 0]), 0, None)
+    height = np.clip(np.minimum(box[3], boxes[:, 3]) - np.maximum(box[1], boxes[:, 1]), 0, None)
+    intersection = width * height
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return intersection / np.maximum(area + areas - intersection, 1e-9)
+
+def _greedy_nms_numpy(boxes: np.ndarray, iou_threshold: float, max_detections: int) -> np.ndarray:
+    """Greedy NMS over boxes sorted by descending score, one vectorized IoU row per kept box."""
+    keep = []
+    remaining = np.arange(len(boxes))
+    while len(remaining) and len(keep) < max_detections:
+        best = remaining[0]
+        keep.append(best)
+        remaining = remaining[1:][box_iou(boxes[best], boxes[remaining[1:]]) <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+def _greedy_nms_loop(boxes: np.ndarray, iou_threshold: float, max_detections: int) -> np.ndarray:
+    """Greedy NMS over boxes sorted by descending score, written as loops for Numba."""
+    n = boxes.shape[0]
+    suppressed = np.zeros(n, dtype=np.bool_)
+    keep = np.empty(n, dtype=np.int64)
+    count = 0
+    for i in range(n):
+        if suppressed[i]:
+            continue
+        keep[count] = i
+        count += 1
+        if count >= max_detections:
+            break
+        area_i = (boxes[i, 2] - boxes[i, 0]) * (boxes[i, 3] - boxes[i, 1])
+        for j in range(i + 1, n):
+            if suppressed[j]:
+                continue
+            width = min(boxes[i, 2], boxes[j, 2]) - max(boxes[i, 0], boxes[j, 0])
+            height = min(boxes[i, 3], boxes[j, 3]) - max(boxes[i, 1], boxes[j, 1])
+            if width <= 0 or height <= 0:
+                continue
+            intersection = width * height
+            area_j = (boxes[j, 2] - boxes[j, 0]) * (boxes[j, 3] - boxes[j, 1])
+            if intersection / max(area_i + area_j - intersection, 1e-9) > iou_threshold:
+                suppressed[j] = True
+    return keep[:count]
+
+_greedy_nms_jit = numba.njit(cache=True)(_greedy_nms_loop) if numba is not None else None
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray,
+                        iou_threshold: float = 0.45, max_detections: int = 300,
+                        use_numba: bool = None) -> np.ndarray:
+    """
+    Class-aware greedy NMS. Boxes of different classes never suppress each other:
+    each class is shifted to its own region of the plane so one pass handles all classes.
+
+    Args:
+        boxes: The xyxy boxes, shape (n, 4).
+        scores: The scores, shape (n,).
+        class_ids: The class ids, shape (n,).
+        iou_threshold: Boxes overlapping a better box of the same class by more than this are dropped.
+        max_detections: The largest number of boxes kept.
+        use_numba: Whether to use the Numba-compiled loop. Defaults to True when Numba is installed.
+
+    Returns:
+        The indexes of the kept boxes, by descending score.
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+    if use_numba is None:
+        use_numba = _greedy_nms_jit is not None
+    order = np.argsort(-scores, kind='stable')
+    offset = (np.max(boxes) - np.min(boxes) + 1) * class_ids[order].astype(np.float64)
+    shifted = boxes[order].astype(np.float64) + offset[:, None]
+    if use_numba:
+        if _greedy_nms_jit is None:
+            raise RuntimeError('Numba is not installed')
+        keep = _greedy_nms_jit(shifted, iou_threshold, max_detections)
+    else:
+        keep = _greedy_nms_numpy(shifted, iou_threshold, max_detections)
+    return order[keep]
+
+class YoloDecoder():
+    """
+        Decodes the raw head outputs of an anchor-free YOLO model and applies NMS on the host.
+
+        Attributes:
+            num_classes (int): The number of classes of the model.
+            score_threshold (float): The minimum class score of a detection.
+            iou_threshold (float): The IoU above which NMS drops the weaker of two boxes.
+            max_detections (int): The largest number of detections per frame.
+            use_numba (bool): Whether NMS uses the Numba-compiled loop.
+            apply_sigmoid (bool): Whether the class outputs are logits rather than probabilities.
+            timings (dict): The seconds spent on the last frame finding the best scores, decoding
+                            the boxes and in NMS, keyed 'scores', 'boxes' and 'nms'.
+            _input_h (int): The height of the model input.
+            _input_w (int): The width of the model input.
+            _reg_max (int): The number of distribution bins per box side.
+            _quantization (dict): The (scale, zero point) of each output, by name.
+            _grids (dict): The anchor centres of each stride, in pixels.
+    """
+    num_classes: int
+    score_threshold: float
+    iou_threshold: float
+    max_detections: int
+    use_numba: bool
+    apply_sigmoid: bool
+    timings: Dict[str, float]
+    _input_h: int
+    _input_w: int
+    _reg_max: int
+    _quantization: Dict[str, Tuple[float, float]]
+    _grids: Dict[int, np.ndarray]
+
+    def __init__(self, input_shape: Sequence[int], num_classes: int = 80, score_threshold: float = 0.25,
+                 iou_threshold: float = 0.45, max_detections: int = 300, reg_max: int = 16,
+                 quantization: Dict[str, Tuple[float, float]] = None, use_numba: bool = None,
+                 apply_sigmoid: bool = False) -> None:
+        """
+            Initializes a new instance of the YoloDecoder class.
+
+            Args:
+                input_shape (Sequence[int]): The (height, width, ...) of the model input.
+                num_classes (int): The number of classes of the model.
+                score_threshold (float): The minimum class score of a detection.
+                iou_threshold (float): The IoU above which NMS drops the weaker of two boxes.
+                max_detections (int): The largest number of detections per frame.
+                reg_max (int): The number of distribution bins per box side.
+                quantization (dict): The (scale, zero point) of each integer output, by name.
+                use_numba (bool): Whether NMS uses the Numba-compiled loop. Defaults to
+                                  True when Numba is installed.
+                apply_sigmoid (bool): Whether the class outputs are logits rather than probabilities.
+        """
+        self._input_h, self._input_w = int(input_shape[0]), int(input_shape[1])
+        self.num_classes = num_classes
+        self.score_threshold = score_threshold
+        self.iou_threshold = iou_threshold
+        self.max_detections = max_detections
+        self._reg_max = reg_max
+        self._quantization = quantization or {}
+        self.use_numba = _greedy_nms_jit is not None if use_numba is None else use_numba
+        self.apply_sigmoid = apply_sigmoid
+        self._grids = {}
+        self.timings = {}
+
+    def _grid(self, height: int, width: int) -> Tuple[np.ndarray, int]:
+        stride = self._input_h // height
+        if stride not in self._grids:
+            ys, xs = np.meshgrid(np.arange(height, dtype=np.float32), np.arange(width, dtype=np.float32), indexing='ij')
+            self._grids[stride] = (np.stack([xs.ravel(), ys.ravel()], axis=1) + 0.5) * stride
+        return self._grids[stride], stride
+
+    def _dequantize(self, name: str, output: np.ndarray) -> np.ndarray:
+        if name in self._quantization:
+            return dequantize(output, *self._quantization[name])
+        return output
+
+    def _pair_outputs(self, outputs: Dict[str, np.ndarray]) -> List[Tuple[str, np.ndarray, str, np.ndarray]]:
+        """Pairs the names and outputs of the box and class outputs of each stride by their spatial size."""
+        by_size = {}
+        for name, output in outputs.items():
+            output = output.reshape(output.shape[-3:])
+            kind = 'box' if output.shape[-1] == 4 * self._reg_max else 'class'
+            by_size.setdefault(output.shape[:2], {})[kind] = (name, output)
+        return [pair['box'] + pair['class'] for _, pair in sorted(by_size.items(), reverse=True)]
+
+    def decode(self, outputs: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+            Decodes raw outputs into thresholded boxes before NMS.
+
+            The best class of each anchor is found on the raw, possibly quantized,
+            scores (dequantization preserves their order), and only the scores and
+            box distributions of anchors above the threshold are dequantized.
+
+            Args:
+                outputs (dict): The raw outputs by name, each of shape ([1,] height, width, channels).
+
+            Returns:
+                The (n, 4) xyxy boxes in model input pixels, the (n,) scores and the (n,) class ids.
+        """
+        boxes, scores, class_ids = [], [], []
+        bins = np.arange(self._reg_max, dtype=np.float32)
+        score_time = box_time = 0.0
+        for box_name, box_output, class_name, class_output in self._pair_outputs(outputs):
+            started = time.perf_counter()
+            height, width = box_output.shape[:2]
+            class_scores = class_output.reshape(height * width, -1)
+            best_class = class_scores.argmax(axis=1)
+            best_score = self._dequantize(class_name, class_scores[np.arange(len(best_class)), best_class])
+            if self.apply_sigmoid:
+                best_score = 1.0 / (1.0 + np.exp(-best_score))
+            keep = np.flatnonzero(best_score >= self.score_threshold)
+            scored = time.perf_counter()
+            score_time += scored - started
+            if len(keep) == 0:
+                continue
+            # Only the anchors above the threshold go through the distribution decode.
+            distribution = self._dequantize(box_name, box_output.reshape(height * width, 4, self._reg_max)[keep])
+            distribution = np.exp(distribution - distribution.max(axis=2, keepdims=True))
+            distances = (distribution @ bins) / distribution.sum(axis=2)
+            centres, stride = self._grid(height, width)
+            centres = centres[keep]
+            boxes.append(np.concatenate([centres - distances[:, :2] * stride, centres + distances[:, 2:] * stride], axis=1))
+            scores.append(best_score[keep])
+            class_ids.append(best_class[keep])
+            box_time += time.perf_counter() - scored
+        self.timings['scores'] = score_time
+        self.timings['boxes'] = box_time
+        if not boxes:
+            return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        return np.concatenate(boxes), np.concatenate(scores), np.concatenate(class_ids)
+
+    def __call__(self, outputs: Dict[str, np.ndarray]) -> List[np.ndarray]:
+        """
+            Decodes raw outputs and applies NMS.
+
+            Args:
+                outputs (dict): The raw outputs by name, each of shape ([1,] height, width, channels).
+
+            Returns:
+                One (n, 5) float32 array of normalized [y_min, x_min, y_max, x_max, score]
+                rows per class, like the on-chip NMS output.
+        """
+        boxes, scores, class_ids = self.decode(outputs)
+        started = time.perf_counter()
+        keep = non_max_suppression(boxes, scores, class_ids, self.iou_threshold, self.max_detections, self.use_numba)
+        boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+        scale = np.array([self._input_h, self._input_w, self._input_h, self._input_w], dtype=np.float32)
+        rows = np.column_stack([np.clip(boxes[:, [1, 0, 3, 2]] / scale, 0.0, 1.0), scores]).astype(np.float32)
+        order = np.argsort(class_ids, kind='stable')
+        counts = np.bincount(class_ids, minlength=self.num_classes)
+        per_class = np.split(rows[order], np.cumsum(counts)[:-1])
+        self.timings['nms'] = time.perf_counter() - started
+        return per_class
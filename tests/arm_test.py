@@ -0,0 +1,32 @@
+import math
+from arm import SettleMonitor, commanded_state, state_distance
+
+
+def pose(e):
+    return {'b': 0.0, 's': 0.0, 'e': math.radians(e), 't': math.pi}
+
+def test_state_distance_and_commanded_state():
+    assert math.isclose(state_distance(pose(80), pose(90)), 10)
+    state = commanded_state({'x': 1, 'b': 2, 'e': 3}, ('x',), {'e': 4})
+    assert state == {'b': 2, 'e': 4}
+
+def test_settle_monitor_waits_for_motion_before_detecting_a_stall():
+    monitor = SettleMonitor(pose(60), stall_time=0.5)
+    # The arm has not started moving yet: no stall however long it stays put
+    assert not monitor.update(pose(90), 0.0)
+    assert not monitor.update(pose(90), 2.0)
+    assert not monitor.update(pose(75), 2.1)
+    assert monitor.update(pose(60.5), 2.3)
+    assert monitor.settled and not monitor.stalled
+
+def test_settle_monitor_reports_a_stall_short_of_the_target():
+    monitor = SettleMonitor(pose(60), stall_time=0.5)
+    assert not monitor.update(pose(90), 0.0)
+    assert not monitor.update(pose(80), 0.2)
+    assert not monitor.update(pose(80), 0.5)
+    assert monitor.update(pose(80), 0.8)
+    assert monitor.stalled and not monitor.settled
+
+def test_robot_settle_fails_when_the_arm_does_not_reach_the_target(offline_robot):
+    offline_robot.move_to_position(e=60, b=0, s=0, h=180)
+    assert not offline_robot.wait_until_settled(timeout=0.2, poll_interval=0.01, stall_time=0.05)
@@ -0,0 +1,26 @@
+import asyncio
+import json
+import math
+import httpx
+from async_robot import AsyncRobot
+
+
+def _recording_transport(commands):
+    def handler(request):
+        commands.append(json.loads(request.url.params['json']))
+        return httpx.Response(200, json={"T": 1051, "x": 300, "y": 0, "z": 200, "b": 0, "s": 0, "e": math.pi / 2, "t": math.pi})
+    return httpx.MockTransport(handler)
+
+def test_async_robot_concurrent_commands():
+    commands = []
+
+    async def run():
+        async with AsyncRobot(transport=_recording_transport(commands)) as robot:
+            await robot.get_state()
+            commands.clear()
+            await asyncio.gather(robot.set_light(255), robot.move_to_position(e=60, b=0, s=0, h=180))
+            await robot.do_action('go_left')
+
+    asyncio.run(run())
+    assert sorted(command['T'] for command in commands[:2]) == [114, 122]
+    assert commands[-1] == {"T": 121, "joint": 1, "angle": 15.0, "spd": 0, "acc": 2}
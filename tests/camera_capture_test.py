@@ -0,0 +1,27 @@
+from camera_capture import DualStreamCapture
+
+
+def test_dual_stream_configures_lores_and_isp_flip(fake_libcamera, fake_camera):
+    DualStreamCapture((1280, 1280), (640, 640), camera=fake_camera)
+    assert fake_camera.config["main"]["size"] == (1280, 1280)
+    assert fake_camera.config["lores"]["size"] == (640, 640)
+    assert fake_camera.config["transform"] == {"hflip": 1, "vflip": 1}
+
+def test_dual_stream_reads_main_from_the_same_request_on_request(fake_libcamera, fake_camera):
+    capture = DualStreamCapture((1280, 960), (640, 480), camera=fake_camera).start()
+    first_lores, first_main = capture.capture()
+    capture.request_main()
+    second_lores, second_main = capture.capture()
+    third_lores, third_main = capture.capture()
+    assert first_main is None and third_main is None
+    assert second_lores.shape == (480, 640, 3) and second_main.shape == (960, 1280, 3)
+    assert second_main[0, 0, 0] == second_lores[0, 0, 0] == 1
+    assert [request.arrays_made for request in fake_camera.requests] == [['lores'], ['lores', 'main'], ['lores']]
+    assert all(request.released for request in fake_camera.requests)
+    assert capture.scale() == (2.0, 2.0)
+    capture.stop()
+    assert not fake_camera.started
+
+def test_dual_stream_keeps_main_of_every_frame(fake_libcamera, fake_camera):
+    capture = DualStreamCapture((1280, 960), (640, 480), keep_main=True, camera=fake_camera).start()
+    assert all(capture.capture()[1] is not None for _ in range(3))
@@ -0,0 +1,37 @@
+import threading
+from command_mailbox import CommandMailbox
+
+
+class BlockingRobot:
+    """Stands in for Robot and blocks each command until released."""
+    _directions = {'up': {'joint_letter': 'e', 'sign': -1}, 'left': {'joint_letter': 'b', 'sign': +1}}
+
+    def __init__(self):
+        self.commands = []
+        self.release = threading.Semaphore(0)
+        self.sending = threading.Event()
+
+    def get_feedback(self):
+        return {'b': 0.0, 's': 0.0, 'e': 0.0, 't': 0.0}
+
+    def move_to_position(self, **setpoints):
+        self.sending.set()
+        self.release.acquire()
+        self.commands.append(setpoints)
+
+
+def test_mailbox_keeps_latest_setpoint_per_joint():
+    robot = BlockingRobot()
+    mailbox = CommandMailbox(robot)
+    mailbox.set_joints(b=1)
+    assert robot.sending.wait(5)
+    mailbox.set_joints(b=2)
+    mailbox.move({'left': 3, 'up': 4})
+    mailbox.set_joints(s=5)
+    robot.release.release()
+    robot.release.release()
+    assert mailbox.flush(timeout=5)
+    mailbox.close()
+    assert robot.commands == [{'b': 1}, {'b': 3.0, 'e': -4.0, 's': 5}]
+    assert mailbox.sent == 2
+    assert mailbox.replaced == 1
@@ -1,4 +1,94 @@
 import sys
 import os
+import types
+import numpy as np
+import json
+import math
+import pytest
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../robot')))
\ No newline at end of file
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../robot')))
+
+from transport import Transport
+from simulator import RoArmSimulator
+
+
+class RecordingTransport(Transport):
+    """Records the commands sent to it and answers every command with a fixed state."""
+
+    def __init__(self):
+        self.commands = []
+
+    def send(self, command):
+        self.commands.append(json.loads(command))
+        return json.dumps({"T": 1051, "x": 300, "y": 0, "z": 200, "b": 0, "s": 0, "e": math.pi / 2, "t": math.pi})
+
+@pytest.fixture
+def offline_robot():
+    from robot.robot import Robot
+    robot = Robot(transport=RecordingTransport())
+    yield robot
+    robot.close()
+
+@pytest.fixture
+def simulated_robot():
+    from robot.robot import Robot
+    with RoArmSimulator() as simulator:
+        robot = Robot(ip_address=simulator.address, settle=True)
+        yield robot
+        robot.close()
+
+class FakeRequest():
+    def __init__(self, number, config):
+        self.number = number
+        self.config = config
+        self.released = False
+        self.arrays_made = []
+
+    def make_array(self, name):
+        assert not self.released
+        self.arrays_made.append(name)
+        width, height = self.config[name]["size"]
+        return np.full((height, width, 3), self.number, dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+class FakePicamera2():
+    """Stands in for Picamera2, recording the configuration and the requests it hands out."""
+
+    def __init__(self):
+        self.config = None
+        self.requests = []
+        self.started = False
+
+    def create_preview_configuration(self, main, lores=None, transform=None, buffer_count=4):
+        return {"main": main, "lores": lores, "transform": transform, "buffer_count": buffer_count}
+
+    def configure(self, config):
+        self.config = config
+
+    def start(self):
+        self.started = True
+
+    def stop(self):
+        self.started = False
+
+    def capture_request(self):
+        self.requests.append(FakeRequest(len(self.requests), self.config))
+        return self.requests[-1]
+
+    def capture_array(self):
+        width, height = self.config["main"]["size"]
+        image = np.zeros((height, width, 3), dtype=np.uint8)
+        image[0, 0] = 255
+        return image
+
+@pytest.fixture
+def fake_libcamera(monkeypatch):
+    libcamera = types.ModuleType('libcamera')
+    libcamera.Transform = lambda hflip=0, vflip=0: {"hflip": hflip, "vflip": vflip}
+    monkeypatch.setitem(sys.modules, 'libcamera', libcamera)
+
+@pytest.fixture
+def fake_camera():
+    return FakePicamera2()
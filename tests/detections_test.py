@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+import supervision as sv
+from detections import decode_nms, decode_nms_loop, nms_to_detections
+from benchmark import random_nms_output
+
+@pytest.mark.parametrize("detections", [0, 10, 100])
+def test_decode_nms_matches_loop(detections):
+    output = random_nms_output(detections)
+    expected = decode_nms_loop(output, 720, 1280, 0.3)
+    actual = decode_nms(output, 720, 1280, 0.3)
+    for expected_array, actual_array in zip(expected, actual):
+        np.testing.assert_allclose(actual_array, expected_array, rtol=1e-6)
+
+def test_decode_nms_scales_yx_boxes_to_xy_pixels():
+    output = [np.zeros((0, 5), dtype=np.float32), np.array([[0.1, 0.2, 0.5, 0.6, 0.9], [0.1, 0.2, 0.5, 0.6, 0.1]], dtype=np.float32)]
+    xyxy, confidence, class_id = decode_nms([output], 100, 200, 0.5)
+    np.testing.assert_allclose(xyxy, [[40, 10, 120, 50]], rtol=1e-6)
+    np.testing.assert_allclose(confidence, [0.9])
+    assert class_id.tolist() == [1]
+
+def test_nms_to_detections_handles_empty_output():
+    detections = nms_to_detections(random_nms_output(0), 640, 640)
+    assert isinstance(detections, sv.Detections)
+    assert len(detections) == 0
@@ -0,0 +1,39 @@
+import threading
+import time
+from frame_bus import LatestFrameBus
+
+
+def test_latest_does_not_consume():
+    bus = LatestFrameBus()
+    assert bus.latest() == (0, None)
+    frame = {"image": object()}
+    assert bus.publish(frame) == 1
+    assert bus.latest() == (1, frame)
+    assert bus.latest()[1] is frame
+
+def test_wait_newer_returns_at_once_when_a_newer_frame_exists():
+    bus = LatestFrameBus()
+    bus.publish("first")
+    bus.publish("second")
+    assert bus.wait_newer(0, timeout=0) == (2, "second")
+    assert bus.wait_newer(2, timeout=0.01) is None
+
+def test_every_reader_sees_every_wakeup():
+    bus = LatestFrameBus()
+    seen = [[] for _ in range(3)]
+
+    def read(frames):
+        seq = 0
+        while seq < 3:
+            seq, frame = bus.wait_newer(seq, timeout=2)
+            frames.append(frame)
+
+    readers = [threading.Thread(target=read, args=(frames,)) for frames in seen]
+    for reader in readers:
+        reader.start()
+    for i in range(1, 4):
+        time.sleep(0.02)
+        bus.publish(i)
+    for reader in readers:
+        reader.join(2)
+    assert all(frames[-1] == 3 for frames in seen)
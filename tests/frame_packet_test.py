@@ -0,0 +1,67 @@
+import threading
+import numpy as np
+import supervision as sv
+from frame_packet import FramePacket, as_image
+
+
+def make_detections():
+    detections = sv.Detections(xyxy=np.array([[1.0, 2.0, 10.0, 12.0]]), confidence=np.array([0.9]),
+                               class_id=np.array([0]))
+    detections.tracker_id = np.array([7])
+    return detections
+
+def test_annotation_is_drawn_once_on_first_access():
+    calls = []
+
+    def annotate(frame, detections):
+        calls.append(1)
+        return frame + 1
+
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    packet = FramePacket(1, 0.0, frame, make_detections(), annotate=annotate)
+    assert calls == []
+    annotated = packet.annotated
+    assert packet.annotated is annotated
+    assert calls == [1]
+    assert frame.max() == 0 and annotated.max() == 1
+
+def test_annotation_is_drawn_once_across_threads():
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def annotate(frame, detections):
+        calls.append(1)
+        return frame.copy()
+
+    packet = FramePacket(1, 0.0, np.zeros((4, 4, 3), dtype=np.uint8), make_detections(), annotate=annotate)
+    results = []
+
+    def read():
+        barrier.wait()
+        results.append(packet.annotated)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(2)
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+def test_frame_without_detections_or_annotations_is_not_copied():
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    assert FramePacket(1, 0.0, frame, None, annotate=lambda f, d: f.copy()).annotated is frame
+    assert FramePacket(1, 0.0, frame, make_detections()).annotated is frame
+    assert as_image(FramePacket(1, 0.0, frame)) is frame
+    assert as_image(frame) is frame
+
+def test_tracker_ids_and_full_image():
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    full = np.ones((8, 8, 3), dtype=np.uint8)
+    assert FramePacket(1, 0.0, frame).tracker_ids.size == 0
+    packet = FramePacket(2, 0.0, frame, make_detections(), annotate=lambda f, d: f + 1, full_image=full)
+    assert packet.tracker_ids.tolist() == [7]
+    assert packet.full_image is full
+    # Full-resolution frames are their own full image, raw even when annotations are drawn
+    packet = FramePacket(3, 0.0, frame, make_detections(), annotate=lambda f, d: f + 1)
+    assert packet.full_image is frame and packet.annotated is not frame
@@ -0,0 +1,64 @@
+import time
+import cv2
+import numpy as np
+import pytest
+from frame_source import Picamera2Source, SyntheticSource, VideoFileSource, create_frame_source
+
+
+def test_synthetic_source_stops_after_frame_limit():
+    source = SyntheticSource(320, 240, frames=3)
+    frames = [source.read() for _ in range(4)]
+    assert [frame is None for frame in frames] == [False, False, False, True]
+    assert frames[0].shape == (240, 320, 3) and frames[0].dtype == np.uint8
+    assert not np.array_equal(frames[0], frames[1])
+
+def test_realtime_source_is_paced_to_fps():
+    source = SyntheticSource(64, 64, fps=50, realtime=True, frames=6)
+    start = time.monotonic()
+    while source.read() is not None:
+        pass
+    assert time.monotonic() - start >= 5 / 50 * 0.9
+
+def test_video_file_source_round_trip(tmp_path):
+    path = str(tmp_path / 'clip.avi')
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 25, (160, 120))
+    synthetic = SyntheticSource(160, 120)
+    for _ in range(5):
+        writer.write(synthetic.read())
+    writer.release()
+
+    with create_frame_source(path, realtime=False) as source:
+        assert isinstance(source, VideoFileSource)
+        assert source.size == (160, 120) and source.fps == pytest.approx(25)
+        frames = 0
+        while source.read() is not None:
+            frames += 1
+        assert frames == 5
+
+def test_picamera2_source_flips_single_stream_frames(fake_camera):
+    source = Picamera2Source(320, 240, camera=fake_camera).start()
+    frame = source.read()
+    assert fake_camera.started and frame.shape == (240, 320, 3)
+    assert frame[-1, -1, 0] == 255 and frame[0, 0, 0] == 0
+    assert source.read_with_full_image()[1] is None and not source.request_full_image()
+    source.stop()
+
+def test_picamera2_source_dual_stream_reads_lores(fake_libcamera, fake_camera):
+    source = Picamera2Source(1280, 960, dual_stream=True, lores_size=(640, 480), camera=fake_camera).start()
+    assert source.size == (640, 480) and source.full_size == (1280, 960)
+    assert source.read().shape == (480, 640, 3)
+    assert source.read_with_full_image()[1] is None
+    assert source.request_full_image()
+    frame, full_image = source.read_with_full_image()
+    assert frame.shape == (480, 640, 3) and full_image.shape == (960, 1280, 3)
+    assert frame[0, 0, 0] == full_image[0, 0, 0] == 2
+    source.stop()
+
+def test_image_directory_source_reads_in_name_order(tmp_path):
+    pytest.importorskip('hailo_platform')
+    for i, value in enumerate([10, 20]):
+        cv2.imwrite(str(tmp_path / f'{i}.png'), np.full((32, 48, 3), value, dtype=np.uint8))
+    source = create_frame_source(str(tmp_path), realtime=False)
+    assert source.size == (48, 32)
+    assert [source.read()[0, 0, 0] for _ in range(2)] == [10, 20]
+    assert source.read() is None
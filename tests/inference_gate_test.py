@@ -0,0 +1,53 @@
+import numpy as np
+import supervision as sv
+from inference_gate import MotionGate, TrackExtrapolator
+
+
+def still_frame():
+    return np.full((120, 160, 3), 100, dtype=np.uint8)
+
+def moved_frame(x):
+    frame = still_frame()
+    frame[40:80, x:x + 20] = 255
+    return frame
+
+def test_still_scene_is_inferred_at_min_fps():
+    gate = MotionGate(min_fps=2.0, threshold=6.0)
+    decisions = [gate(still_frame(), i / 30) for i in range(60)]
+    assert sum(decisions) == 4
+    assert decisions[0] and decisions[15] and decisions[30] and decisions[45]
+
+def test_motion_is_inferred_up_to_max_fps():
+    gate = MotionGate(min_fps=1.0, max_fps=0.0, threshold=6.0)
+    assert all(gate(moved_frame(i * 4), i / 30) for i in range(20))
+    capped = MotionGate(min_fps=1.0, max_fps=10.0, threshold=6.0)
+    assert sum(capped(moved_frame(i * 4), i / 30) for i in range(30)) == 10
+
+def test_full_rate_infers_every_frame_while_held():
+    gate = MotionGate(min_fps=1.0, threshold=6.0)
+    gate(still_frame(), 0.0)
+    assert not gate(still_frame(), 0.1)
+    with gate.full_rate():
+        assert gate.at_full_rate
+        assert all(gate(still_frame(), 0.1 + i / 30) for i in range(1, 10))
+    assert not gate.at_full_rate
+    assert not gate(still_frame(), 0.5)
+    assert gate.stats()["skipped"] == 2
+
+def test_extrapolator_carries_boxes_forward_with_their_ids():
+    extrapolator = TrackExtrapolator(max_extrapolation=0.5)
+    assert extrapolator.predict(0.0) is None
+
+    def tracked(x):
+        return sv.Detections(xyxy=np.array([[x, 10.0, x + 20.0, 30.0]]), confidence=np.array([0.9]),
+                             class_id=np.array([1]), tracker_id=np.array([4]))
+
+    extrapolator.update(tracked(0.0), 0.0)
+    assert extrapolator.predict(0.1).xyxy[0, 0] == 0.0
+    extrapolator.update(tracked(10.0), 0.1)
+    predicted = extrapolator.predict(0.2)
+    assert np.allclose(predicted.xyxy, [[20.0, 10.0, 40.0, 30.0]])
+    assert predicted.tracker_id.tolist() == [4] and predicted.class_id.tolist() == [1]
+    assert np.allclose(extrapolator.predict(5.0).xyxy[0, 0], 60.0)
+    extrapolator.update(None, 0.3)
+    assert extrapolator.predict(0.4) is None
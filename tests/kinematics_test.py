@@ -0,0 +1,33 @@
+import math
+import numpy as np
+from kinematics import forward_kinematics, inverse_kinematics, is_reachable, within_limits
+from trajectory import Trajectory
+
+
+def test_forward_kinematics_initial_position():
+    x, y, z = forward_kinematics([0, 0, math.pi / 2])
+    assert math.isclose(x, 310.15, abs_tol=0.01)
+    assert math.isclose(y, 0, abs_tol=0.01)
+    assert math.isclose(z, 238.55, abs_tol=0.01)
+
+def test_inverse_kinematics_round_trip():
+    rng = np.random.default_rng(0)
+    joints = rng.uniform([-2.5, -1.2, 0.2], [2.5, 1.2, 2.5], (1000, 3))
+    positions = forward_kinematics(joints)
+    solved, reachable = inverse_kinematics(positions)
+    np.testing.assert_allclose(forward_kinematics(solved), positions, atol=1e-6)
+    assert reachable.shape == (1000,)
+
+def test_reachability():
+    assert is_reachable([250, 0, 250])
+    assert not is_reachable([-600, 0, 200])
+    assert Trajectory().cartesian(x=250, y=0, z=250).cartesian(x=900, y=0, z=0).joint(s=120).validate() == [1, 2]
+
+def test_hand_limits():
+    assert within_limits(np.radians([0, 0, 90, 180]))
+    assert not within_limits(np.radians([0, 0, 90, 10]))
+    assert Trajectory().joint(h=180).joint(h=10).cartesian(x=250, y=0, z=250, t=6).validate() == [1, 2]
+
+def test_robot_kinematics_helpers(offline_robot):
+    assert offline_robot.is_reachable(250, 0, 250)
+    assert set(offline_robot.coordinates_to_joints(250, 0, 250)) == {'b', 's', 'e'}
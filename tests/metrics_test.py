@@ -0,0 +1,54 @@
+import pytest
+from metrics import CommandMetrics, LatencyHistogram, command_type
+from transport import Transport
+
+
+class FailingTransport(Transport):
+    def send(self, command):
+        raise TimeoutError(command)
+
+def test_command_type():
+    assert command_type('{"T":105}') == '105'
+    assert command_type('{"T": 121, "joint": 1}') == '121'
+    assert command_type('{}') == 'unknown'
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for _ in range(99):
+        histogram.observe(0.003)
+    histogram.observe(3.0)
+    assert 0.002 < histogram.percentile(50) <= 0.005
+    assert 2.0 < histogram.percentile(99.5) <= 5.0
+
+def test_robot_records_commands_by_type_and_call_site(offline_robot):
+    metrics = offline_robot.get_metrics()
+    metrics.reset()
+    offline_robot.move_left(10, delay=0.01)
+    offline_robot.get_state()
+    snapshot = metrics.snapshot()
+    assert snapshot['121']['move_left']['count'] == 1
+    assert snapshot['105']['get_state']['count'] == 1
+    assert snapshot['wait']['move_left']['total_seconds'] >= 0.01
+    text = metrics.to_prometheus()
+    assert 'robot_command_latency_seconds_count{command="121",call_site="move_left"} 1' in text
+    assert 'robot_command_errors_total{command="105",call_site="get_state"} 0' in text
+
+def test_robot_counts_errors(offline_robot):
+    metrics = offline_robot.get_metrics()
+    metrics.reset()
+    offline_robot._transport = FailingTransport()
+    with pytest.raises(TimeoutError):
+        offline_robot.set_light(0)
+    assert metrics.snapshot()['114']['set_light']['errors'] == 1
+
+def test_slow_commands_are_logged():
+    messages = []
+    from loguru import logger
+    handler = logger.add(messages.append)
+    try:
+        metrics = CommandMetrics(slow_threshold=0.1)
+        metrics.record('105', 'get_state', 0.01)
+        metrics.record('105', 'get_state', 0.5)
+    finally:
+        logger.remove(handler)
+    assert len(messages) == 1
@@ -0,0 +1,151 @@
+import queue
+import threading
+import time
+import numpy as np
+import pytest
+from pipeline import CameraPipeline
+from simulated_inference import SimulatedInference
+
+
+def run_pipeline(frames: int, in_flight: int, batch_size: int = 1):
+    input_queue, output_queue = queue.Queue(maxsize=in_flight), queue.Queue()
+    inference = SimulatedInference(input_queue, output_queue, send_original_frame=True,
+                                   frame_time=0.005, latency=0.04, model=lambda frame: int(frame[0, 0]))
+    inference_thread = threading.Thread(target=inference.run)
+    inference_thread.start()
+    source = iter(np.full((4, 4), i, dtype=np.uint8) for i in range(frames))
+    processed, released = [], []
+    pipeline = CameraPipeline(lambda: next(source, None), lambda frame: frame,
+                              lambda seq, timestamp, frame, result: processed.append((seq, int(frame[0, 0]), result)),
+                              input_queue, output_queue, in_flight=in_flight, batch_size=batch_size,
+                              release=released.append)
+    started = time.monotonic()
+    pipeline.start().join(timeout=10)
+    elapsed = time.monotonic() - started
+    input_queue.put(None)
+    inference_thread.join()
+    assert released == [result for _, _, result in processed]
+    return processed, elapsed, inference.jobs
+
+def test_pipeline_matches_results_to_frames_in_order():
+    processed, _, _ = run_pipeline(20, in_flight=4)
+    assert processed == [(i, i, i) for i in range(20)]
+
+def test_pipeline_overlaps_frames_in_flight():
+    _, serial, _ = run_pipeline(20, in_flight=1)
+    _, pipelined, _ = run_pipeline(20, in_flight=6)
+    assert serial >= 20 * 0.04
+    assert pipelined < serial / 2
+
+def test_pipeline_batches_frames_and_demultiplexes_results():
+    processed, _, jobs = run_pipeline(20, in_flight=8, batch_size=4)
+    assert processed == [(i, i, i) for i in range(20)]
+    assert jobs < 20
+
+def test_pipeline_postprocesses_gated_frames_without_inference():
+    input_queue, output_queue = queue.Queue(maxsize=4), queue.Queue()
+    inference = SimulatedInference(input_queue, output_queue, send_original_frame=True,
+                                   frame_time=0.005, latency=0.02, model=lambda frame: int(frame[0, 0]))
+    inference_thread = threading.Thread(target=inference.run)
+    inference_thread.start()
+    source = iter(np.full((4, 4), i, dtype=np.uint8) for i in range(20))
+    processed, released = [], []
+    pipeline = CameraPipeline(lambda: next(source, None), lambda frame: frame,
+                              lambda seq, timestamp, frame, result: processed.append((seq, result)),
+                              input_queue, output_queue, in_flight=4, release=released.append,
+                              gate=lambda frame, timestamp: int(frame[0, 0]) % 3 == 0)
+    pipeline.start().join(timeout=10)
+    input_queue.put(None)
+    inference_thread.join()
+    assert processed == [(i, i if i % 3 == 0 else None) for i in range(20)]
+    assert released == [i for i in range(20) if i % 3 == 0]
+    assert pipeline.skipped == 13
+
+def test_pipeline_sends_the_tiles_of_a_frame_as_one_job():
+    input_queue, output_queue = queue.Queue(maxsize=4), queue.Queue()
+    inference = SimulatedInference(input_queue, output_queue, batch_size=3, send_original_frame=True,
+                                   frame_time=0.002, latency=0.02, model=lambda tile: int(tile[0, 0]))
+    inference_thread = threading.Thread(target=inference.run)
+    inference_thread.start()
+    source = iter(np.full((4, 4), i, dtype=np.uint8) for i in range(10))
+    processed, released = [], []
+    pipeline = CameraPipeline(lambda: next(source, None), lambda frame: [frame + tile for tile in range(3)],
+                              lambda seq, timestamp, frame, result: processed.append((seq, result)),
+                              input_queue, output_queue, in_flight=4, release=released.append, tiles_per_frame=3)
+    pipeline.start().join(timeout=10)
+    input_queue.put(None)
+    inference_thread.join()
+    assert processed == [(i, [i, i + 1, i + 2]) for i in range(10)]
+    assert inference.jobs == 10
+    assert len(released) == 30
+
+def test_pipeline_carries_the_full_image_of_each_frame_to_preprocess_and_postprocess():
+    input_queue, output_queue = queue.Queue(maxsize=4), queue.Queue()
+    inference = SimulatedInference(input_queue, output_queue, send_original_frame=True,
+                                   frame_time=0.002, latency=0.02, model=lambda frame: int(frame[0, 0]))
+    inference_thread = threading.Thread(target=inference.run)
+    inference_thread.start()
+    source = iter((np.full((2, 2), i, dtype=np.uint8), np.full((4, 4), 100 + i, dtype=np.uint8)) for i in range(20))
+    processed = []
+    pipeline = CameraPipeline(lambda: next(source, None), lambda frame, full_image: full_image,
+                              lambda seq, timestamp, frame, result, full_image:
+                                  processed.append((seq, result, int(full_image[0, 0]), full_image.shape)),
+                              input_queue, output_queue, in_flight=4, full_images=True,
+                              gate=lambda frame, timestamp: int(frame[0, 0]) % 2 == 0)
+    pipeline.start().join(timeout=10)
+    input_queue.put(None)
+    inference_thread.join()
+    assert processed == [(i, 100 + i if i % 2 == 0 else None, 100 + i, (4, 4)) for i in range(20)]
+
+def test_pipeline_frees_the_window_of_frames_whose_inference_failed():
+    input_queue, output_queue = queue.Queue(maxsize=2), queue.Queue()
+    # A failed job comes back as a result of None for each of its frames
+    inference = SimulatedInference(input_queue, output_queue, send_original_frame=True, frame_time=0.002,
+                                   latency=0.01, model=lambda frame: None if frame[0, 0] % 4 == 1 else int(frame[0, 0]))
+    inference_thread = threading.Thread(target=inference.run)
+    inference_thread.start()
+    source = iter(np.full((4, 4), i, dtype=np.uint8) for i in range(20))
+    processed, released = [], []
+    pipeline = CameraPipeline(lambda: next(source, None), lambda frame: frame,
+                              lambda seq, timestamp, frame, result: processed.append((seq, result)),
+                              input_queue, output_queue, in_flight=2, release=released.append)
+    pipeline.start().join(timeout=10)
+    input_queue.put(None)
+    inference_thread.join()
+    assert processed == [(i, None if i % 4 == 1 else i) for i in range(20)]
+    assert released == [i for i in range(20) if i % 4 != 1]
+    assert pipeline.failed == 5
+
+def run_failing_pipeline(preprocess, postprocess):
+    input_queue, output_queue = queue.Queue(maxsize=2), queue.Queue()
+    inference = SimulatedInference(input_queue, output_queue, send_original_frame=True,
+                                   frame_time=0.005, latency=0.02, model=lambda frame: int(frame[0, 0]))
+    inference_thread = threading.Thread(target=inference.run)
+    inference_thread.start()
+    frames = iter(np.full((4, 4), i % 256, dtype=np.uint8) for i in range(1000))
+    pipeline = CameraPipeline(lambda: next(frames, None), preprocess, postprocess,
+                              input_queue, output_queue, in_flight=2)
+    started = time.monotonic()
+    try:
+        with pytest.raises(ValueError):
+            pipeline.start().join()
+    finally:
+        input_queue.put(None)
+        inference_thread.join()
+    assert time.monotonic() - started < 5
+    assert all(not thread.is_alive() for thread in pipeline._threads)
+
+def test_pipeline_stops_and_raises_when_postprocess_fails():
+    def postprocess(seq, timestamp, frame, result):
+        if seq == 3:
+            raise ValueError('postprocess failed')
+
+    run_failing_pipeline(lambda frame: frame, postprocess)
+
+def test_pipeline_stops_and_raises_when_preprocess_fails():
+    def preprocess(frame):
+        if frame[0, 0] == 5:
+            raise ValueError('preprocess failed')
+        return frame
+
+    run_failing_pipeline(preprocess, lambda seq, timestamp, frame, result: None)
@@ -0,0 +1,59 @@
+import threading
+import time
+import numpy as np
+import pytest
+from preview import PreviewDisplay, create_preview
+
+
+class RecordingGui():
+    def __init__(self, keys=()):
+        self.shown = []
+        self.keys = list(keys)
+
+    def imshow(self, window, frame):
+        self.shown.append(frame)
+
+    def wait_key(self, milliseconds):
+        return self.keys.pop(0) if self.keys else -1
+
+def test_preview_draws_latest_frame_at_capped_rate():
+    gui = RecordingGui()
+    preview = PreviewDisplay(max_fps=20, imshow=gui.imshow, wait_key=gui.wait_key).start()
+    started = time.monotonic()
+    for i in range(100):
+        preview.show(np.full((4, 4, 3), i, dtype=np.uint8))
+        time.sleep(0.002)
+    elapsed = time.monotonic() - started
+    time.sleep(0.1)
+    preview.stop()
+    assert 1 <= len(gui.shown) <= elapsed * 20 + 3
+    assert gui.shown[-1][0, 0, 0] == 99
+
+def test_show_does_not_wait_for_slow_window():
+    gui = RecordingGui()
+    drawing = threading.Event()
+
+    def slow_imshow(window, frame):
+        drawing.set()
+        time.sleep(0.2)
+
+    preview = PreviewDisplay(max_fps=0, imshow=slow_imshow, wait_key=gui.wait_key).start()
+    preview.show(np.zeros((4, 4, 3), dtype=np.uint8))
+    drawing.wait(1)
+    started = time.monotonic()
+    preview.show(np.zeros((4, 4, 3), dtype=np.uint8))
+    assert time.monotonic() - started < 0.05
+    preview.stop()
+
+def test_q_key_calls_on_quit():
+    gui = RecordingGui(keys=[ord('q')])
+    quit_pressed = threading.Event()
+    preview = PreviewDisplay(max_fps=50, on_quit=quit_pressed.set, imshow=gui.imshow, wait_key=gui.wait_key).start()
+    assert quit_pressed.wait(1)
+    preview.stop()
+
+def test_create_preview_policies():
+    assert create_preview('off', annotations=True) is None
+    assert create_preview('annotated', annotations=False) is None
+    with pytest.raises(ValueError):
+        create_preview('window', annotations=True)
@@ -21,3 +21,38 @@ def test_robot_move_to_coordinates(robot):
     assert math.isclose(math.degrees(robot._state['b']), 0, abs_tol=5)
     assert math.isclose(math.degrees(robot._state['t']), 180, abs_tol=5)
 
+def test_robot_moves_use_cached_state(offline_robot):
+    offline_robot.get_state()
+    commands = offline_robot._transport.commands
+    commands.clear()
+    offline_robot.move_left(10)
+    offline_robot.move_left(10)
+    assert [command['T'] for command in commands] == [121, 121]
+    assert math.isclose(commands[-1]['angle'], 20)
+
+def test_robot_fresh_move_reads_state(offline_robot):
+    commands = offline_robot._transport.commands
+    commands.clear()
+    offline_robot.move_up(10, fresh=True)
+    assert [command['T'] for command in commands] == [105, 121]
+    assert math.isclose(commands[-1]['angle'], 80)
+
+def test_robot_settle_returns_before_delay(offline_robot):
+    offline_robot._settle = True
+    started = time.monotonic()
+    offline_robot.move_to_position(e=90, b=0, s=0, h=180, delay=5)
+    assert time.monotonic() - started < 1
+
+def test_robot_settles_against_simulator(simulated_robot):
+    started = time.monotonic()
+    simulated_robot.move_to_position(e=60, b=30, s=0, h=180, delay=5)
+    assert time.monotonic() - started < 2
+    state = simulated_robot.get_state()
+    assert math.isclose(math.degrees(state['e']), 60, abs_tol=2)
+    assert math.isclose(math.degrees(state['b']), 30, abs_tol=2)
+
+def test_robot_state_poller_reports_whether_it_started(offline_robot):
+    assert offline_robot.start_state_poller(50)
+    assert not offline_robot.start_state_poller(50)
+    offline_robot.stop_state_poller()
+    assert offline_robot.start_state_poller(50)
@@ -0,0 +1,55 @@
+import numpy as np
+import supervision as sv
+from roi import RoiSelector, crop_frame
+
+
+def target(x, y, size=40.0, tracker_id=3, class_id=1):
+    return sv.Detections(xyxy=np.array([[x, y, x + size, y + size]]), confidence=np.array([0.8]),
+                         class_id=np.array([class_id]), tracker_id=np.array([tracker_id]))
+
+def test_whole_frame_until_the_target_is_seen():
+    roi = RoiSelector((640, 640))
+    assert roi.crop((1280, 1280)) is None
+    with roi.follow(class_id=1, tracker_id=3):
+        assert roi.crop((1280, 1280)) is None
+        roi.update(target(100, 1200), 0.0, cropped=False)
+        x0, y0, x1, y1 = roi.crop((1280, 1280), now=0.0)
+        # At least the model input, with its aspect ratio, and inside the frame
+        assert (x1 - x0, y1 - y0) == (640, 640)
+        assert x0 == 0 and y1 == 1280
+    assert roi.crop((1280, 1280)) is None
+
+def test_crop_follows_the_predicted_position():
+    roi = RoiSelector((640, 640), padding=2.0)
+    with roi.follow(class_id=1):
+        roi.update(target(600, 600), 0.0, cropped=False)
+        roi.update(target(610, 600), 0.1, cropped=True)
+        x0, _, x1, _ = roi.crop((1280, 1280), now=0.2)
+        assert (x0 + x1) / 2 == 640
+        roi.update(target(600, 600, size=400), 0.3, cropped=True)
+        x0, y0, x1, y1 = roi.crop((1280, 1280), now=0.3)
+        assert (x1 - x0, y1 - y0) == (800, 800)
+
+def test_periodic_refresh_and_lost_target_use_the_whole_frame():
+    roi = RoiSelector((640, 640), refresh_interval=4, max_misses=1)
+    with roi.follow(class_id=1, tracker_id=3):
+        roi.update(target(600, 600), 0.0, cropped=False)
+        crops = [roi.crop((1280, 1280), now=0.0) for _ in range(8)]
+        assert [crop is None for crop in crops] == [False, False, False, True] * 2
+        # Another object of the class is not the target
+        roi.update(target(600, 600, tracker_id=9), 0.1, cropped=True)
+        assert roi.crop((1280, 1280), now=0.2) is not None
+        roi.update(None, 0.3, cropped=True)
+        assert roi.crop((1280, 1280), now=0.3) is None
+        roi.update(target(600, 600), 0.4, cropped=False)
+        assert roi.crop((1280, 1280), now=0.4) is not None
+
+def test_no_crop_when_the_frame_is_already_model_sized():
+    roi = RoiSelector((640, 640))
+    with roi.follow(class_id=1):
+        roi.update(target(600, 600), 0.0, cropped=False)
+        assert roi.crop((1280, 1280), frame_size=(640, 640), now=0.0) is None
+
+def test_crop_frame_scales_the_crop_to_the_frame():
+    frame = np.arange(8 * 8).reshape(8, 8)
+    assert crop_frame(frame, (4, 8, 12, 16), (16, 16)).tolist() == frame[4:8, 2:6].tolist()
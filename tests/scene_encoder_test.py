@@ -0,0 +1,52 @@
+import time
+import av
+import numpy as np
+import pytest
+from frame_source import SyntheticSource
+from scene_encoder import SceneEncoder
+
+
+def encode(encoder: SceneEncoder, seconds: float, fps: float = 10, size=(320, 240)):
+    """Feeds seconds of frames ending now, then stops the encoder once it has encoded them all."""
+    source = SyntheticSource(*size)
+    start = time.monotonic() - seconds
+    for i in range(int(seconds * fps)):
+        encoder.add(source.read(), timestamp=start + i / fps)
+    encoder.stop()
+
+def decode(clip) -> list:
+    with av.open(clip) as container:
+        return [frame.to_ndarray(format='bgr24') for frame in container.decode(video=0)]
+
+def test_clip_is_a_playable_mp4_of_the_window():
+    encoder = SceneEncoder(window=4, fps=10, segment_seconds=1, max_side=160, queue_size=100).start()
+    encode(encoder, 10)
+    frames = decode(encoder.clip())
+    assert 40 <= len(frames) <= 50
+    assert frames[0].shape == (120, 160, 3)
+    assert encoder.duration() <= 5 + 1e-6
+
+def test_clip_of_last_seconds_starts_at_a_segment_boundary():
+    encoder = SceneEncoder(window=10, fps=10, segment_seconds=1, max_side=160, queue_size=100).start()
+    encode(encoder, 6)
+    assert 20 <= len(decode(encoder.clip(seconds=2))) <= 30
+    assert len(decode(encoder.clip())) == 60
+
+def test_clips_are_not_destructive():
+    encoder = SceneEncoder(window=5, fps=10, max_side=160, queue_size=100).start()
+    encode(encoder, 3)
+    first, second = encoder.clip(), encoder.clip()
+    assert first.getvalue() == second.getvalue()
+    assert encoder.memory_bytes() > 0
+
+def test_no_clip_before_frames():
+    assert SceneEncoder().clip() is None
+
+def test_add_subsamples_and_drops_when_busy():
+    encoder = SceneEncoder(fps=10, queue_size=2)
+    frame = np.zeros((32, 32, 3), dtype=np.uint8)
+    assert encoder.add(frame, timestamp=0.0)
+    assert not encoder.add(frame, timestamp=0.05)
+    assert encoder.add(frame, timestamp=0.1)
+    assert not encoder.add(frame, timestamp=0.2)
+    assert encoder.dropped == 1
@@ -0,0 +1,72 @@
+import asyncio
+import time
+import cv2
+import numpy as np
+from fastapi.testclient import TestClient
+from stream_server import FrameBroadcaster, create_app, mjpeg_part
+
+
+def frame(value: int) -> np.ndarray:
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+def test_nothing_is_encoded_without_viewers():
+    broadcaster = FrameBroadcaster(max_fps=0).start()
+    for i in range(10):
+        broadcaster.publish(frame(i))
+    time.sleep(0.05)
+    broadcaster.stop()
+    assert broadcaster.encoded == 0 and broadcaster.latest() is None
+
+def test_each_frame_is_encoded_once_for_all_viewers():
+    broadcaster = FrameBroadcaster(max_fps=0).start()
+
+    async def view():
+        async with broadcaster.subscribe() as first, broadcaster.subscribe() as second, \
+                broadcaster.subscribe() as third:
+            broadcaster.publish(frame(100))
+            return await asyncio.gather(first.next(), second.next(), third.next())
+
+    received = asyncio.run(view())
+    broadcaster.stop()
+    assert broadcaster.encoded == 1
+    assert received[0][1] is received[1][1] is received[2][1]
+    assert cv2.imdecode(np.frombuffer(received[0][1], np.uint8), cv2.IMREAD_COLOR).shape == (48, 64, 3)
+    assert broadcaster.viewers == 0
+
+def test_slow_viewer_drops_frames_without_holding_up_others():
+    broadcaster = FrameBroadcaster(max_fps=0).start()
+
+    async def view():
+        async with broadcaster.subscribe() as slow, broadcaster.subscribe() as fast:
+            seen = []
+            for i in range(1, 6):
+                broadcaster.publish(frame(i))
+                seen.append((await fast.next())[0])
+            # The encoder offers each frame to the viewers in turn, so the slow one may not have the last yet
+            await asyncio.to_thread(wait_for, lambda: slow.dropped == 4)
+            return seen, await slow.next(), slow.dropped
+
+    seen, slow_frame, dropped = asyncio.run(view())
+    broadcaster.stop()
+    assert seen == [1, 2, 3, 4, 5]
+    assert slow_frame[0] == 5 and dropped == 4
+
+def test_websocket_streams_jpeg_frames():
+    broadcaster = FrameBroadcaster(max_fps=0).start()
+    client = TestClient(create_app(broadcaster))
+    with client.websocket_connect('/ws') as websocket:
+        wait_for(lambda: broadcaster.viewers == 1)
+        broadcaster.publish(frame(7))
+        jpeg = websocket.receive_bytes()
+    broadcaster.stop()
+    assert jpeg[:2] == b'\xff\xd8'
+    assert client.get('/snapshot.jpg').content == jpeg
+
+def test_mjpeg_part_framing():
+    part = mjpeg_part(b'jpeg')
+    assert part == b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: 4\r\n\r\njpeg\r\n'
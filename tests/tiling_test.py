@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from tiling import TileGrid, merge_detections
+
+
+def test_tiles_overlap_and_cover_the_frame():
+    grid = TileGrid(2, 3, overlap=0.2)
+    boxes = grid.boxes((1280, 960))
+    assert len(boxes) == len(grid) == 7
+    assert boxes[-1].tolist() == [0, 0, 1280, 960]
+    tiles = boxes[:-1]
+    assert tiles[:, [0, 1]].min() == 0 and tiles[:, 2].max() == 1280 and tiles[:, 3].max() == 960
+    widths = tiles[:, 2] - tiles[:, 0]
+    assert widths.max() - widths.min() <= 1
+    # Each tile overlaps its right neighbour by a fifth of its width
+    assert abs((tiles[0, 2] - tiles[1, 0]) - 0.2 * widths[0]) <= 1
+
+def test_single_tile_is_the_whole_frame():
+    grid = TileGrid.parse('1x1')
+    assert len(grid) == 1
+    assert grid.boxes((640, 480)).tolist() == [[0, 0, 640, 480]]
+    assert len(TileGrid.parse('3X3', include_full=False)) == 9
+    with pytest.raises(ValueError):
+        TileGrid.parse('3by3')
+    with pytest.raises(ValueError):
+        TileGrid(2, 2, overlap=1.0)
+
+def test_merge_moves_boxes_to_the_frame_and_drops_cross_tile_duplicates():
+    tiles = np.array([[0, 0, 100, 100], [80, 0, 180, 100]])
+    xyxy = [np.array([[85.0, 10.0, 95.0, 20.0], [10.0, 10.0, 20.0, 20.0]]), np.array([[5.0, 10.0, 15.0, 20.0]])]
+    confidence = [np.array([0.6, 0.9]), np.array([0.8])]
+    class_id = [np.array([1, 1]), np.array([1])]
+    boxes, scores, classes = merge_detections(xyxy, confidence, class_id, tiles)
+    # The object in the overlap is kept once, from the tile that saw it most confidently
+    assert boxes.tolist() == [[10.0, 10.0, 20.0, 20.0], [85.0, 10.0, 95.0, 20.0]]
+    assert scores.tolist() == pytest.approx([0.9, 0.8])
+    assert classes.tolist() == [1, 1]
+
+def test_merge_of_empty_tiles():
+    empty = np.empty((0, 4), dtype=np.float32)
+    boxes, scores, classes = merge_detections([empty, empty], [np.empty(0)] * 2, [np.empty(0, dtype=int)] * 2,
+                                              np.array([[0, 0, 10, 10], [5, 0, 15, 10]]))
+    assert boxes.shape == (0, 4) and len(scores) == 0 and len(classes) == 0
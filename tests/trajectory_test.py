@@ -0,0 +1,19 @@
+import pytest
+from robot.robot import Robot
+from trajectory import Trajectory
+
+
+def test_trajectory_sends_waypoints_in_order(offline_robot):
+    commands = offline_robot._transport.commands
+    commands.clear()
+    trajectory = Trajectory().joint(e=60, b=60, h=180, acceleration=5).cartesian(x=250, y=0, z=250).gripper(220).reset()
+    offline_robot.run_trajectory(trajectory)
+    assert [command['T'] for command in commands] == [105, 122, 105, 104, 121, 100]
+    assert commands[1]['acc'] == 5
+
+def test_submit_returns_future(offline_robot):
+    commands = offline_robot._transport.commands
+    commands.clear()
+    future = offline_robot.submit(Robot.throw_trajectory())
+    future.result(timeout=5)
+    assert [command['T'] for command in commands] == [122, 122, 122, 100]
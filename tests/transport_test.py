@@ -0,0 +1,107 @@
+import pytest
+import os
+import json
+import tty
+import threading
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from robot.transport import HttpTransport, SerialTransport
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.client_ports.add(self.client_address[1])
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _EchoHandler)
+    server.client_ports = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_http_transport_reuses_connection(server):
+    with HttpTransport(f'127.0.0.1:{server.server_port}') as transport:
+        for _ in range(5):
+            assert transport.send('{"T":105}').startswith('/js?json=')
+    assert len(server.client_ports) == 1
+
+def test_http_transport_reconnects(server):
+    with HttpTransport(f'127.0.0.1:{server.server_port}') as transport:
+        transport.send('{"T":105}')
+        transport.reconnect()
+        transport.send('{"T":105}')
+    assert len(server.client_ports) == 2
+
+class _DropHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+def test_http_transport_does_not_resend_after_request_was_written():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _DropHandler)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with HttpTransport(f'127.0.0.1:{server.server_port}') as transport:
+            with pytest.raises(requests.ConnectionError):
+                transport.send('{"T":104}')
+        assert len(server.requests) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def serial_device():
+    """A pseudo-terminal that answers T:105 like the arm and records everything written to it."""
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    received = []
+
+    def respond():
+        buffer = b''
+        while True:
+            try:
+                data = os.read(master, 1024)
+            except OSError:
+                return
+            buffer += data
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                command = json.loads(line)
+                received.append(command)
+                if command['T'] == 105:
+                    os.write(master, json.dumps({"T": 1051, "n": len(received)}).encode() + b'\n')
+
+    threading.Thread(target=respond, daemon=True).start()
+    yield os.ttyname(slave), received
+    os.close(slave)
+    os.close(master)
+
+def test_serial_transport_pipelines_and_matches_responses(serial_device):
+    port, received = serial_device
+    with SerialTransport(port) as transport:
+        futures = [transport.send_async('{"T":105}'), transport.send_async('{"T":114,"led":0}'), transport.send_async('{"T":105}')]
+        responses = [future.result(timeout=2) for future in futures]
+        assert json.loads(transport.send('{"T":105}'))['n'] == 4
+    assert json.loads(responses[0])['n'] == 1
+    assert responses[1] == ''
+    assert json.loads(responses[2])['n'] == 3
+    assert [command['T'] for command in received] == [105, 114, 105, 105]
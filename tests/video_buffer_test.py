@@ -0,0 +1,61 @@
+import time
+import numpy as np
+import pytest
+from frame_source import SyntheticSource
+from video_buffer import VideoRingBuffer
+
+
+def moving_frames(count: int, width: int = 640, height: int = 480):
+    source = SyntheticSource(width, height)
+    return [source.read() for _ in range(count)]
+
+def test_subsamples_to_fps_and_wraps_at_window():
+    buffer = VideoRingBuffer(window=2, fps=10, max_side=160, duplicate_threshold=0)
+    stored = [buffer.add(frame, timestamp=i / 30) for i, frame in enumerate(moving_frames(120))]
+    assert sum(stored) == 40
+    assert len(buffer) == buffer.capacity == 20
+    timestamps, frames = buffer.snapshot()
+    assert np.all(np.diff(timestamps) > 0) and timestamps[-1] == pytest.approx(117 / 30)
+    assert frames[0].shape == (120, 160, 3)
+
+def test_snapshot_is_not_destructive_and_survives_new_frames():
+    buffer = VideoRingBuffer(window=1, fps=10, max_side=64, duplicate_threshold=0)
+    frames = moving_frames(20)
+    for i, frame in enumerate(frames[:10]):
+        buffer.add(frame, timestamp=i / 10)
+    first = buffer.frames()
+    assert len(first) == 10 and len(buffer.frames()) == 10
+    kept = first[0].copy()
+    for i, frame in enumerate(frames[10:]):
+        buffer.add(frame, timestamp=1 + i / 10)
+    assert np.array_equal(first[0], kept)
+
+def test_reads_the_last_seconds():
+    buffer = VideoRingBuffer(window=10, fps=10, max_side=64, duplicate_threshold=0)
+    now = time.monotonic()
+    for i, frame in enumerate(moving_frames(50)):
+        buffer.add(frame, timestamp=now - 5 + i / 10)
+    assert len(buffer.frames(seconds=2)) == pytest.approx(20, abs=1)
+
+def test_skips_near_duplicates():
+    buffer = VideoRingBuffer(window=10, fps=10, max_side=160)
+    rng = np.random.default_rng(0)
+    still = moving_frames(1)[0]
+    for i in range(10):
+        noise = rng.integers(-3, 4, still.shape)
+        buffer.add(np.clip(still + noise, 0, 255).astype(np.uint8), timestamp=i / 10)
+    assert len(buffer) == 1
+    moved = still.copy()
+    moved[200:260, 300:360] = 255
+    assert buffer.add(moved, timestamp=1.0)
+
+def test_memory_footprint():
+    raw = VideoRingBuffer(window=30, fps=10, max_side=320, duplicate_threshold=0)
+    jpeg = VideoRingBuffer(window=30, fps=10, max_side=320, jpeg_quality=80, duplicate_threshold=0)
+    for i, frame in enumerate(moving_frames(30, 1280, 1280)):
+        raw.add(frame, timestamp=i / 10)
+        jpeg.add(frame, timestamp=i / 10)
+    assert raw.memory_bytes() >= 300 * 320 * 320 * 3
+    assert raw.memory_bytes() < 300 * 1280 * 1280 * 3 / 10
+    assert 0 < jpeg.memory_bytes() < raw.memory_bytes() / 10
+    assert jpeg.stats()["frames"] == 30 and jpeg.frames()[-1].shape == (320, 320, 3)
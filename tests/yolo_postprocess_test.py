@@ -0,0 +1,49 @@
+import numpy as np
+from yolo_postprocess import YoloDecoder, non_max_suppression, _greedy_nms_loop, _greedy_nms_numpy
+
+
+def raw_outputs(num_classes: int = 3, reg_max: int = 16):
+    """Raw 64x64 model outputs with one class-1 object centred on anchor (2, 3) of stride 8."""
+    outputs = {}
+    for stride in (8, 16, 32):
+        size = 64 // stride
+        boxes = np.full((1, size, size, 4 * reg_max), -10.0, dtype=np.float32)
+        boxes[..., ::reg_max] = 10.0
+        classes = np.zeros((1, size, size, num_classes), dtype=np.float32)
+        outputs[f'box{stride}'], outputs[f'class{stride}'] = boxes, classes
+    # Distances of 1, 2, 3 and 4 strides to the left, top, right and bottom.
+    outputs['box8'][0, 2, 3] = -10.0
+    for side, distance in enumerate((1, 2, 3, 4)):
+        outputs['box8'][0, 2, 3, side * reg_max + distance] = 10.0
+    outputs['class8'][0, 2, 3, 1] = 0.9
+    return outputs
+
+def test_decoder_decodes_distribution_boxes():
+    decoder = YoloDecoder((64, 64, 3), num_classes=3, use_numba=False)
+    per_class = decoder(raw_outputs())
+    assert [len(rows) for rows in per_class] == [0, 1, 0]
+    # Anchor centre (28, 20) px; box x 20..52, y 4..52 on a 64x64 input, as normalized y/x.
+    np.testing.assert_allclose(per_class[1][0], [4 / 64, 20 / 64, 52 / 64, 52 / 64, 0.9], atol=1e-3)
+    assert set(decoder.timings) == {'scores', 'boxes', 'nms'}
+
+def test_decoder_dequantizes_integer_outputs():
+    outputs = raw_outputs()
+    scale, zero_point = 0.1, 128
+    quantized = {name: np.clip(np.round(output / scale + zero_point), 0, 255).astype(np.uint8)
+                 for name, output in outputs.items()}
+    decoder = YoloDecoder((64, 64, 3), num_classes=3, use_numba=False,
+                          quantization={name: (scale, zero_point) for name in quantized})
+    expected = YoloDecoder((64, 64, 3), num_classes=3, use_numba=False)(outputs)
+    np.testing.assert_allclose(decoder(quantized)[1], expected[1], atol=1e-3)
+
+def test_nms_is_class_aware():
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [0, 0, 10, 10]], dtype=np.float32)
+    keep = non_max_suppression(boxes, np.array([0.9, 0.8, 0.7]), np.array([0, 0, 1]), use_numba=False)
+    assert keep.tolist() == [0, 2]
+
+def test_nms_numpy_matches_loop():
+    rng = np.random.default_rng(1)
+    corners = rng.random((200, 2)) * 100
+    boxes = np.concatenate([corners, corners + rng.random((200, 2)) * 30 + 1], axis=1)
+    boxes = boxes[np.argsort(-rng.random(200))]
+    np.testing.assert_array_equal(_greedy_nms_numpy(boxes, 0.45, 300), _greedy_nms_loop(boxes, 0.45, 300))